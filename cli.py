@@ -0,0 +1,293 @@
+# cli.py
+import argparse
+import csv
+import json
+import os
+import sys
+from dataclasses import asdict, fields, replace
+
+import numpy as np
+
+from core.link_physics import compute_link_budget
+from core.monte_carlo import MonteCarlo
+from core.network_io import load_network
+from core.routing import METRICS as ROUTING_METRICS, PathCache, path_fidelity
+from core.simulation import Simulation, SimulationConfig
+from core.sweep import DESIGNS, Sweep, SweepParameter, SweepSpec, parameter_value
+from core.traffic import TrafficDemand
+
+# Headless entry point: simulate, sweep and analyze saved networks without a
+# display. Only the Qt-free core package is imported, so this runs on compute
+# nodes without PyQt5.
+#
+#   python cli.py run network.qnet -o result.json --set duration=10 --trials 100
+#   python cli.py sweep network.qnet -o sweep.npz --param attenuation_db_per_km=0.15,0.2,0.25 \
+#                                                 --param coherence_time=0.01..10:log --samples 8
+#   python cli.py analyze network.qnet -o links.csv --route 0:42
+#
+# Results go to the -o file: JSON, or CSV when it ends in .csv (sweeps also
+# write .npz columns, see core.sweep.SweepStore). Summaries go to stdout,
+# progress to stderr.
+
+# SimulationConfig fields that take one plain value (--set, --param)
+SCALAR_FIELDS = {f.name: f for f in fields(SimulationConfig) if f.name not in ("rotation_error", "traffic")}
+
+
+# ----------------------------------------------------------------------
+# Configuration
+# ----------------------------------------------------------------------
+def parse_value(name, text):
+    """Convert the text of a SimulationConfig field to its type."""
+    field = SCALAR_FIELDS.get(name)
+    if field is None:
+        raise ValueError(f"Unknown simulation parameter {name!r} "
+                         f"(one of {', '.join(sorted(SCALAR_FIELDS))})")
+    default = field.default
+    if name == "seed" or isinstance(default, int):
+        return None if name == "seed" and text.lower() == "none" else int(text)
+    if isinstance(default, float):
+        return float(text)
+    return text
+
+
+def parse_assignment(text):
+    name, sep, value = text.partition("=")
+    if not sep:
+        raise ValueError(f"Expected name=value, got {text!r}")
+    return name.strip(), value.strip()
+
+
+def parse_pair(text):
+    """'SOURCE:TARGET[:...]' -> list of its parts, the first two as node ids."""
+    parts = text.split(":")
+    if len(parts) < 2:
+        raise ValueError(f"Expected SOURCE:TARGET, got {text!r}")
+    return [int(parts[0]), int(parts[1])] + parts[2:]
+
+
+def load_config(path):
+    """A SimulationConfig from a JSON object of its fields."""
+    with open(path) as f:
+        data = json.load(f)
+    data["rotation_error"] = {int(node): float(angle) for node, angle in data.get("rotation_error", {}).items()}
+    data["traffic"] = [TrafficDemand(**demand) for demand in data.get("traffic", [])]
+    return SimulationConfig(**data)
+
+
+def build_config(args):
+    config = load_config(args.config) if args.config else SimulationConfig()
+    changes = {}
+    for text in args.set:
+        name, value = parse_assignment(text)
+        changes[name] = parse_value(name, value)
+    config = replace(config, **changes)
+    for text in args.traffic:
+        # SOURCE:TARGET[:PATTERN[:RATE]]
+        source, target, *rest = parse_pair(text)
+        demand = TrafficDemand(source, target)
+        if rest:
+            demand.pattern = rest[0]
+        if len(rest) > 1:
+            demand.rate = float(rest[1])
+        config.traffic.append(demand)
+    return config
+
+
+def config_dict(config):
+    data = asdict(config)
+    data["rotation_error"] = {str(node): angle for node, angle in config.rotation_error.items()}
+    return data
+
+
+# ----------------------------------------------------------------------
+# Output
+# ----------------------------------------------------------------------
+def write_rows(path, rows):
+    """Write a list of flat dicts as CSV."""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def write_output(path, data, rows):
+    """`rows` as CSV if `path` ends in .csv, else `data` as JSON."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.lower().endswith(".csv"):
+        write_rows(path, rows)
+    else:
+        write_json(path, data)
+
+
+class Progress:
+    """Prints `label: n%` to stderr as a run reports progress, unless quiet."""
+    def __init__(self, label, quiet):
+        self.label = label
+        self.quiet = quiet
+        self.last = -1
+
+    def __call__(self, fraction, result=None):
+        percent = int(fraction * 100)
+        if self.quiet or percent == self.last:
+            return
+        self.last = percent
+        print(f"\r{self.label}: {percent:3d}%", end="", file=sys.stderr, flush=True)
+
+    def done(self):
+        if not self.quiet and self.last >= 0:
+            print(file=sys.stderr)
+
+
+# ----------------------------------------------------------------------
+# Commands
+# ----------------------------------------------------------------------
+def simulate(model, config, trials, workers, progress=None):
+    """Run one Simulation, or a MonteCarlo of `trials`; return (result, flat metrics dict)."""
+    if trials > 1:
+        result = MonteCarlo(model, config, trials, workers).run(progress)
+    else:
+        result = Simulation(model, config).run(progress=progress)
+    return result, result.as_dict()
+
+
+def cmd_run(args, model):
+    config = build_config(args)
+    progress = Progress("run", args.quiet)
+    result, metrics = simulate(model, config, args.trials, args.workers, progress)
+    progress.done()
+    print(result.summary())
+    if args.output:
+        write_output(args.output, {"network": args.network, "config": config_dict(config), "result": metrics},
+                     [metrics])
+
+
+def cmd_sweep(args, model):
+    config = build_config(args)
+    nodes = None
+    if args.where:
+        criteria = dict(parse_assignment(text) for text in args.where)
+        nodes = model.nodes_where(**{name: parameter_value(name, value) for name, value in criteria.items()}).tolist()
+        if not nodes:
+            raise ValueError("no nodes match --where")
+    parameters = []
+    for text in args.param:
+        name, values = parse_assignment(text)
+        parameters.append(SweepParameter.parse(name, values, nodes))
+    if not parameters:
+        raise ValueError("sweep needs at least one --param name=v1,v2,... or name=low..high[:log]")
+    spec = SweepSpec(parameters, args.design, args.samples, args.trials)
+
+    store_path = args.output if args.output and args.output.lower().endswith((".npz", ".csv")) else None
+    sweep = Sweep(model, config, spec, args.workers, store_path)
+    progress = Progress(f"sweep of {sweep.num_points} points", args.quiet)
+    result = sweep.run(progress)
+    progress.done()
+    print(result.summary())
+    if args.output and store_path is None:
+        write_json(args.output, {"network": args.network, "config": config_dict(config),
+                                 "parameters": result.store.parameters, **result.as_dict()})
+
+
+def cmd_analyze(args, model):
+    config = build_config(args)
+    budget = compute_link_budget(model, config.attenuation_db_per_km, config.min_attempt_time)
+    columns = ("edge_ids", "source", "target", "length_km", "attenuation_db",
+               "success_probability", "attempt_time", "rate")
+    links = [dict(zip(columns, row)) for row in zip(*(getattr(budget, c).tolist() for c in columns))]
+    summary = {"nodes": model.num_nodes, "links": len(budget)}
+    if len(budget):
+        worst = int(budget.rate.argmin())
+        summary.update({
+            "fiber_km": float(budget.length_km.sum()),
+            "attenuation_db_min": float(budget.attenuation_db.min()),
+            "attenuation_db_max": float(budget.attenuation_db.max()),
+            "success_probability_median": float(np.median(budget.success_probability)),
+            "rate_median": float(np.median(budget.rate)),
+            "slowest_link": int(budget.edge_ids[worst]),
+            "slowest_rate": float(budget.rate[worst]),
+        })
+    print(", ".join(f"{key} {value:g}" if isinstance(value, float) else f"{key} {value}"
+                    for key, value in summary.items()))
+
+    routes = []
+    if args.route:
+        cache = PathCache(model, k=args.k, metric=args.metric, config=config)
+        for text in args.route:
+            source, target = parse_pair(text)[:2]
+            for rank, path in enumerate(cache.paths(source, target)):
+                route = {"source": source, "target": target, "rank": rank, "nodes": path.nodes,
+                         "edges": path.edges, "cost": path.cost}
+                if args.metric == "fidelity":
+                    route["fidelity"] = float(path_fidelity(path))
+                routes.append(route)
+                print(f"{source} -> {target} #{rank + 1}: {' - '.join(map(str, path.nodes))} "
+                      f"(cost {path.cost:.4g})")
+    if args.output:
+        write_output(args.output, {"network": args.network, "summary": summary, "links": links,
+                                   "routes": routes}, links)
+
+
+# ----------------------------------------------------------------------
+# Entry point
+# ----------------------------------------------------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Headless Quantum Network Simulator")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("network", help="saved network (.json or .qnet)")
+    common.add_argument("-o", "--output", help="results file (.json, or .csv for a table)")
+    common.add_argument("--config", help="JSON file of SimulationConfig fields")
+    common.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a SimulationConfig field, e.g. --set duration=10")
+    common.add_argument("--traffic", action="append", default=[], metavar="SRC:DST[:PATTERN[:RATE]]",
+                        help="add a traffic demand between two node ids")
+    common.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+    runs = argparse.ArgumentParser(add_help=False)
+    runs.add_argument("--trials", type=int, default=1, help="Monte Carlo trials per run or sweep point (default 1)")
+    runs.add_argument("--workers", type=int, default=None, help="worker processes for Monte Carlo trials or sweep points")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", parents=[common, runs], help="simulate a network")
+    run.set_defaults(handler=cmd_run)
+    sweep = commands.add_parser("sweep", parents=[common, runs],
+                                help="simulate a grid or Latin hypercube of parameter values")
+    sweep.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2,...|LOW..HIGH[:log]",
+                       help="values or range of a node property or SimulationConfig field")
+    sweep.add_argument("--design", choices=DESIGNS, default="grid",
+                       help="full grid of the parameters, or a Latin hypercube (default grid)")
+    sweep.add_argument("--samples", type=int, default=10,
+                       help="steps per range (grid) or number of points (lhs); default 10")
+    sweep.add_argument("--where", action="append", default=[], metavar="PROPERTY=VALUE",
+                       help="sweep node properties only on matching nodes, e.g. --where node_type=repeater")
+    sweep.set_defaults(handler=cmd_sweep)
+    analyze = commands.add_parser("analyze", parents=[common], help="link budget and routes")
+    analyze.add_argument("--route", action="append", default=[], metavar="SRC:DST",
+                         help="list the best entanglement paths between two node ids")
+    analyze.add_argument("-k", type=int, default=3, help="paths per --route (default 3)")
+    analyze.add_argument("--metric", choices=ROUTING_METRICS, default="fidelity", help="routing metric")
+    analyze.set_defaults(handler=cmd_analyze)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        model = load_network(args.network)
+        args.handler(args, model)
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        print(f"{parser.prog} {args.command}: error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
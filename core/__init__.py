@@ -0,0 +1,2 @@
+# core/__init__.py
+# Qt-free network model and simulation code. Nothing in this package may import PyQt5.
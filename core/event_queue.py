@@ -0,0 +1,136 @@
+# core/event_queue.py
+
+import heapq
+
+TICKS_PER_SECOND = 10**9  # the clock runs in integer nanoseconds
+SLOT_BITS = 24
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+CANCELLED = -1
+
+
+class EventQueue:
+    """
+    Heap-based event queue with cancellable timers and no per-event objects.
+
+    Every event record lives in a reusable slot of a few parallel lists
+    (`kinds`, `args` and a per-slot serial). The heap itself only holds
+    plain ints of the form ``tick << SLOT_BITS | slot``, which order by time
+    first and by slot second and compare much faster than tuples.
+    Cancelling an event just marks its slot; the stale heap entry is
+    discarded when it surfaces and only then is the slot recycled.
+
+    schedule() returns a handle combining the slot and its serial, so a
+    handle that outlived its event cannot cancel a newer one.
+    """
+    def __init__(self, capacity=1024):
+        self.now = 0  # current tick
+        self._heap = []
+        self.kinds = [0] * capacity
+        self.args = [0] * capacity
+        self._serial = [0] * capacity
+        self._free = list(range(capacity - 1, -1, -1))
+        self.pending = 0
+
+    def __len__(self):
+        return self.pending
+
+    def _grow(self):
+        old = len(self.kinds)
+        new = min(old * 2, SLOT_MASK + 1)
+        if new == old:
+            raise OverflowError("Too many pending events")
+        extra = new - old
+        self.kinds.extend([0] * extra)
+        self.args.extend([0] * extra)
+        self._serial.extend([0] * extra)
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    def schedule(self, delay, kind, arg=0):
+        """Schedule event `kind` with integer `arg` after `delay` ticks. Returns a handle."""
+        return self.schedule_at(self.now + delay, kind, arg)
+
+    def schedule_at(self, tick, kind, arg=0):
+        """Schedule event `kind` with integer `arg` at absolute `tick`. Returns a handle."""
+        if tick < self.now:
+            raise ValueError("Cannot schedule an event in the past")
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self.kinds[slot] = kind
+        self.args[slot] = arg
+        serial = self._serial[slot] + 1
+        self._serial[slot] = serial
+        heapq.heappush(self._heap, (int(tick) << SLOT_BITS) | slot)
+        self.pending += 1
+        return (serial << SLOT_BITS) | slot
+
+    def cancel(self, handle):
+        """
+        Cancel a pending event, including one in the batch currently being
+        dispatched. Returns False if it already fired or was cancelled.
+        """
+        slot = handle & SLOT_MASK
+        if self._serial[slot] != handle >> SLOT_BITS or self.kinds[slot] == CANCELLED:
+            return False
+        self.kinds[slot] = CANCELLED
+        self.pending -= 1
+        return True
+
+    def _release(self, slot):
+        # Invalidate outstanding handles before the slot is reused
+        self._serial[slot] += 1
+        self._free.append(slot)
+
+    def peek_tick(self):
+        """Tick of the earliest live event, or None if the queue is empty."""
+        heap = self._heap
+        kinds = self.kinds
+        while heap:
+            slot = heap[0] & SLOT_MASK
+            if kinds[slot] != CANCELLED:
+                return heap[0] >> SLOT_BITS
+            heapq.heappop(heap)
+            self._release(slot)
+        return None
+
+    def retire(self, slots):
+        """Release the slots of a dispatched batch and clear the list."""
+        kinds = self.kinds
+        for slot in slots:
+            if kinds[slot] != CANCELLED:
+                self.pending -= 1
+            self._release(slot)
+        slots.clear()
+
+    def pop_batch(self, slots, until=None):
+        """
+        Advance the clock once to the earliest pending tick (not beyond
+        `until`) and fill the caller-owned `slots` list with every event due
+        at that tick. Returns the new tick, or None when nothing is due.
+
+        The caller dispatches on ``kinds[slot]``/``args[slot]`` and must skip
+        slots whose kind has become CANCELLED meanwhile. The slots stay
+        reserved, and their handles valid, until `slots` is passed back in.
+        """
+        self.retire(slots)
+        kinds = self.kinds
+        tick = self.peek_tick()
+        if tick is None or (until is not None and tick > until):
+            return None
+
+        heap = self._heap
+        limit = (tick + 1) << SLOT_BITS
+        pop = heapq.heappop
+        while heap and heap[0] < limit:
+            slot = pop(heap) & SLOT_MASK
+            if kinds[slot] != CANCELLED:
+                slots.append(slot)
+            else:
+                self._release(slot)
+
+        self.now = tick
+        return tick
+
+    def clear(self):
+        self.__init__(len(self.kinds))
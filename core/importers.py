@@ -0,0 +1,286 @@
+# core/importers.py
+
+import csv
+import json
+import math
+import os
+
+import numpy as np
+
+from core.network_model import NODE_DEFAULTS, PIXELS_PER_KM
+
+# Bulk import of sites and fiber links from CSV or GeoJSON.
+#
+# CSV: a node file has x/y columns (km) or lon/lat (or longitude/latitude,
+#      degrees), optionally an id column and any node property column
+#      (node_type, num_qubits, ...; "type" is accepted for node_type). A
+#      link file has source and target columns naming ids from the node
+#      file (or 0-based row numbers if it had no id column).
+# GeoJSON: Point features become nodes (properties as above, id from the
+#      feature or its "id" property), LineString features become links
+#      between their "source"/"target" properties or, failing that, the
+#      nodes at their first and last coordinates. Newline-delimited files
+#      (.geojsonl, .geojsons, .ndjson) are streamed feature by feature.
+#
+# Geographic coordinates are projected equirectangularly around the first
+# site imported, which is accurate to well under 1% over metro distances.
+
+EARTH_RADIUS_KM = 6371.0
+CSV_EXTENSIONS = (".csv", ".txt")
+GEOJSON_SEQUENCE_EXTENSIONS = (".geojsonl", ".geojsons", ".ndjson")
+
+_ALIASES = {
+    "type": "node_type",
+    "longitude": "lon", "lng": "lon",
+    "latitude": "lat",
+    "from": "source", "to": "target",
+}
+
+
+class BulkImporter:
+    """
+    Streams nodes and links from files into a NetworkModel in batches of
+    `batch_size`. import_file() is a generator yielding (node_ids,
+    edge_ids) after each batch has been inserted, so a GUI can create the
+    matching items and report progress between batches. Several files can
+    go through one importer (a node file, then its link file): external
+    ids are remembered across calls. Malformed rows, and links with
+    unknown endpoints or self-loops, are counted in `skipped`.
+    """
+    def __init__(self, model, batch_size=20000):
+        self.model = model
+        self.batch_size = batch_size
+        self.ids = {}            # external node id -> model id
+        self.skipped = 0
+        self.num_nodes = 0
+        self.num_edges = 0
+        self._rows = 0           # node rows seen, for files without an id column
+        self._origin = None      # (lon, lat) of the first geographic site
+        self._at = {}            # (lon, lat) -> model id, to attach GeoJSON lines
+
+    def import_file(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension in CSV_EXTENSIONS:
+            return self._csv(path)
+        if extension in GEOJSON_SEQUENCE_EXTENSIONS:
+            return self._geojson(self._feature_lines(path))
+        return self._geojson(self._feature_collection(path))
+
+    # ------------------------------------------------------------------
+    # Insertion
+    # ------------------------------------------------------------------
+    def _project(self, lon, lat):
+        """Degrees to kilometres, relative to the first site."""
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        if self._origin is None:
+            self._origin = (float(lon[0]), float(lat[0]))
+        lon0, lat0 = self._origin
+        x = EARTH_RADIUS_KM * np.radians(lon - lon0) * math.cos(math.radians(lat0))
+        y = -EARTH_RADIUS_KM * np.radians(lat - lat0)  # scene y grows downwards
+        return x, y
+
+    def _add_nodes(self, external_ids, x_km, y_km, columns):
+        ids = self.model.add_nodes(np.asarray(x_km) * PIXELS_PER_KM, np.asarray(y_km) * PIXELS_PER_KM,
+                                   **columns)
+        for external, node_id in zip(external_ids, ids.tolist()):
+            self.ids[external] = node_id
+        self.num_nodes += len(ids)
+        return ids
+
+    def _add_edges(self, pairs):
+        """Insert links given by external ids."""
+        return self._add_resolved_edges([(self.ids.get(s), self.ids.get(t)) for s, t in pairs])
+
+    def _add_resolved_edges(self, pairs):
+        src = []
+        dst = []
+        for a, b in pairs:
+            if a is None or b is None or a == b:
+                self.skipped += 1
+                continue
+            src.append(a)
+            dst.append(b)
+        ids = self.model.add_edges(src, dst)
+        self.num_edges += len(ids)
+        return ids
+
+    # ------------------------------------------------------------------
+    # CSV
+    # ------------------------------------------------------------------
+    def _csv(self, path):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            names = [_ALIASES.get(h.strip().lower(), h.strip().lower()) for h in header]
+            column = {name: i for i, name in enumerate(names)}
+
+            if "source" in column and "target" in column and "x" not in column and "lon" not in column:
+                s, t = column["source"], column["target"]
+                while True:
+                    rows = _take(reader, self.batch_size)
+                    if not rows:
+                        return
+                    pairs = [(row[s].strip(), row[t].strip()) for row in rows if len(row) > max(s, t)]
+                    self.skipped += len(rows) - len(pairs)
+                    yield np.empty(0, dtype=np.int64), self._add_edges(pairs)
+
+            if "x" in column and "y" in column:
+                first, second, geographic = column["x"], column["y"], False
+            elif "lon" in column and "lat" in column:
+                first, second, geographic = column["lon"], column["lat"], True
+            else:
+                raise ValueError(f"{path}: needs x/y, lon/lat or source/target columns")
+            properties = {name: i for name, i in column.items() if name in NODE_DEFAULTS}
+            id_column = column.get("id")
+
+            while True:
+                rows = _take(reader, self.batch_size)
+                if not rows:
+                    return
+                # Row numbers stand in for missing ids, so they count skipped rows too
+                complete = [(self._rows + i, row) for i, row in enumerate(rows) if len(row) == len(names)]
+                self.skipped += len(rows) - len(complete)
+                self._rows += len(rows)
+                if not complete:
+                    continue
+                numbers = [number for number, _ in complete]
+                rows = [row for _, row in complete]
+                try:
+                    a = np.array([row[first] for row in rows], dtype=np.float64)
+                    b = np.array([row[second] for row in rows], dtype=np.float64)
+                    columns = {}
+                    for name, i in properties.items():
+                        values = [row[i].strip() for row in rows]
+                        if isinstance(NODE_DEFAULTS[name], str):
+                            columns[name] = np.array(values)
+                        else:
+                            columns[name] = np.array(values, dtype=np.float64)
+                except ValueError as exc:
+                    raise ValueError(f"{path}: {exc}") from None
+                if id_column is None:
+                    external = [str(number) for number in numbers]
+                else:
+                    external = [row[id_column].strip() for row in rows]
+                x, y = self._project(a, b) if geographic else (a, b)
+                yield self._add_nodes(external, x, y, columns), np.empty(0, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # GeoJSON
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _feature_collection(path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("type") == "Feature":
+            yield data
+        else:
+            yield from data.get("features", [])
+
+    @staticmethod
+    def _feature_lines(path):
+        with open(path) as f:
+            for line in f:
+                line = line.strip().lstrip("\x1e")  # RFC 8142 record separators
+                if line:
+                    yield json.loads(line)
+
+    def _geojson(self, features):
+        points = []
+        links = []
+        for feature in features:
+            geometry = feature.get("geometry") or {}
+            kind = geometry.get("type")
+            properties = feature.get("properties") or {}
+            if kind == "Point":
+                row = self._rows
+                self._rows += 1
+                position = _position(geometry.get("coordinates"))
+                if position is None:
+                    self.skipped += 1
+                    continue
+                points.append((row, feature, properties, position))
+                if len(points) >= self.batch_size:
+                    yield self._insert_points(points), np.empty(0, dtype=np.int64)
+                    points = []
+            elif kind == "LineString":
+                coordinates = geometry.get("coordinates")
+                if not isinstance(coordinates, list) or not coordinates:
+                    coordinates = [None]
+                source = properties.get("source", properties.get("from"))
+                target = properties.get("target", properties.get("to"))
+                source = str(source) if source is not None else _key(coordinates[0])
+                target = str(target) if target is not None else _key(coordinates[-1])
+                if source is None or target is None:
+                    self.skipped += 1
+                    continue
+                links.append((source, target))
+        if points:
+            yield self._insert_points(points), np.empty(0, dtype=np.int64)
+
+        # Lines are attached once every site is known; coordinates resolve
+        # through the position table, ids through the id table
+        for start in range(0, len(links), self.batch_size):
+            pairs = [(self._at.get(s, self.ids.get(s)) if isinstance(s, tuple) else self.ids.get(s),
+                      self._at.get(t, self.ids.get(t)) if isinstance(t, tuple) else self.ids.get(t))
+                     for s, t in links[start:start + self.batch_size]]
+            yield np.empty(0, dtype=np.int64), self._add_resolved_edges(pairs)
+
+    def _insert_points(self, points):
+        lon = [p[3][0] for p in points]
+        lat = [p[3][1] for p in points]
+        x, y = self._project(lon, lat)
+        columns = {}
+        for name, default in NODE_DEFAULTS.items():
+            if any(name in p[2] or (name == "node_type" and "type" in p[2]) for p in points):
+                values = [p[2].get(name, p[2].get("type", default) if name == "node_type" else default)
+                          for p in points]
+                columns[name] = np.array(values) if isinstance(default, str) else np.array(values, dtype=np.float64)
+        external = []
+        for row, feature, properties, _ in points:
+            node_id = feature.get("id", properties.get("id"))
+            external.append(str(node_id) if node_id is not None else str(row))
+        ids = self._add_nodes(external, x, y, columns)
+        for (_, _, _, position), node_id in zip(points, ids.tolist()):
+            self._at[_key(position)] = node_id
+        return ids
+
+
+def is_link_csv(path):
+    """True for a CSV link file (source/target columns, no coordinates)."""
+    if os.path.splitext(path)[1].lower() not in CSV_EXTENSIONS:
+        return False
+    with open(path, newline="") as f:
+        header = next(csv.reader(f), [])
+    names = {_ALIASES.get(h.strip().lower(), h.strip().lower()) for h in header}
+    return {"source", "target"} <= names and not names & {"x", "lon"}
+
+
+def _position(coordinates):
+    """(lon, lat) as finite floats, or None if `coordinates` has no usable position."""
+    try:
+        lon, lat = float(coordinates[0]), float(coordinates[1])
+    except (TypeError, ValueError, IndexError, KeyError):
+        return None
+    if not (math.isfinite(lon) and math.isfinite(lat)):
+        return None
+    return lon, lat
+
+
+def _key(coordinates):
+    """Position key for matching line ends to points (about 1 cm precision), or None."""
+    position = _position(coordinates)
+    if position is None:
+        return None
+    return (round(position[0], 7), round(position[1], 7))
+
+
+def _take(reader, count):
+    rows = []
+    for row in reader:
+        rows.append(row)
+        if len(rows) == count:
+            break
+    return rows
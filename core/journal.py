@@ -0,0 +1,339 @@
+# core/journal.py
+
+import glob
+import json
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from core.network_io import load_binary, read_binary_columns, save_binary
+from core.network_model import (
+    CATEGORICAL_COLUMNS, EDGES_ADDED, EDGES_REMOVED, NODE_COLUMNS, NODES_ADDED,
+    NODES_CHANGED, NODES_MOVED, NODES_REMOVED, RESET, decode,
+)
+
+# Autosave as a snapshot plus an append-only journal of the edits since:
+#
+#   <base>.snapshot.qnet  the whole model, ids preserved (network_io keep_ids)
+#   <base>.journal        a header line {"journal": 1, "generation": g}, then
+#                         one JSON array per edit:
+#                           ["n+", ids, x, y, {column: values}]   nodes added
+#                                                                 (or restored
+#                                                                 under old ids)
+#                           ["n-", ids]                           nodes removed
+#                           ["e+", ids, sources, targets]         edges added
+#                           ["e-", ids]                           edges removed
+#                           ["mv", id, x, y]                      node moved
+#                           ["set", id, column, value]            property set
+#
+# Both carry the same generation number; a journal whose generation does not
+# match the snapshot's predates it and is ignored, so a crash between
+# writing a snapshot and truncating the journal cannot replay edits twice.
+# A torn last line (crash mid-write) is dropped.
+#
+# Each process autosaves under its own base (autosave_base) and holds an OS
+# lock on <base>.lock while its Journal is open. The lock goes away with the
+# process, however it ends, so an unlocked autosave with content is one a
+# crashed session left behind (orphaned_autosaves); a running instance's
+# autosave is never offered for recovery, overwritten or deleted by another.
+
+JOURNAL_VERSION = 1
+
+# Bulk edits bigger than this are cheaper to capture in the next snapshot
+BULK_RECORD_LIMIT = 1000
+
+
+def snapshot_path(base):
+    return base + ".snapshot.qnet"
+
+
+def journal_path(base):
+    return base + ".journal"
+
+
+def lock_path(base):
+    return base + ".lock"
+
+
+def autosave_base(directory, name="network"):
+    """This process's autosave base in `directory`."""
+    return os.path.join(directory, f"{name}-{os.getpid()}")
+
+
+def lock_autosave(base):
+    """
+    Take the lock of the autosave at `base` without waiting. Returns the
+    open lock file (keep it open to hold the lock; see unlock_autosave),
+    or None if another process holds it.
+    """
+    directory = os.path.dirname(base)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    f = open(lock_path(base), "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def unlock_autosave(lock, base=None):
+    """Release a lock from lock_autosave(); with `base`, also remove the lock file."""
+    if base is not None:
+        try:
+            os.remove(lock_path(base))
+        except OSError:
+            pass
+    lock.close()
+
+
+def discard_autosave(base):
+    """Delete the snapshot and journal of the autosave at `base`."""
+    for path in (journal_path(base), snapshot_path(base)):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def orphaned_autosaves(directory, name="network"):
+    """
+    Bases of autosaves in `directory` that hold something to recover and
+    whose process is gone (their lock is free), most recent first.
+    """
+    suffix = ".snapshot.qnet"
+    bases = [path[:-len(suffix)] for path in glob.glob(os.path.join(glob.escape(directory), name + "*" + suffix))]
+    orphans = []
+    for base in bases:
+        lock = lock_autosave(base)
+        if lock is None:
+            continue  # a running instance's autosave
+        unlock_autosave(lock)
+        if has_recovery(base):
+            orphans.append(base)
+    orphans.sort(key=lambda base: os.path.getmtime(snapshot_path(base)), reverse=True)
+    return orphans
+
+
+def has_recovery(base):
+    """True if an autosave at `base` holds anything to recover."""
+    try:
+        header, nodes, _ = read_binary_columns(snapshot_path(base))
+    except (OSError, ValueError):
+        return False
+    if header.get("num_nodes", 0):
+        return True
+    try:
+        with open(journal_path(base)) as f:
+            f.readline()
+            return bool(f.readline().strip())
+    except OSError:
+        return False
+
+
+def recover(model, base):
+    """
+    Rebuild the autosaved network into `model`: load the snapshot, then
+    replay the journal entries of the same generation. Returns the number
+    of journal entries replayed.
+    """
+    load_binary(snapshot_path(base), model)
+    header, _, _ = read_binary_columns(snapshot_path(base))
+    generation = header.get("metadata", {}).get("generation")
+    try:
+        with open(journal_path(base)) as f:
+            lines = f.read().split("\n")
+    except OSError:
+        return 0
+    try:
+        if json.loads(lines[0]).get("generation") != generation:
+            return 0
+    except ValueError:
+        return 0
+
+    replayed = 0
+    # A line without its newline was cut short by the crash
+    for line in lines[1:-1]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            break
+        _replay(model, record)
+        replayed += 1
+    return replayed
+
+
+def _replay(model, record):
+    op = record[0]
+    if op == "n+":
+        _, ids, x, y, columns = record
+        if ids and ids[0] < model.node_slots:
+            model.restore_nodes(ids, x, y, **columns)  # undone deletion
+            return
+        added = model.add_nodes(x, y, **columns)
+        if added.tolist() != ids:
+            raise ValueError("Journal does not match its snapshot")
+    elif op == "n-":
+        model.remove_nodes(record[1])
+    elif op == "e+":
+        _, ids, sources, targets = record
+        if ids and ids[0] < model.edge_slots:
+            model.restore_edges(ids, sources, targets)
+            return
+        added = model.add_edges(sources, targets)
+        if added.tolist() != ids:
+            raise ValueError("Journal does not match its snapshot")
+    elif op == "e-":
+        model.remove_edges(record[1])
+    elif op == "mv":
+        model.set_position(record[1], record[2], record[3])
+    elif op == "set":
+        model.set_node_attribute(record[1], record[2], record[3])
+    else:
+        raise ValueError(f"Unknown journal entry {op!r}")
+
+
+class Journal:
+    """
+    Records every edit of `model` and appends it to the journal at `base`
+    on flush(). Drags produce a position update per mouse move, so moves
+    and property sets of the same node are coalesced until the next flush.
+    Once `compact_every` entries have been written, or after a bulk edit
+    (file load, import, clear), flush() writes a fresh snapshot and starts
+    an empty journal instead.
+
+    The autosave's lock is held until close(); a `base` locked by another
+    process raises RuntimeError.
+    """
+    def __init__(self, model, base, compact_every=20000):
+        self._lock = lock_autosave(base)
+        if self._lock is None:
+            raise RuntimeError(f"The autosave at {base} is in use by another process")
+        self.model = model
+        self.base = base
+        self.compact_every = compact_every
+        self.generation = None
+        self.written = 0
+        self._buffer = []
+        self._coalesce = {}    # ("mv", id) or ("set", id, column) -> buffer index
+        self._snapshot_due = True
+        self._file = None
+        model.add_listener(self._on_model_change)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def _on_model_change(self, event, ids, name):
+        if self._snapshot_due:
+            return  # the pending snapshot will capture it
+        if event == RESET or len(ids) > BULK_RECORD_LIMIT:
+            self._snapshot_due = True
+            self._buffer.clear()
+            self._coalesce.clear()
+            return
+        model = self.model
+        ids = ids.tolist()
+        if event in (NODES_ADDED, NODES_REMOVED):
+            # Later moves and edits of these ids must land after this entry,
+            # not in a slot before it (an undone delete removes and re-adds)
+            self._forget(ids)
+        if event == NODES_ADDED:
+            columns = {
+                column: [decode(column, value) for value in model.column(column)[ids].tolist()]
+                if column in CATEGORICAL_COLUMNS else model.column(column)[ids].tolist()
+                for column in NODE_COLUMNS if column not in ("x", "y")
+            }
+            self._buffer.append(["n+", ids, model.column("x")[ids].tolist(),
+                                 model.column("y")[ids].tolist(), columns])
+        elif event == NODES_REMOVED:
+            self._buffer.append(["n-", ids])
+        elif event == EDGES_ADDED:
+            src, dst = model.edge_endpoints(ids)
+            self._buffer.append(["e+", ids, src.tolist(), dst.tolist()])
+        elif event == EDGES_REMOVED:
+            self._buffer.append(["e-", ids])
+        elif event == NODES_MOVED:
+            for node in ids:
+                self._record(("mv", node), ["mv", node, float(model.nodes["x"][node]),
+                                            float(model.nodes["y"][node])])
+        elif event == NODES_CHANGED:
+            for node in ids:
+                self._record(("set", node, name), ["set", node, name, model.get_node_attribute(node, name)])
+
+    def _forget(self, ids):
+        """Stop coalescing moves and property edits of `ids` into earlier entries."""
+        ids = set(ids)
+        self._coalesce = {key: index for key, index in self._coalesce.items() if key[1] not in ids}
+
+    def _record(self, key, entry):
+        index = self._coalesce.get(key)
+        if index is None:
+            self._coalesce[key] = len(self._buffer)
+            self._buffer.append(entry)
+        else:
+            self._buffer[index] = entry
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def flush(self):
+        """Write buffered edits (or a snapshot, when one is due) and sync them to disk."""
+        if self._snapshot_due or self.written + len(self._buffer) > self.compact_every:
+            self.compact()
+            return
+        if not self._buffer:
+            return
+        text = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in self._buffer)
+        self._file.write(text)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.written += len(self._buffer)
+        self._buffer.clear()
+        self._coalesce.clear()
+
+    def compact(self):
+        """Replace snapshot and journal by a snapshot of the current model."""
+        generation = time.time_ns()
+        directory = os.path.dirname(self.base)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp = snapshot_path(self.base) + ".tmp"
+        save_binary(self.model, temp, keep_ids=True, metadata={"generation": generation})
+        os.replace(temp, snapshot_path(self.base))
+
+        if self._file is not None:
+            self._file.close()
+        self._file = open(journal_path(self.base), "w")
+        self._file.write(json.dumps({"journal": JOURNAL_VERSION, "generation": generation}) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self.generation = generation
+        self.written = 0
+        self._buffer.clear()
+        self._coalesce.clear()
+        self._snapshot_due = False
+
+    def close(self, discard=False):
+        """Stop recording; flush what is pending, or delete the autosave with `discard`."""
+        self.model.remove_listener(self._on_model_change)
+        if not discard:
+            self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if discard:
+            discard_autosave(self.base)
+        if self._lock is not None:
+            unlock_autosave(self._lock, self.base if discard else None)
+            self._lock = None
@@ -0,0 +1,197 @@
+# core/monte_carlo.py
+
+import copy
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+
+import numpy as np
+
+from core.simulation import Simulation, SimulationConfig
+
+# Per-trial quantities that are averaged across trials
+METRICS = ("delivery_rate", "mean_fidelity", "expired", "swaps", "failed_swaps", "events")
+
+
+class RunningStats:
+    """
+    Mergeable count/mean/variance accumulator over the METRICS columns.
+    Merging uses the pairwise update of Chan et al., so partial results from
+    any number of workers combine exactly in O(1) memory each.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = np.zeros(len(METRICS))
+        self.m2 = np.zeros(len(METRICS))
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+
+    def std(self):
+        if self.count < 2:
+            return np.zeros(len(METRICS))
+        return np.sqrt(self.m2 / (self.count - 1))
+
+    def stderr(self):
+        return self.std() / math.sqrt(max(self.count, 1))
+
+    def as_dict(self):
+        std = self.std()
+        data = {"trials": self.count}
+        for i, name in enumerate(METRICS):
+            data[name] = float(self.mean[i])
+            data[name + "_std"] = float(std[i])
+        return data
+
+
+def trial_metrics(result):
+    """The METRICS row of one finished Simulation."""
+    rate = result.delivered / result.simulated_time if result.simulated_time > 0 else 0.0
+    return (rate, result.mean_fidelity, result.expired, result.swaps,
+            result.failed_swaps, result.events)
+
+
+class MonteCarloResult:
+    """Merged statistics of the trials finished so far."""
+    def __init__(self, entropy, trials):
+        self.entropy = entropy  # root seed; reruns with it reproduce every trial
+        self.trials = trials
+        self.stats = RunningStats()
+        self.wall_time = 0.0
+
+    @property
+    def events_per_second(self):
+        total = self.stats.mean[METRICS.index("events")] * self.stats.count
+        return total / self.wall_time if self.wall_time > 0 else 0.0
+
+    def as_dict(self):
+        data = self.stats.as_dict()
+        data["entropy"] = self.entropy
+        data["wall_time"] = self.wall_time
+        data["events_per_second"] = self.events_per_second
+        return data
+
+    def summary(self):
+        mean = self.stats.mean
+        err = self.stats.stderr()
+        rate = METRICS.index("delivery_rate")
+        fid = METRICS.index("mean_fidelity")
+        return (f"{self.stats.count}/{self.trials} trials: "
+                f"{mean[rate]:.1f} ± {err[rate]:.1f} pairs/s, "
+                f"fidelity {mean[fid]:.3f} ± {err[fid]:.3f}, "
+                f"{self.events_per_second:,.0f} events/s")
+
+
+# ----------------------------------------------------------------------
+# Worker side. The model and config arrive once per process through the
+# pool initializer; tasks only carry trial index ranges.
+# ----------------------------------------------------------------------
+_worker_model = None
+_worker_config = None
+
+
+def _init_worker(model, config):
+    global _worker_model, _worker_config
+    _worker_model = model
+    _worker_config = config
+
+
+def _run_trials(first, count, entropy, model=None, config=None):
+    """Run trials [first, first + count) and return their merged RunningStats."""
+    model = model if model is not None else _worker_model
+    config = config if config is not None else _worker_config
+    stats = RunningStats()
+    for trial in range(first, first + count):
+        # Each trial owns the stream keyed by its index, independent of chunking
+        seed = np.random.SeedSequence(entropy, spawn_key=(trial,))
+        result = Simulation(model, replace(config, seed=seed)).run()
+        stats.add(trial_metrics(result))
+    return stats
+
+
+class MonteCarlo:
+    """
+    Repeats a Simulation `trials` times and merges the outcomes.
+
+    Trials are split into chunks and spread over a ProcessPoolExecutor
+    (`workers=1` runs inline). Trial i always draws from
+    SeedSequence(entropy, spawn_key=(i,)), so a run is reproducible from
+    config.seed regardless of worker count. Has the same run()/cancel()
+    interface as Simulation.
+
+    The model and config are copied on construction, so they may be edited
+    while the trials run.
+    """
+    def __init__(self, model, config=None, trials=100, workers=None, chunks_per_worker=4):
+        self.model = copy.deepcopy(model)
+        self.config = copy.deepcopy(config or SimulationConfig())
+        self.trials = int(trials)
+        self.workers = max(1, min(workers or os.cpu_count() or 1, self.trials))
+        self.chunks_per_worker = chunks_per_worker
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop handing out trials; chunks already running are discarded."""
+        self.cancelled = True
+
+    def _chunks(self):
+        count = min(self.trials, self.workers * self.chunks_per_worker)
+        bounds = np.linspace(0, self.trials, count + 1).astype(int)
+        return [(int(lo), int(hi - lo)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+    def run(self, progress=None):
+        entropy = np.random.SeedSequence(self.config.seed).entropy
+        result = MonteCarloResult(entropy, self.trials)
+        started = time.perf_counter()
+        chunks = self._chunks()
+
+        if self.workers == 1:
+            for first, count in chunks:
+                if self.cancelled:
+                    break
+                result.stats.merge(_run_trials(first, count, entropy, self.model, self.config))
+                result.wall_time = time.perf_counter() - started
+                if progress is not None:
+                    progress(result.stats.count / self.trials, result)
+            return result
+
+        # Spawn rather than fork: the GUI process must not be forked with Qt running
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model, self.config),
+        )
+        try:
+            futures = [executor.submit(_run_trials, first, count, entropy) for first, count in chunks]
+            for future in as_completed(futures):
+                result.stats.merge(future.result())
+                result.wall_time = time.perf_counter() - started
+                if progress is not None:
+                    progress(result.stats.count / self.trials, result)
+                if self.cancelled:
+                    break
+        finally:
+            executor.shutdown(wait=not self.cancelled, cancel_futures=True)
+        return result
+
+
+def run_monte_carlo(model, config=None, trials=100, workers=None, progress=None):
+    """Headless convenience wrapper: run `trials` simulations of `model` and return the MonteCarloResult."""
+    return MonteCarlo(model, config, trials, workers).run(progress)
@@ -0,0 +1,237 @@
+# core/network_io.py
+
+import json
+import os
+
+import numpy as np
+
+from core.network_model import CATEGORICAL_COLUMNS, NODE_COLUMNS, NetworkModel
+
+# Two on-disk formats for a NetworkModel, chosen by file extension:
+#
+#   .json  readable and diffable, for small hand-made networks:
+#          {"format": "quantum-network", "version": 1,
+#           "nodes": [{"id": 0, "x": ..., "node_type": "repeater", ...}, ...],
+#           "edges": [[source, target], ...]}
+#
+#   .qnet  columnar binary for large ones: a magic line, an 8-byte header
+#          length, a JSON header listing every column (name, dtype, offset,
+#          length), then the raw little-endian columns, each 64-byte
+#          aligned. Columns are memory-mapped and copied into the model in
+#          one slice assignment each, so a million edges load in well under
+#          a second.
+#
+# Files hold live rows only, renumbered densely; categorical columns keep
+# their code tables so files survive reordering of NODE_TYPES and friends.
+# Snapshots (save_binary(..., keep_ids=True), used by the autosave journal)
+# instead keep every slot plus the alive masks, so ids survive a reload.
+
+FORMAT_NAME = "quantum-network"
+FORMAT_VERSION = 1
+MAGIC = b"QNET\x01\n"
+ALIGNMENT = 64
+
+EDGE_COLUMNS = {"source": np.int32, "target": np.int32}
+
+
+def is_binary(path):
+    return os.path.splitext(path)[1].lower() == ".qnet"
+
+
+def save_network(model, path):
+    """Write the live part of `model` to `path` (.qnet binary, anything else JSON)."""
+    if is_binary(path):
+        save_binary(model, path)
+    else:
+        save_json(model, path)
+
+
+def load_network(path, model=None):
+    """
+    Read a network file into `model` (cleared first) or a new NetworkModel,
+    which is returned. Node ids in the model follow the file's order.
+    """
+    if is_binary(path):
+        return load_binary(path, model)
+    return load_json(path, model)
+
+
+def _live_columns(model):
+    """Live node columns and densely renumbered edge endpoints."""
+    node_ids = model.node_ids()
+    node_map = np.full(model.node_slots, -1, dtype=np.int64)
+    node_map[node_ids] = np.arange(len(node_ids))
+    src, dst = model.edge_endpoints()
+    nodes = {name: model.column(name)[node_ids] for name in NODE_COLUMNS}
+    edges = {"source": node_map[src].astype(np.int32), "target": node_map[dst].astype(np.int32)}
+    return nodes, edges
+
+
+def _all_columns(model):
+    """Every slot handed out so far, dead ones included, with the alive masks."""
+    m = model.edge_slots
+    nodes = {name: model.column(name) for name in NODE_COLUMNS}
+    nodes["alive"] = model.node_mask()
+    edges = {"source": model.edge_src[:m], "target": model.edge_dst[:m], "alive": model.edge_alive[:m]}
+    return nodes, edges
+
+
+def _fill(model, nodes, edges, tables):
+    """
+    Bulk-insert columns read from a file; codes are translated via the
+    file's tables. Snapshot columns come with alive masks: every slot is
+    inserted and the dead ones removed again, so ids are preserved.
+    """
+    if model is None:
+        model = NetworkModel(node_capacity=len(nodes["x"]), edge_capacity=len(edges["source"]))
+    else:
+        model.clear()
+    columns = {}
+    for name in NODE_COLUMNS:
+        if name in ("x", "y") or name not in nodes:
+            continue
+        values = np.asarray(nodes[name])
+        table = CATEGORICAL_COLUMNS.get(name)
+        if table is not None and values.dtype.kind not in "US":
+            # Map the file's codes to names, then to the current codes
+            file_table = tables.get(name, table)
+            lookup = np.array([table.index(label) if label in table else 0 for label in file_table],
+                              dtype=NODE_COLUMNS[name])
+            values = lookup[values.astype(np.int64)]
+        columns[name] = values
+    model.add_nodes(nodes["x"], nodes["y"], **columns)
+    model.add_edges(edges["source"], edges["target"])
+    if "alive" in edges:
+        model.remove_edges(np.flatnonzero(~np.asarray(edges["alive"], dtype=bool)))
+    if "alive" in nodes:
+        model.remove_nodes(np.flatnonzero(~np.asarray(nodes["alive"], dtype=bool)))
+    return model
+
+
+# ----------------------------------------------------------------------
+# JSON
+# ----------------------------------------------------------------------
+def save_json(model, path):
+    nodes, edges = _live_columns(model)
+    names = list(NODE_COLUMNS)
+    rows = []
+    decoded = {}
+    for name in names:
+        table = CATEGORICAL_COLUMNS.get(name)
+        values = nodes[name].tolist()
+        decoded[name] = [table[v] for v in values] if table else values
+    for i in range(len(nodes["x"])):
+        row = {"id": i}
+        for name in names:
+            row[name] = decoded[name][i]
+        rows.append(row)
+    data = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "nodes": rows,
+        "edges": np.stack([edges["source"], edges["target"]], axis=1).tolist(),
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1)
+
+
+def load_json(path, model=None):
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path} is not a quantum network file")
+    rows = data.get("nodes", [])
+    # Ids in the file may be sparse or unordered; edges refer to them
+    ids = [row.get("id", i) for i, row in enumerate(rows)]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    nodes = {"x": [float(row["x"]) for row in rows], "y": [float(row["y"]) for row in rows]}
+    for name in NODE_COLUMNS:
+        if name not in nodes and rows and all(name in row for row in rows):
+            nodes[name] = [row[name] for row in rows]
+    pairs = data.get("edges", [])
+    try:
+        edges = {"source": [index[s] for s, _ in pairs], "target": [index[t] for _, t in pairs]}
+    except KeyError as exc:
+        raise ValueError(f"Edge refers to unknown node {exc.args[0]!r}") from None
+    return _fill(model, nodes, edges, {})
+
+
+# ----------------------------------------------------------------------
+# Columnar binary
+# ----------------------------------------------------------------------
+def save_binary(model, path, keep_ids=False, metadata=None):
+    """
+    Write a .qnet file. With `keep_ids` every slot is written along with
+    the alive masks (a snapshot); `metadata` is stored in the header.
+    """
+    nodes, edges = _all_columns(model) if keep_ids else _live_columns(model)
+    node_dtypes = dict(NODE_COLUMNS, alive=bool) if keep_ids else NODE_COLUMNS
+    edge_dtypes = dict(EDGE_COLUMNS, alive=bool) if keep_ids else EDGE_COLUMNS
+    arrays = [("nodes", name, np.ascontiguousarray(nodes[name], dtype=np.dtype(dtype).newbyteorder("<")))
+              for name, dtype in node_dtypes.items()]
+    arrays += [("edges", name, np.ascontiguousarray(edges[name], dtype=np.dtype(dtype).newbyteorder("<")))
+               for name, dtype in edge_dtypes.items()]
+
+    # Offsets are relative to the start of the data area, which begins at
+    # the first aligned position after the header
+    columns = []
+    offset = 0
+    for table, name, array in arrays:
+        columns.append({"table": table, "name": name, "dtype": array.dtype.str,
+                        "offset": offset, "length": len(array)})
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "num_nodes": int(np.count_nonzero(nodes["alive"])) if keep_ids else len(nodes["x"]),
+        "num_edges": int(np.count_nonzero(edges["alive"])) if keep_ids else len(edges["source"]),
+        "keep_ids": bool(keep_ids),
+        "metadata": metadata or {},
+        "tables": {name: list(table) for name, table in CATEGORICAL_COLUMNS.items()},
+        "columns": columns,
+    }).encode()
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(b"\0" * (-f.tell() % ALIGNMENT))
+        start = f.tell()
+        for column, (_, _, array) in zip(columns, arrays):
+            f.write(b"\0" * (start + column["offset"] - f.tell()))
+            f.write(array.tobytes())
+
+
+def read_binary_columns(path):
+    """
+    Memory-map the columns of a .qnet file. Returns (header, nodes, edges)
+    with read-only arrays that stay valid while referenced.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a .qnet network file")
+        size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(size))
+        start = f.tell() + (-f.tell() % ALIGNMENT)
+    if header.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"{path} was written by a newer version (format {header['version']})")
+
+    file_size = os.path.getsize(path)
+    tables = {"nodes": {}, "edges": {}}
+    for column in header["columns"]:
+        dtype = np.dtype(column["dtype"])
+        length = column["length"]
+        offset = start + column["offset"]
+        if offset + length * dtype.itemsize > file_size:
+            raise ValueError(f"{path} is truncated")
+        if length == 0:
+            array = np.empty(0, dtype=dtype)
+        else:
+            array = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(length,))
+        tables[column["table"]][column["name"]] = array
+    return header, tables["nodes"], tables["edges"]
+
+
+def load_binary(path, model=None):
+    header, nodes, edges = read_binary_columns(path)
+    return _fill(model, nodes, edges, header.get("tables", {}))
@@ -0,0 +1,470 @@
+# core/network_model.py
+
+import numpy as np
+
+# Scene coordinates are pixels; the editor places nodes at 1 km = 10 pixels.
+PIXELS_PER_KM = 10.0
+
+# Categorical node properties are stored as small integer codes into these tables.
+NODE_TYPES = ("memory", "detector", "memory-detector", "repeater")
+QUBIT_TECHS = ("Color centers", "Atoms", "Ions", "Superconducting")
+
+NODE_COLUMNS = {
+    "x": np.float64,
+    "y": np.float64,
+    "node_type": np.uint8,
+    "num_qubits": np.int32,
+    "qubit_tech": np.uint8,
+    "coherence_time": np.float64,
+    "insertion_loss": np.float64,
+}
+
+CATEGORICAL_COLUMNS = {
+    "node_type": NODE_TYPES,
+    "qubit_tech": QUBIT_TECHS,
+}
+
+NODE_DEFAULTS = {
+    "node_type": "memory",
+    "num_qubits": 1,
+    "qubit_tech": "Color centers",
+    "coherence_time": 1.0,
+    "insertion_loss": 0.0,
+}
+
+
+def encode(name, value):
+    """Return the stored value for a node property (categorical names become codes)."""
+    table = CATEGORICAL_COLUMNS.get(name)
+    if table is None:
+        return value
+    if isinstance(value, str):
+        try:
+            return table.index(value)
+        except ValueError:
+            raise ValueError(f"Unknown {name} {value!r}") from None
+    return value
+
+
+def encode_column(name, values):
+    """Vectorized encode() for a whole column of property values."""
+    table = CATEGORICAL_COLUMNS.get(name)
+    values = np.asarray(values)
+    if table is None or values.dtype.kind not in "US":
+        return values.astype(NODE_COLUMNS[name], copy=False)
+    lookup = {label: code for code, label in enumerate(table)}
+    try:
+        return np.fromiter((lookup[v] for v in values.tolist()),
+                           dtype=NODE_COLUMNS[name], count=len(values))
+    except KeyError as exc:
+        raise ValueError(f"Unknown {name} {exc.args[0]!r}") from None
+
+
+def decode(name, value):
+    """Inverse of encode()."""
+    table = CATEGORICAL_COLUMNS.get(name)
+    if table is None:
+        return value.item() if isinstance(value, np.generic) else value
+    return table[int(value)]
+
+
+# Change notifications sent to NetworkModel listeners as
+# listener(event, ids, name), `ids` an int64 array and `name` the changed
+# column for NODES_CHANGED (None otherwise). RESET means ids were renumbered
+# or dropped wholesale and everything derived from the model is stale.
+NODES_ADDED = "nodes_added"
+NODES_REMOVED = "nodes_removed"
+NODES_MOVED = "nodes_moved"
+NODES_CHANGED = "nodes_changed"
+EDGES_ADDED = "edges_added"
+EDGES_REMOVED = "edges_removed"
+RESET = "reset"
+
+
+class NetworkModel:
+    """
+    Qt-free storage for a quantum network topology.
+
+    Nodes and edges live in contiguous NumPy columns addressed by integer ids.
+    Deleted rows are only marked dead, so ids stay stable while views (scene
+    items, caches) refer to them; compact() squeezes the dead rows out.
+    Adjacency is served as CSR arrays that are rebuilt lazily after
+    topology edits. Derived structures that cannot afford a full rebuild
+    (route caches, journals) subscribe with add_listener() instead.
+    """
+    def __init__(self, node_capacity=64, edge_capacity=64):
+        node_capacity = max(int(node_capacity), 1)
+        edge_capacity = max(int(edge_capacity), 1)
+
+        # Node columns; slots [0, node_slots) have been handed out as ids
+        self.node_slots = 0
+        self.nodes = {name: np.zeros(node_capacity, dtype) for name, dtype in NODE_COLUMNS.items()}
+        self.node_alive = np.zeros(node_capacity, dtype=bool)
+        self.num_nodes = 0
+
+        # Edge columns (undirected fiber links)
+        self.edge_slots = 0
+        self.edge_src = np.zeros(edge_capacity, dtype=np.int32)
+        self.edge_dst = np.zeros(edge_capacity, dtype=np.int32)
+        self.edge_alive = np.zeros(edge_capacity, dtype=bool)
+        self.num_edges = 0
+
+        # Bumped on every add/remove; CSR and other derived data key off it
+        self.topology_version = 0
+        self._csr = None
+        self._csr_version = -1
+        self.listeners = []
+
+    def __getstate__(self):
+        # Listeners (views, caches, the journal) stay with the original: a
+        # copy, or the pickle sent to a worker process, starts without any
+        state = self.__dict__.copy()
+        state["listeners"] = []
+        return state
+
+    # ------------------------------------------------------------------
+    # Storage management
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _grown(array, capacity):
+        grown = np.zeros(capacity, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _reserve_nodes(self, count):
+        needed = self.node_slots + count
+        capacity = len(self.node_alive)
+        if needed <= capacity:
+            return
+        capacity = max(capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+        for name in self.nodes:
+            self.nodes[name] = self._grown(self.nodes[name], capacity)
+        self.node_alive = self._grown(self.node_alive, capacity)
+
+    def _reserve_edges(self, count):
+        needed = self.edge_slots + count
+        capacity = len(self.edge_alive)
+        if needed <= capacity:
+            return
+        capacity = max(capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+        self.edge_src = self._grown(self.edge_src, capacity)
+        self.edge_dst = self._grown(self.edge_dst, capacity)
+        self.edge_alive = self._grown(self.edge_alive, capacity)
+
+    def _touch_topology(self):
+        self.topology_version += 1
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def _notify(self, event, ids, name=None):
+        if self.listeners:
+            ids = np.asarray(ids, dtype=np.int64)
+            for listener in list(self.listeners):
+                listener(event, ids, name)
+
+    # ------------------------------------------------------------------
+    # Nodes
+    # ------------------------------------------------------------------
+    def add_node(self, x, y, **properties):
+        """Append a node and return its integer id."""
+        return int(self.add_nodes([x], [y], **{k: [v] for k, v in properties.items()})[0])
+
+    def add_nodes(self, x, y, **columns):
+        """
+        Append many nodes at once. `x`, `y` and any property columns are
+        array-likes of equal length; missing properties take NODE_DEFAULTS.
+        Returns the new ids.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        count = len(x)
+        unknown = set(columns) - set(NODE_DEFAULTS)
+        if unknown:
+            raise KeyError(f"Unknown node properties: {sorted(unknown)}")
+
+        self._reserve_nodes(count)
+        start, stop = self.node_slots, self.node_slots + count
+        self.nodes["x"][start:stop] = x
+        self.nodes["y"][start:stop] = y
+        for name, default in NODE_DEFAULTS.items():
+            if name in columns:
+                self.nodes[name][start:stop] = encode_column(name, columns[name])
+            else:
+                self.nodes[name][start:stop] = encode(name, default)
+        self.node_alive[start:stop] = True
+        self.node_slots = stop
+        self.num_nodes += count
+        self._touch_topology()
+        ids = np.arange(start, stop, dtype=np.int64)
+        self._notify(NODES_ADDED, ids)
+        return ids
+
+    def restore_nodes(self, node_ids, x, y, **columns):
+        """
+        Bring removed nodes back under their old ids (undo of a deletion),
+        with the given positions and property columns. Sends NODES_ADDED.
+        """
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        if len(node_ids) == 0:
+            return node_ids
+        if node_ids.max() >= self.node_slots or self.node_alive[node_ids].any():
+            raise ValueError("Only removed nodes can be restored")
+        self.nodes["x"][node_ids] = x
+        self.nodes["y"][node_ids] = y
+        for name, values in columns.items():
+            if name not in NODE_DEFAULTS:
+                raise KeyError(f"Unknown node property {name!r}")
+            self.nodes[name][node_ids] = encode_column(name, values)
+        self.node_alive[node_ids] = True
+        self.num_nodes += len(node_ids)
+        self._touch_topology()
+        self._notify(NODES_ADDED, node_ids)
+        return node_ids
+
+    def remove_node(self, node_id):
+        """Remove a node and its incident edges. Returns the removed edge ids."""
+        return self.remove_nodes([node_id])
+
+    def remove_nodes(self, node_ids):
+        """Remove many nodes and all their incident edges in one pass."""
+        node_ids = np.unique(np.asarray(node_ids, dtype=np.int64))
+        node_ids = node_ids[self.node_alive[node_ids]]
+        if len(node_ids) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        doomed = np.zeros(self.node_slots, dtype=bool)
+        doomed[node_ids] = True
+        m = self.edge_slots
+        incident = self.edge_alive[:m] & (doomed[self.edge_src[:m]] | doomed[self.edge_dst[:m]])
+        edge_ids = np.flatnonzero(incident)
+
+        self.edge_alive[edge_ids] = False
+        self.num_edges -= len(edge_ids)
+        self.node_alive[node_ids] = False
+        self.num_nodes -= len(node_ids)
+        self._touch_topology()
+        if len(edge_ids):
+            self._notify(EDGES_REMOVED, edge_ids)
+        self._notify(NODES_REMOVED, node_ids)
+        return edge_ids
+
+    def has_node(self, node_id):
+        return 0 <= node_id < self.node_slots and bool(self.node_alive[node_id])
+
+    def node_ids(self):
+        """Ids of all live nodes, ascending."""
+        return np.flatnonzero(self.node_alive[:self.node_slots])
+
+    def column(self, name):
+        """
+        View of a node column over all slots handed out so far (dead rows
+        included, mask them with node_mask()).
+        """
+        return self.nodes[name][:self.node_slots]
+
+    def node_mask(self):
+        return self.node_alive[:self.node_slots]
+
+    def nodes_where(self, **criteria):
+        """Ids of live nodes whose properties equal the given values, e.g. nodes_where(qubit_tech="Ions")."""
+        mask = self.node_mask().copy()
+        for name, value in criteria.items():
+            if name not in NODE_COLUMNS:
+                raise KeyError(f"Unknown node property {name!r}")
+            mask &= self.column(name) == encode(name, value)
+        return np.flatnonzero(mask)
+
+    def get_node_attribute(self, node_id, name):
+        """Return one node property, decoded to its Python value."""
+        return decode(name, self.nodes[name][node_id])
+
+    def set_node_attribute(self, node_id, name, value):
+        """Set one node property (categorical values are given by name)."""
+        if name not in NODE_COLUMNS:
+            raise KeyError(f"Unknown node property {name!r}")
+        self.nodes[name][node_id] = encode(name, value)
+        self._notify(NODES_CHANGED, [node_id], name)
+
+    def set_node_attributes(self, node_ids, name, values):
+        """Vectorized set_node_attribute(): one value, or one per node, with a single notification."""
+        if name not in NODE_COLUMNS:
+            raise KeyError(f"Unknown node property {name!r}")
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        values = np.asarray(values)
+        if values.ndim == 0:
+            self.nodes[name][node_ids] = encode(name, values.item())
+        else:
+            self.nodes[name][node_ids] = encode_column(name, values)
+        self._notify(NODES_CHANGED, node_ids, name)
+
+    def set_position(self, node_id, x, y):
+        self.nodes["x"][node_id] = x
+        self.nodes["y"][node_id] = y
+        self._notify(NODES_MOVED, [node_id])
+
+    def set_positions(self, node_ids, x, y):
+        """Vectorized set_position(): move many nodes with a single notification."""
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.nodes["x"][node_ids] = x
+        self.nodes["y"][node_ids] = y
+        self._notify(NODES_MOVED, node_ids)
+
+    def node_record(self, node_id):
+        """All properties of one node as a plain dict."""
+        return {name: self.get_node_attribute(node_id, name) for name in NODE_COLUMNS}
+
+    # ------------------------------------------------------------------
+    # Edges
+    # ------------------------------------------------------------------
+    def add_edge(self, source_id, target_id):
+        """Append an edge between two live nodes and return its id."""
+        return int(self.add_edges([source_id], [target_id])[0])
+
+    def add_edges(self, source_ids, target_ids):
+        """Append many edges at once and return their ids."""
+        src = np.asarray(source_ids, dtype=np.int32)
+        dst = np.asarray(target_ids, dtype=np.int32)
+        if len(src) != len(dst):
+            raise ValueError("source_ids and target_ids must have the same length")
+        if len(src) and not (self.node_alive[src].all() and self.node_alive[dst].all()):
+            raise ValueError("Edges must connect existing nodes")
+
+        count = len(src)
+        self._reserve_edges(count)
+        start, stop = self.edge_slots, self.edge_slots + count
+        self.edge_src[start:stop] = src
+        self.edge_dst[start:stop] = dst
+        self.edge_alive[start:stop] = True
+        self.edge_slots = stop
+        self.num_edges += count
+        self._touch_topology()
+        ids = np.arange(start, stop, dtype=np.int64)
+        self._notify(EDGES_ADDED, ids)
+        return ids
+
+    def restore_edges(self, edge_ids, source_ids, target_ids):
+        """Bring removed edges back under their old ids (undo of a deletion). Sends EDGES_ADDED."""
+        edge_ids = np.asarray(edge_ids, dtype=np.int64)
+        if len(edge_ids) == 0:
+            return edge_ids
+        src = np.asarray(source_ids, dtype=np.int32)
+        dst = np.asarray(target_ids, dtype=np.int32)
+        if edge_ids.max() >= self.edge_slots or self.edge_alive[edge_ids].any():
+            raise ValueError("Only removed edges can be restored")
+        if not (self.node_alive[src].all() and self.node_alive[dst].all()):
+            raise ValueError("Edges must connect existing nodes")
+        self.edge_src[edge_ids] = src
+        self.edge_dst[edge_ids] = dst
+        self.edge_alive[edge_ids] = True
+        self.num_edges += len(edge_ids)
+        self._touch_topology()
+        self._notify(EDGES_ADDED, edge_ids)
+        return edge_ids
+
+    def remove_edge(self, edge_id):
+        self.remove_edges([edge_id])
+
+    def remove_edges(self, edge_ids):
+        edge_ids = np.unique(np.asarray(edge_ids, dtype=np.int64))
+        edge_ids = edge_ids[self.edge_alive[edge_ids]]
+        if len(edge_ids) == 0:
+            return
+        self.edge_alive[edge_ids] = False
+        self.num_edges -= len(edge_ids)
+        self._touch_topology()
+        self._notify(EDGES_REMOVED, edge_ids)
+
+    def has_edge(self, edge_id):
+        return 0 <= edge_id < self.edge_slots and bool(self.edge_alive[edge_id])
+
+    def edge_ids(self):
+        """Ids of all live edges, ascending."""
+        return np.flatnonzero(self.edge_alive[:self.edge_slots])
+
+    def edge_endpoints(self, edge_ids=None):
+        """Return (source_ids, target_ids) arrays for the given (default: all live) edges."""
+        if edge_ids is None:
+            edge_ids = self.edge_ids()
+        return self.edge_src[edge_ids], self.edge_dst[edge_ids]
+
+    # ------------------------------------------------------------------
+    # Adjacency
+    # ------------------------------------------------------------------
+    def csr(self):
+        """
+        Undirected adjacency in CSR form: (indptr, neighbors, edge_ids).
+        The neighbors of node i are neighbors[indptr[i]:indptr[i+1]], reached
+        through edge_ids at the same positions. Rows cover every node slot.
+        """
+        if self._csr is not None and self._csr_version == self.topology_version:
+            return self._csr
+
+        eids = self.edge_ids()
+        src = self.edge_src[eids]
+        dst = self.edge_dst[eids]
+        heads = np.concatenate([src, dst])
+        tails = np.concatenate([dst, src])
+        via = np.concatenate([eids, eids])
+
+        order = np.argsort(heads, kind="stable")
+        indptr = np.zeros(self.node_slots + 1, dtype=np.int64)
+        np.cumsum(np.bincount(heads, minlength=self.node_slots), out=indptr[1:])
+
+        self._csr = (indptr, tails[order].astype(np.int64), via[order])
+        self._csr_version = self.topology_version
+        return self._csr
+
+    def neighbors(self, node_id):
+        indptr, neighbors, _ = self.csr()
+        return neighbors[indptr[node_id]:indptr[node_id + 1]]
+
+    def incident_edges(self, node_id):
+        indptr, _, edge_ids = self.csr()
+        return edge_ids[indptr[node_id]:indptr[node_id + 1]]
+
+    def degree(self):
+        """Degree of every node slot."""
+        return np.diff(self.csr()[0])
+
+    # ------------------------------------------------------------------
+    # Whole-model operations
+    # ------------------------------------------------------------------
+    def compact(self):
+        """
+        Drop dead rows and renumber ids densely. Returns (node_map, edge_map):
+        arrays mapping each old slot to its new id, or -1 if it was dead.
+        """
+        live_nodes = self.node_ids()
+        live_edges = self.edge_ids()
+
+        node_map = np.full(self.node_slots, -1, dtype=np.int64)
+        node_map[live_nodes] = np.arange(len(live_nodes))
+        edge_map = np.full(self.edge_slots, -1, dtype=np.int64)
+        edge_map[live_edges] = np.arange(len(live_edges))
+
+        for name in self.nodes:
+            self.nodes[name] = self.nodes[name][live_nodes].copy()
+        self.node_alive = np.ones(len(live_nodes), dtype=bool)
+        self.edge_src = node_map[self.edge_src[live_edges]].astype(np.int32)
+        self.edge_dst = node_map[self.edge_dst[live_edges]].astype(np.int32)
+        self.edge_alive = np.ones(len(live_edges), dtype=bool)
+
+        self.node_slots = self.num_nodes = len(live_nodes)
+        self.edge_slots = self.num_edges = len(live_edges)
+        self._touch_topology()
+        self._notify(RESET, [])
+        return node_map, edge_map
+
+    def clear(self):
+        listeners = self.listeners
+        self.__init__()
+        self.listeners = listeners
+        self._notify(RESET, [])
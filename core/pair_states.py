@@ -0,0 +1,243 @@
+# core/pair_states.py
+
+import numpy as np
+
+from core.purification import bbpssw, dejmps, werner_to_bell_diagonal
+
+# Representations, cheapest first. A pair is promoted to a richer one only
+# by an operation that cannot be expressed in its current form.
+WERNER = 0          # one float: the Werner parameter w, fidelity (1 + 3w) / 4
+BELL_DIAGONAL = 1   # four weights of |Phi+>, |Psi->, |Psi+>, |Phi->
+DENSITY_MATRIX = 2  # full 4x4 density matrix, basis |00>, |01>, |10>, |11>
+
+REPRESENTATION_NAMES = ("Werner", "Bell-diagonal", "density matrix")
+
+_S = 1.0 / np.sqrt(2.0)
+# Bell states in Bell-diagonal order, as 2x2 amplitude matrices M[a, b]
+BELL_STATES = np.array([
+    [[_S, 0], [0, _S]],    # Phi+
+    [[0, _S], [-_S, 0]],   # Psi-
+    [[0, _S], [_S, 0]],    # Psi+
+    [[_S, 0], [0, -_S]],   # Phi-
+], dtype=complex)
+BELL_PROJECTORS = np.einsum("kab,kcd->kabcd", BELL_STATES, BELL_STATES.conj()).reshape(4, 4, 4)
+
+PAULIS = np.array([
+    [[1, 0], [0, 1]],
+    [[0, 1], [1, 0]],
+    [[0, -1j], [1j, 0]],
+    [[1, 0], [0, -1]],
+], dtype=complex)
+
+# Each Bell-diagonal entry is |Phi+> with one Pauli error: I, Y, X, Z.
+# As XZ bit codes (I=0, X=1, Z=2, Y=3) errors compose by XOR under swapping.
+_PAULI_CODE = np.array([0, 3, 1, 2])
+_SWAP_INDEX = np.empty((4, 4), dtype=np.int64)
+for _i in range(4):
+    for _j in range(4):
+        _SWAP_INDEX[_i, _j] = int(np.flatnonzero(_PAULI_CODE == (_PAULI_CODE[_i] ^ _PAULI_CODE[_j]))[0])
+
+
+def bell_diagonal_to_matrix(weights):
+    return np.einsum("k,kij->ij", np.asarray(weights, dtype=complex), BELL_PROJECTORS)
+
+
+def matrix_to_bell_diagonal(rho):
+    """Bell-diagonal twirl of a density matrix: its overlaps with the four Bell states."""
+    return np.real(np.einsum("kij,ji->k", BELL_PROJECTORS, rho))
+
+
+def _swap_matrices(rho1, rho2):
+    """
+    Swap two pairs given as density matrices on (A, B1) and (B2, C): Bell
+    measurement on B1, B2 and the Pauli correction on C for each outcome,
+    averaged over outcomes. Returns the density matrix on (A, C).
+    """
+    r1 = rho1.reshape(2, 2, 2, 2)  # a b a' b'
+    r2 = rho2.reshape(2, 2, 2, 2)  # c d c' d'
+    out = np.zeros((4, 4), dtype=complex)
+    for k in range(4):
+        m = BELL_STATES[k]
+        # <beta_k|_(B1,B2) rho1 (x) rho2 |beta_k>_(B1,B2)
+        proj = np.einsum("bc,abxy,cdzw,yz->adxw", m.conj(), r1, r2, m).reshape(4, 4)
+        fix = np.kron(np.eye(2), PAULIS[_SWAP_CORRECTION[k]])
+        out += fix @ proj @ fix.conj().T
+    return out
+
+
+def _corrections():
+    # Find the correction on C that turns each Bell outcome of two ideal pairs back into |Phi+>
+    phi = bell_diagonal_to_matrix([1, 0, 0, 0])
+    r = phi.reshape(2, 2, 2, 2)
+    fixes = []
+    for k in range(4):
+        m = BELL_STATES[k]
+        proj = np.einsum("bc,abxy,cdzw,yz->adxw", m.conj(), r, r, m).reshape(4, 4)
+        scores = []
+        for p in range(4):
+            fix = np.kron(np.eye(2), PAULIS[p])
+            scores.append(np.real(np.trace(phi @ fix @ proj @ fix.conj().T)))
+        fixes.append(int(np.argmax(scores)))
+    return fixes
+
+
+_SWAP_CORRECTION = _corrections()
+
+
+def rotation_z(angle):
+    """Single-qubit Z rotation; not Clifford unless angle is a multiple of pi/2."""
+    return np.diag([np.exp(-0.5j * angle), np.exp(0.5j * angle)])
+
+
+class PairStore:
+    """
+    Holds the states of entangled pairs, each in the cheapest exact
+    representation for what has happened to it so far.
+
+    Handles index parallel lists of representation codes and values (a
+    float, a length-4 array or a 4x4 array). Depolarizing noise and
+    swapping keep Werner pairs Werner; DEJMPS needs Bell-diagonal pairs;
+    a local unitary outside the Pauli group needs the full density matrix.
+    Binary operations work in the richer of their two inputs' forms.
+    """
+    def __init__(self):
+        self.rep = []
+        self.value = []
+        self._free = []
+
+    def __len__(self):
+        return len(self.rep) - len(self._free)
+
+    def new(self, rep, value):
+        if self._free:
+            handle = self._free.pop()
+            self.rep[handle] = rep
+            self.value[handle] = value
+        else:
+            handle = len(self.rep)
+            self.rep.append(rep)
+            self.value.append(value)
+        return handle
+
+    def new_werner(self, w):
+        return self.new(WERNER, float(w))
+
+    def new_bell_diagonal(self, weights):
+        return self.new(BELL_DIAGONAL, np.array(weights, dtype=np.float64))
+
+    def release(self, handle):
+        self.value[handle] = None
+        self._free.append(handle)
+
+    def counts(self):
+        """Number of live pairs in each representation."""
+        live = [rep for h, rep in enumerate(self.rep) if self.value[h] is not None]
+        return np.bincount(np.array(live, dtype=np.int64), minlength=3)
+
+    # ------------------------------------------------------------------
+    # Conversions
+    # ------------------------------------------------------------------
+    def _as(self, handle, rep):
+        """The pair's value converted (not stored) to representation `rep` or richer."""
+        current = self.rep[handle]
+        value = self.value[handle]
+        if current >= rep:
+            return current, value
+        if current == WERNER:
+            value = werner_to_bell_diagonal((1.0 + 3.0 * value) / 4.0)
+        if rep == DENSITY_MATRIX:
+            value = bell_diagonal_to_matrix(value)
+        return rep, value
+
+    def promote(self, handle, rep):
+        self.rep[handle], self.value[handle] = self._as(handle, rep)
+
+    def flip(self, handle):
+        """Exchange the pair's two qubits. Werner and Bell-diagonal states are symmetric."""
+        if self.rep[handle] == DENSITY_MATRIX:
+            swap = np.eye(4)[[0, 2, 1, 3]]
+            self.value[handle] = swap @ self.value[handle] @ swap
+
+    def fidelity(self, handle):
+        rep = self.rep[handle]
+        value = self.value[handle]
+        if rep == WERNER:
+            return (1.0 + 3.0 * value) / 4.0
+        if rep == BELL_DIAGONAL:
+            return float(value[0])
+        return float(matrix_to_bell_diagonal(value)[0])
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+    def depolarize(self, handle, factor):
+        """Keep the state with probability `factor`, else replace it by the maximally mixed state."""
+        rep = self.rep[handle]
+        if rep == WERNER:
+            self.value[handle] *= factor
+        elif rep == BELL_DIAGONAL:
+            self.value[handle] = factor * self.value[handle] + (1.0 - factor) / 4.0
+        else:
+            self.value[handle] = factor * self.value[handle] + (1.0 - factor) / 4.0 * np.eye(4)
+
+    def apply_local_unitary(self, handle, unitary, side):
+        """Apply a single-qubit unitary to qubit `side` (0 or 1) of the pair; promotes to a density matrix."""
+        self.promote(handle, DENSITY_MATRIX)
+        u = np.kron(unitary, np.eye(2)) if side == 0 else np.kron(np.eye(2), unitary)
+        self.value[handle] = u @ self.value[handle] @ u.conj().T
+
+    def swap(self, first, second):
+        """
+        Entanglement swapping of two pairs sharing a middle node; the first
+        pair's far qubit becomes side 0 of the result. Consumes both inputs
+        and returns the new handle.
+        """
+        rep = max(self.rep[first], self.rep[second])
+        _, v1 = self._as(first, rep)
+        _, v2 = self._as(second, rep)
+        if rep == WERNER:
+            value = v1 * v2
+        elif rep == BELL_DIAGONAL:
+            value = np.bincount(_SWAP_INDEX.ravel(), weights=np.outer(v1, v2).ravel(), minlength=4)
+        else:
+            value = _swap_matrices(v1, v2)
+        self.release(first)
+        self.release(second)
+        return self.new(rep, value)
+
+    def purify(self, first, second, protocol):
+        """
+        One purification round of `first` with `second` (consumed).
+        Returns (success probability, output handle); the caller samples
+        success and releases the output on failure. Density matrices are
+        Bell-diagonal twirled first, as DEJMPS assumes.
+        """
+        if protocol == "bbpssw":
+            f, p = bbpssw(self.fidelity(first), self.fidelity(second))
+            handle = self.new_werner((4.0 * float(f) - 1.0) / 3.0)
+        elif protocol == "dejmps":
+            s1 = self._as(first, BELL_DIAGONAL)[1]
+            s2 = self._as(second, BELL_DIAGONAL)[1]
+            if self.rep[first] == DENSITY_MATRIX:
+                s1 = matrix_to_bell_diagonal(s1)
+            if self.rep[second] == DENSITY_MATRIX:
+                s2 = matrix_to_bell_diagonal(s2)
+            states, p = dejmps(s1, s2)
+            handle = self.new_bell_diagonal(states)
+        else:
+            raise ValueError(f"Unknown purification protocol {protocol!r}")
+        self.release(first)
+        self.release(second)
+        return float(p), handle
+
+
+def link_representation(purification, purification_rounds):
+    """
+    Cheapest exact representation for freshly heralded link pairs under the
+    configured protocols: DEJMPS output is Bell-diagonal, everything else
+    stays Werner. Coherent (non-Clifford) node operations promote pairs
+    later, only when they are applied.
+    """
+    if purification == "dejmps" and purification_rounds > 0:
+        return BELL_DIAGONAL
+    return WERNER
@@ -0,0 +1,136 @@
+# core/purification.py
+
+import numpy as np
+
+# Entanglement purification on whole fleets of pairs at once.
+#
+# Bell-diagonal states are arrays of shape (..., 4) holding the weights of
+# |Phi+>, |Psi->, |Psi+>, |Phi-> in that order (the DEJMPS convention), so
+# the fidelity to |Phi+> is states[..., 0]. Werner states are just their
+# fidelity F, with the remaining weight spread evenly over the other three.
+# Every function works elementwise over the leading axes; two inputs are
+# purified against each other pair by pair.
+
+PROTOCOLS = ("none", "bbpssw", "dejmps")
+
+
+def werner_to_bell_diagonal(fidelity):
+    fidelity = np.asarray(fidelity, dtype=np.float64)
+    rest = (1.0 - fidelity) / 3.0
+    return np.stack([fidelity, rest, rest, rest], axis=-1)
+
+
+def twirl(states):
+    """Depolarize Bell-diagonal states to the Werner state of equal fidelity."""
+    return np.asarray(states)[..., 0]
+
+
+def bbpssw(f1, f2):
+    """
+    One BBPSSW round on Werner pairs with fidelities f1 and f2 (arrays).
+    Returns (output fidelity after twirling, success probability).
+    """
+    f1 = np.asarray(f1, dtype=np.float64)
+    f2 = np.asarray(f2, dtype=np.float64)
+    e1 = (1.0 - f1) / 3.0
+    e2 = (1.0 - f2) / 3.0
+    success = f1 * f2 + f1 * e2 + e1 * f2 + 5.0 * e1 * e2
+    fidelity = (f1 * f2 + e1 * e2) / success
+    return fidelity, success
+
+
+def dejmps(s1, s2):
+    """
+    One DEJMPS round on Bell-diagonal pairs s1 and s2 (arrays of shape (..., 4)).
+    Returns (output states, success probability).
+    """
+    s1 = np.asarray(s1, dtype=np.float64)
+    s2 = np.asarray(s2, dtype=np.float64)
+    a1, b1, c1, d1 = np.moveaxis(s1, -1, 0)
+    a2, b2, c2, d2 = np.moveaxis(s2, -1, 0)
+    success = (a1 + b1) * (a2 + b2) + (c1 + d1) * (c2 + d2)
+    out = np.stack([
+        a1 * a2 + b1 * b2,
+        c1 * d2 + d1 * c2,
+        c1 * c2 + d1 * d2,
+        a1 * b2 + b1 * a2,
+    ], axis=-1) / success[..., None]
+    return out, success
+
+
+def purify(s1, s2, protocol):
+    """
+    Purify s1 with s2 under `protocol`. Inputs and outputs are Bell-diagonal;
+    BBPSSW twirls to Werner form before and after. Returns (states, success).
+    """
+    if protocol == "dejmps":
+        return dejmps(s1, s2)
+    if protocol == "bbpssw":
+        fidelity, success = bbpssw(twirl(s1), twirl(s2))
+        return werner_to_bell_diagonal(fidelity), success
+    raise ValueError(f"Unknown purification protocol {protocol!r}")
+
+
+def pump(target, fresh, rounds, protocol="dejmps"):
+    """
+    Entanglement pumping: purify every target pair `rounds` times, each time
+    against a fresh pair (`fresh` broadcasts against `target`, or carries a
+    leading rounds axis for a different fresh pair per round).
+
+    Returns (states, success) where success is the probability that every
+    round succeeded.
+    """
+    states = np.asarray(target, dtype=np.float64)
+    fresh = np.asarray(fresh, dtype=np.float64)
+    per_round = fresh.ndim == states.ndim + 1
+    success = np.ones(states.shape[:-1])
+    for r in range(rounds):
+        states, p = purify(states, fresh[r] if per_round else fresh, protocol)
+        success = success * p
+    return states, success
+
+
+def recurrence(states, rounds, protocol="dejmps", rng=None):
+    """
+    Nested (recurrence) purification of a fleet of pairs: each round purifies
+    pairs 2i and 2i+1 together, halving the fleet (an odd last pair waits).
+
+    With `rng`, each purification succeeds at random and failed pairs are
+    dropped; the surviving states are returned. Without it the expected
+    outcome is returned as (states, success), every output paired with the
+    probability that all purifications leading to it succeeded.
+    """
+    states = np.asarray(states, dtype=np.float64)
+    success = np.ones(len(states))
+    for _ in range(rounds):
+        if len(states) < 2:
+            break
+        half = len(states) // 2
+        leftover = states[2 * half:]
+        leftover_success = success[2 * half:]
+        out, p = purify(states[0:2 * half:2], states[1:2 * half:2], protocol)
+        if rng is not None:
+            out = out[rng.random(half) < p]
+            success = np.ones(len(out) + len(leftover))
+        else:
+            p = p * success[0:2 * half:2] * success[1:2 * half:2]
+            success = np.concatenate([p, leftover_success])
+        states = np.concatenate([out, leftover])
+    if rng is not None:
+        return states
+    return states, success
+
+
+def pumped_links(fidelity, rounds, protocol):
+    """
+    Link-level pumping for a whole set of links: every link pumps a pair of
+    elementary fidelity `fidelity` with `rounds` more such pairs.
+    Returns (output Bell-diagonal states, yield per elementary pair), where
+    the yield counts the rounds + 1 pairs consumed and the chance of any
+    round failing.
+    """
+    elementary = werner_to_bell_diagonal(fidelity)
+    if protocol == "none" or rounds <= 0:
+        return elementary, np.ones(elementary.shape[:-1])
+    states, success = pump(elementary, elementary, rounds, protocol)
+    return states, success / (rounds + 1)
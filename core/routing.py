@@ -0,0 +1,406 @@
+# core/routing.py
+
+import heapq
+import itertools
+from collections import namedtuple
+
+import numpy as np
+
+from core.link_physics import compute_link_budget
+from core.network_model import (
+    EDGES_ADDED, EDGES_REMOVED, NODE_TYPES, NODES_ADDED, NODES_CHANGED,
+    NODES_MOVED, NODES_REMOVED, RESET,
+)
+from core.purification import pumped_links
+from core.simulation import SimulationConfig
+
+# Edge weights, all additive and non-negative:
+#   fidelity: -log of the link's expected Werner parameter once its pair has
+#             waited one mean generation time in memory, so the cheapest path
+#             has the highest end-to-end fidelity after swapping
+#   loss:     fiber attenuation plus insertion losses in dB
+#   hops:     1 per link
+METRICS = ("fidelity", "loss", "hops")
+
+REPEATER = NODE_TYPES.index("repeater")
+INF = float("inf")
+
+# Node columns that feed edge weights or the repeater constraint
+_ROUTING_COLUMNS = {"node_type", "qubit_tech", "coherence_time", "insertion_loss"}
+
+# Above this many pending edge changes a full flush beats checking them one by one
+_FLUSH_THRESHOLD = 4096
+
+Path = namedtuple("Path", "nodes edges cost")
+
+
+def path_fidelity(path):
+    """End-to-end fidelity estimate for a path found with the 'fidelity' metric."""
+    return (1.0 + 3.0 * np.exp(-path.cost)) / 4.0
+
+
+class _Entry:
+    __slots__ = ("paths", "bound", "nodes", "edges")
+
+    def __init__(self, paths, bound):
+        self.paths = paths
+        # Cost a new path must beat to change the answer: the k-th path's
+        # cost, or infinity if fewer than k paths exist
+        self.bound = bound
+        self.nodes = set().union(*(p.nodes for p in paths)) if paths else set()
+        self.edges = set().union(*(p.edges for p in paths)) if paths else set()
+
+
+class PathCache:
+    """
+    k-shortest entanglement paths between node pairs, computed on demand
+    (Yen's algorithm over the model's CSR adjacency) and kept until a model
+    edit could change them. Only repeaters may relay: the intermediate
+    nodes of every path are repeaters, the endpoints can be anything.
+
+    The cache listens to the model and queues edits until the next query:
+      - a removed node or edge drops only the entries whose paths use it;
+      - an added edge, a moved node or a changed routing property can only
+        make new paths cheaper, so an entry (s, t) is dropped only if the
+        edge could carry a path cheaper than the entry's k-th path. That is
+        checked against full shortest-path distances from s and from t,
+        kept per endpoint; distances computed before removals stay valid
+        lower bounds, so trees are discarded only when an edge improves
+        them.
+    Changing the routing fields of `config` empties the cache.
+    """
+    def __init__(self, model, k=3, metric="fidelity", config=None):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown routing metric {metric!r}")
+        self.model = model
+        self.k = max(int(k), 1)
+        self.metric = metric
+        self.config = config if config is not None else SimulationConfig()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._entries = {}        # (source, target) -> _Entry
+        self._by_node = {}        # node -> keys whose paths visit it
+        self._by_edge = {}        # edge -> keys whose paths use it
+        self._by_endpoint = {}    # node -> keys it is an endpoint of
+        self._trees = {}          # endpoint -> distance array over node slots
+
+        self._weights = None
+        self._graph = None
+        self._graph_version = -1
+        self._config_key = self._routing_config()
+
+        self._reset = False
+        self._removed_nodes = set()
+        self._removed_edges = set()
+        self._changed_edges = set()
+        self._changed_nodes = set()
+        model.add_listener(self._on_model_change)
+
+    def close(self):
+        """Stop listening to the model."""
+        self.model.remove_listener(self._on_model_change)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def paths(self, source, target):
+        """Up to k cheapest paths from source to target, cheapest first."""
+        source, target = int(source), int(target)
+        self._sync()
+        key = (source, target)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry.paths
+        self.misses += 1
+
+        if source == target or not (self.model.has_node(source) and self.model.has_node(target)):
+            return []
+        found = self._k_shortest(source, target)
+        for endpoint in key:
+            if endpoint not in self._trees:
+                self._trees[endpoint] = self._tree(endpoint)
+        self._store(key, _Entry(found, found[-1].cost if len(found) == self.k else INF))
+        return found
+
+    def best_path(self, source, target):
+        found = self.paths(source, target)
+        return found[0] if found else None
+
+    def precompute(self, pairs):
+        """Fill the cache for an iterable of (source, target) pairs."""
+        for source, target in pairs:
+            self.paths(source, target)
+
+    def invalidate_all(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._by_node.clear()
+        self._by_edge.clear()
+        self._by_endpoint.clear()
+        self._trees.clear()
+        self._weights = None
+        self._reset = False
+        self._removed_nodes.clear()
+        self._removed_edges.clear()
+        self._changed_edges.clear()
+        self._changed_nodes.clear()
+
+    # ------------------------------------------------------------------
+    # Entries and their reverse indexes
+    # ------------------------------------------------------------------
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        for node in entry.nodes:
+            self._by_node.setdefault(node, set()).add(key)
+        for edge in entry.edges:
+            self._by_edge.setdefault(edge, set()).add(key)
+        for endpoint in key:
+            self._by_endpoint.setdefault(endpoint, set()).add(key)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.invalidations += 1
+        for index, members in ((self._by_node, entry.nodes), (self._by_edge, entry.edges),
+                               (self._by_endpoint, key)):
+            for member in members:
+                keys = index.get(member)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[member]
+
+    def _drop_all(self, keys):
+        for key in list(keys or ()):
+            self._drop(key)
+
+    # ------------------------------------------------------------------
+    # Incremental invalidation
+    # ------------------------------------------------------------------
+    def _on_model_change(self, event, ids, name):
+        if event == NODES_ADDED:
+            return  # isolated nodes change no path
+        if event == RESET:
+            self._reset = True
+        elif event == EDGES_ADDED:
+            self._changed_edges.update(ids.tolist())
+        elif event == EDGES_REMOVED:
+            self._removed_edges.update(ids.tolist())
+        elif event == NODES_REMOVED:
+            self._removed_nodes.update(ids.tolist())
+        elif event == NODES_MOVED or (event == NODES_CHANGED and name in _ROUTING_COLUMNS):
+            self._changed_nodes.update(ids.tolist())
+        else:
+            return
+        self._weights = None
+
+    def _routing_config(self):
+        c = self.config
+        return (c.attenuation_db_per_km, c.min_attempt_time, c.initial_fidelity,
+                c.purification, c.purification_rounds)
+
+    def _sync(self):
+        """Apply queued model edits to the cache."""
+        key = self._routing_config()
+        if key != self._config_key:
+            self._config_key = key
+            self._reset = True
+        pending = len(self._changed_edges) + len(self._changed_nodes)
+        if self._reset or pending > _FLUSH_THRESHOLD:
+            self.invalidate_all()
+            return
+        if not (pending or self._removed_edges or self._removed_nodes):
+            return
+
+        for edge in self._removed_edges:
+            self._drop_all(self._by_edge.get(edge))
+        for node in self._removed_nodes:
+            self._drop_all(self._by_node.get(node))
+            self._trees.pop(node, None)
+
+        # A moved or re-typed node changes the weights of its edges and may
+        # stop relaying: drop the paths through it, then treat its edges as
+        # new ones that might now carry cheaper paths
+        model = self.model
+        changed = self._changed_edges
+        for node in self._changed_nodes:
+            if model.has_node(node):
+                self._drop_all(self._by_node.get(node))
+                changed.update(model.incident_edges(node).tolist())
+        changed.difference_update(self._removed_edges)
+        changed = [e for e in changed if model.has_edge(e)]
+
+        self._removed_nodes.clear()
+        self._removed_edges.clear()
+        self._changed_edges.clear()
+        self._changed_nodes.clear()
+        if changed and (self._entries or self._trees):
+            self._check_new_edges(np.array(changed, dtype=np.int64))
+
+    def _check_new_edges(self, edge_ids):
+        weights = self._edge_weights()[edge_ids]
+        usable = np.isfinite(weights)
+        edge_ids, weights = edge_ids[usable], weights[usable]
+        if len(edge_ids) == 0:
+            return
+        u, v = self.model.edge_endpoints(edge_ids)
+        u = u.astype(np.int64)
+        v = v.astype(np.int64)
+        relay = self.model.column("node_type") == REPEATER
+
+        # Trees an edge shortens are no longer lower bounds
+        for root in list(self._trees):
+            d = self._trees[root]
+            du, dv = _distances(d, u), _distances(d, v)
+            through_u = (u == root) | relay[u]
+            through_v = (v == root) | relay[v]
+            if ((through_u & (du + weights < dv)) | (through_v & (dv + weights < du))).any():
+                del self._trees[root]
+                self._drop_all(self._by_endpoint.get(root))
+
+        for (s, t) in list(self._entries):
+            ds, dt = self._trees.get(s), self._trees.get(t)
+            if ds is None or dt is None:
+                self._drop((s, t))
+                continue
+            bound = self._entries[(s, t)].bound
+            forward = _distances(ds, u) + weights + _distances(dt, v)
+            backward = _distances(ds, v) + weights + _distances(dt, u)
+            ok_forward = ((u == s) | relay[u]) & ((v == t) | relay[v])
+            ok_backward = ((v == s) | relay[v]) & ((u == t) | relay[u])
+            if ((ok_forward & (forward < bound)) | (ok_backward & (backward < bound))).any():
+                self._drop((s, t))
+
+    # ------------------------------------------------------------------
+    # Graph data
+    # ------------------------------------------------------------------
+    def _edge_weights(self):
+        if self._weights is not None:
+            return self._weights
+        model = self.model
+        weights = np.full(model.edge_slots, INF)
+        if self.metric == "hops":
+            weights[model.edge_ids()] = 1.0
+        else:
+            c = self.config
+            budget = compute_link_budget(model, c.attenuation_db_per_km, c.min_attempt_time)
+            if self.metric == "loss":
+                cost = budget.attenuation_db
+            else:
+                states, yield_ = pumped_links(c.initial_fidelity, c.purification_rounds, c.purification)
+                w0 = (4.0 * float(states[0]) - 1.0) / 3.0
+                coherence = model.column("coherence_time")
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    decay_rate = 1.0 / coherence[budget.source] + 1.0 / coherence[budget.target]
+                    wait = 1.0 / (budget.rate * float(yield_))
+                    cost = -np.log(w0) + decay_rate * wait if w0 > 0 else np.full(len(budget), INF)
+                cost = np.where(np.isnan(cost), INF, cost)
+            weights[budget.edge_ids] = cost
+        self._weights = weights
+        self._graph = None
+        return weights
+
+    def _lists(self):
+        """Adjacency, weights and relay flags as Python lists for the search loops."""
+        weights = self._edge_weights()
+        if self._graph is None or self._graph_version != self.model.topology_version:
+            indptr, neighbors, via = self.model.csr()
+            relay = self.model.column("node_type") == REPEATER
+            self._graph = (indptr.tolist(), neighbors.tolist(), via.tolist(),
+                           weights.tolist(), relay.tolist())
+            self._graph_version = self.model.topology_version
+        return self._graph
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def _dijkstra(self, source, target=None, banned_nodes=(), banned_edges=()):
+        indptr, neighbors, via, weights, relay = self._lists()
+        dist = {source: 0.0}
+        pred = {}
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            if node == target:
+                break
+            if node != source and not relay[node]:
+                continue
+            for i in range(indptr[node], indptr[node + 1]):
+                edge = via[i]
+                other = neighbors[i]
+                if edge in banned_edges or other in banned_nodes:
+                    continue
+                nd = d + weights[edge]
+                if nd < dist.get(other, INF):
+                    dist[other] = nd
+                    pred[other] = (node, edge)
+                    heapq.heappush(heap, (nd, other))
+        return dist, pred
+
+    def _tree(self, root):
+        dist, _ = self._dijkstra(root)
+        out = np.full(self.model.node_slots, INF)
+        out[list(dist)] = list(dist.values())
+        return out
+
+    def _shortest(self, source, target, banned_nodes=(), banned_edges=()):
+        dist, pred = self._dijkstra(source, target, banned_nodes, banned_edges)
+        if target not in dist or dist[target] == INF:
+            return None
+        nodes = [target]
+        edges = []
+        while nodes[-1] != source:
+            node, edge = pred[nodes[-1]]
+            nodes.append(node)
+            edges.append(edge)
+        return Path(tuple(reversed(nodes)), tuple(reversed(edges)), dist[target])
+
+    def _k_shortest(self, source, target):
+        """Yen's algorithm for the k cheapest loopless paths."""
+        first = self._shortest(source, target)
+        if first is None:
+            return []
+        weights = self._lists()[3]
+        found = [first]
+        seen = {first.edges}
+        candidates = []
+        tie = itertools.count()
+        while len(found) < self.k:
+            last = found[-1]
+            for i in range(len(last.edges)):
+                spur = last.nodes[i]
+                root_edges = last.edges[:i]
+                banned_edges = {p.edges[i] for p in found if p.edges[:i] == root_edges}
+                banned_nodes = set(last.nodes[:i])
+                spur_path = self._shortest(spur, target, banned_nodes, banned_edges)
+                if spur_path is None:
+                    continue
+                edges = root_edges + spur_path.edges
+                if edges in seen:
+                    continue
+                seen.add(edges)
+                nodes = last.nodes[:i] + spur_path.nodes
+                cost = sum(weights[e] for e in edges)
+                heapq.heappush(candidates, (cost, next(tie), nodes, edges))
+            if not candidates:
+                break
+            cost, _, nodes, edges = heapq.heappop(candidates)
+            found.append(Path(nodes, edges, cost))
+        return found
+
+
+def _distances(tree, nodes):
+    """tree[nodes], with nodes added after the tree was built at infinity."""
+    out = np.full(len(nodes), INF)
+    known = nodes < len(tree)
+    out[known] = tree[nodes[known]]
+    return out
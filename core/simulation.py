@@ -0,0 +1,528 @@
+# core/simulation.py
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, asdict, field
+
+import numpy as np
+
+from core.event_queue import EventQueue, TICKS_PER_SECOND
+from core.link_physics import compute_link_budget
+from core.network_model import NODE_TYPES
+from core.pair_states import PairStore, WERNER, link_representation, rotation_z
+from core.purification import pumped_links
+from core.stabilizer import TableauPairStore, node_qubit_offsets
+from core.traffic import demand_rngs
+
+# Event kinds
+LINK_DONE = 0      # arg: link index, a heralded pair is ready on that link
+PAIR_EXPIRED = 1   # arg: pair slot, the cutoff timer of a stored pair fired
+REQUEST = 2        # arg: demand index, a traffic request arrived
+
+REPEATER = NODE_TYPES.index("repeater")
+
+CHECK_EVERY = 4096  # events between cancel/progress checks in Simulation.run
+
+# How pair states are kept: "pairs" tracks each pair's (mixed) state in a
+# PairStore; "stabilizer" puts every stored qubit in one Clifford tableau
+# (core.stabilizer.TableauPairStore), with noise as sampled Pauli errors
+BACKENDS = ("pairs", "stabilizer")
+
+
+@dataclass
+class SimulationConfig:
+    """Physical and run parameters shared by every simulation of a topology."""
+    duration: float = 1.0                # simulated seconds
+    attenuation_db_per_km: float = 0.2
+    min_attempt_time: float = 1e-6       # seconds per heralding attempt, lower bound
+    initial_fidelity: float = 0.95       # fidelity of a freshly heralded pair
+    swap_success: float = 1.0            # Bell-state measurement success probability
+    cutoff_factor: float = 1.0           # discard pairs after cutoff_factor * min(T_coh)
+    purification: str = "none"           # link-level pumping protocol, see core.purification
+    purification_rounds: int = 0
+    backend: str = "pairs"               # one of BACKENDS
+    # Coherent Z over-rotation (radians) of the Bell measurement at given node
+    # ids; a non-Clifford error that needs full density matrices
+    rotation_error: dict = field(default_factory=dict)
+    # core.traffic.TrafficDemand entries; delivered pairs serve their requests
+    traffic: list = field(default_factory=list)
+    seed: int = None
+
+
+@dataclass
+class SimulationResult:
+    """Counters gathered by one run; fidelities are averaged over delivered pairs."""
+    simulated_time: float = 0.0
+    events: int = 0
+    wall_time: float = 0.0
+    generated: int = 0
+    swaps: int = 0
+    failed_swaps: int = 0
+    expired: int = 0
+    delivered: int = 0
+    fidelity_sum: float = 0.0
+    requests: int = 0
+    served: int = 0
+    throttled: int = 0                   # arrivals delayed by a full backlog
+    latency_sum: float = 0.0
+
+    @property
+    def mean_fidelity(self):
+        return self.fidelity_sum / self.delivered if self.delivered else 0.0
+
+    @property
+    def mean_latency(self):
+        return self.latency_sum / self.served if self.served else 0.0
+
+    @property
+    def events_per_second(self):
+        return self.events / self.wall_time if self.wall_time > 0 else 0.0
+
+    def as_dict(self):
+        data = asdict(self)
+        data["mean_fidelity"] = self.mean_fidelity
+        data["mean_latency"] = self.mean_latency
+        data["events_per_second"] = self.events_per_second
+        return data
+
+    def summary(self):
+        text = (f"{self.simulated_time:g} s simulated: {self.delivered} pairs delivered, "
+                f"mean fidelity {self.mean_fidelity:.3f}")
+        if self.requests:
+            text += (f", {self.served}/{self.requests} requests served "
+                     f"(mean latency {self.mean_latency * 1e3:.2f} ms)")
+        return text + f", {self.events_per_second:,.0f} events/s"
+
+
+class Simulation:
+    """
+    Discrete-event simulation of entanglement distribution over a NetworkModel.
+
+    Every link repeatedly heralds elementary pairs: the number of attempts
+    until success is drawn geometrically, so one LINK_DONE event stands for
+    a whole run of failed attempts. Each node splits its qubits evenly over
+    its links ("ports", two per link), so a busy neighbour can never starve
+    a link; a qubit stays with its port until the pair holding it is
+    delivered, swapped out or discarded. Pair states live in a PairStore,
+    each in the cheapest exact representation (Werner unless DEJMPS
+    pumping or a coherent node error demands more), or with config.backend
+    "stabilizer" as qubits of one Clifford tableau; they depolarize with
+    the coherence times of both memories, and a cutoff timer discards
+    them. Repeater nodes swap two pairs with different far ends as soon
+    as they hold them; a pair whose two ends are both non-repeaters is
+    delivered, and serves the oldest waiting traffic request between its
+    two ends, if any.
+
+    The topology is copied into plain lists on construction, so the model
+    may keep changing while a simulation runs. `link_lengths` may pass
+    core.link_physics.link_lengths(model) when it is already known.
+    """
+    def __init__(self, model, config=None, link_lengths=None):
+        self.config = config or SimulationConfig()
+        self.rng = np.random.default_rng(self.config.seed)
+        self._uniforms = []
+        self.queue = EventQueue()
+        self.result = SimulationResult()
+        self.cancelled = False
+
+        # Pair records: state (a PairStore handle) as of time t between nodes
+        # a and b, whose qubits belong to ports port_a and port_b
+        self.states = self._pair_store(model)
+        self.pair_a = []
+        self.pair_b = []
+        self.pair_port_a = []
+        self.pair_port_b = []
+        self.pair_state = []
+        self.pair_t = []
+        self.pair_timer = []
+        self._free_pairs = []
+
+        self._load_topology(model, link_lengths)
+        self._load_traffic(model)
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+    def _pair_store(self, model):
+        backend = self.config.backend
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown simulation backend {backend!r} (one of {', '.join(BACKENDS)})")
+        self.tableau = backend == "stabilizer"
+        if not self.tableau:
+            return PairStore()
+        if any(self.config.rotation_error.values()):
+            raise ValueError("Coherent rotation errors are not Clifford; use the pairs backend")
+        return TableauPairStore(node_qubit_offsets(model), self.rng)
+
+    def _load_topology(self, model, link_lengths=None):
+        cfg = self.config
+        coherence = model.column("coherence_time")
+        node_type = model.column("node_type")
+
+        self.num_qubits = model.column("num_qubits").astype(np.int64)
+        self.is_repeater = (node_type == REPEATER).tolist()
+        # Depolarizing rate of each memory; zero coherence time means instant loss
+        self.decay_rate = np.where(coherence > 0, 1.0 / np.maximum(coherence, 1e-300), 1e300).tolist()
+        self.cutoff = (cfg.cutoff_factor * coherence).tolist()
+        self.held = [[] for _ in range(model.node_slots)]
+        self.rotation_error = [0.0] * model.node_slots
+        for node, angle in cfg.rotation_error.items():
+            if node < model.node_slots:
+                self.rotation_error[node] = float(angle)
+
+        budget = compute_link_budget(model, cfg.attenuation_db_per_km, cfg.min_attempt_time,
+                                     length_km=link_lengths)
+        # Pumping is evaluated for every link at once; a link then heralds
+        # purified pairs, with its success probability scaled by the yield
+        states, pair_yield = pumped_links(np.full(len(budget), cfg.initial_fidelity),
+                                          cfg.purification_rounds, cfg.purification)
+        self.set_links(budget.source, budget.target, budget.success_probability * pair_yield,
+                       budget.attempt_time, states,
+                       link_representation(cfg.purification, cfg.purification_rounds))
+
+    def _load_traffic(self, model):
+        # Each demand has one arrival event in flight and a bounded backlog
+        # of waiting requests (arrival ticks), so memory does not grow with
+        # the simulated horizon
+        demands = [d for d in self.config.traffic
+                   if model.has_node(d.source) and model.has_node(d.target) and d.source != d.target]
+        rngs = demand_rngs(self.rng, len(demands)) if demands else []
+        self.demand_arrivals = [d.arrivals(rng) for d, rng in zip(demands, rngs)]
+        self.demand_limit = [max(int(d.max_pending), 1) for d in demands]
+        self.backlog = [deque() for _ in demands]
+        self.parked = [False] * len(demands)
+        self.demands_at = {}
+        for i, d in enumerate(demands):
+            self.demands_at.setdefault((d.source, d.target), []).append(i)
+            self.demands_at.setdefault((d.target, d.source), []).append(i)
+        for i in range(len(demands)):
+            self._next_request(i)
+
+    def set_links(self, src, dst, success, attempt_time, states=None, representation=WERNER):
+        """
+        Install per-link endpoints, heralding success probability, attempt
+        time and the Bell-diagonal state of delivered pairs (default: Werner
+        at config.initial_fidelity, kept in `representation`), share each
+        node's qubits among its ports and start every link.
+        Must be called before run().
+        """
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        self.link_a = src.tolist()
+        self.link_b = dst.tolist()
+        success = np.clip(np.asarray(success, dtype=np.float64), 0.0, 1.0)
+        # log(1 - p) for the geometric draw; -inf marks certain success
+        with np.errstate(divide="ignore"):
+            self.link_log_fail = np.log1p(-success).tolist()
+        self.link_attempt_ticks = np.maximum(
+            np.rint(np.asarray(attempt_time) * TICKS_PER_SECOND), 1).astype(np.int64).tolist()
+        self.link_busy = [False] * len(src)
+        if states is None:
+            states = pumped_links(np.full(len(src), self.config.initial_fidelity), 0, "none")[0]
+        self.link_representation = representation
+        if representation == WERNER:
+            self.link_state = ((4.0 * states[:, 0] - 1.0) / 3.0).tolist()
+        else:
+            self.link_state = list(states)
+
+        # Port 2*link is the link's qubit share at link_a, 2*link + 1 at link_b.
+        # A node with q qubits and d ports gives q // d to each, plus one more
+        # to the first q % d ports.
+        port_node = np.empty(2 * len(src), dtype=np.int64)
+        port_node[0::2] = src
+        port_node[1::2] = dst
+        order = np.argsort(port_node, kind="stable")
+        degree = np.bincount(port_node, minlength=len(self.num_qubits))
+        first = np.cumsum(degree) - degree
+        rank = np.empty_like(port_node)
+        rank[order] = np.arange(len(port_node)) - first[port_node[order]]
+        qubits = self.num_qubits[port_node]
+        degree = degree[port_node]
+        self.port_free = (qubits // np.maximum(degree, 1) + (rank < qubits % np.maximum(degree, 1))).tolist()
+
+        for link in range(len(src)):
+            self._start_link(link)
+
+    def _uniform(self):
+        # Draw random numbers in blocks; one NumPy call per 64k events
+        if not self._uniforms:
+            self._uniforms = self.rng.random(65536).tolist()
+        return self._uniforms.pop()
+
+    # ------------------------------------------------------------------
+    # Links and pairs
+    # ------------------------------------------------------------------
+    def _start_link(self, link):
+        if self.link_busy[link]:
+            return
+        log_fail = self.link_log_fail[link]
+        port_free = self.port_free
+        if log_fail == 0.0 or port_free[2 * link] < 1 or port_free[2 * link + 1] < 1:
+            return  # dead link or no memory to store into
+        if log_fail == -math.inf:
+            attempts = 1
+        else:
+            attempts = 1 + int(math.log(1.0 - self._uniform()) / log_fail)
+        port_free[2 * link] -= 1
+        port_free[2 * link + 1] -= 1
+        self.link_busy[link] = True
+        self.queue.schedule(attempts * self.link_attempt_ticks[link], LINK_DONE, link)
+
+    def _release_port(self, port):
+        self.port_free[port] += 1
+        self._start_link(port >> 1)
+
+    def _new_pair(self, a, b, port_a, port_b, state, t):
+        if self._free_pairs:
+            pair = self._free_pairs.pop()
+            self.pair_a[pair] = a
+            self.pair_b[pair] = b
+            self.pair_port_a[pair] = port_a
+            self.pair_port_b[pair] = port_b
+            self.pair_state[pair] = state
+            self.pair_t[pair] = t
+        else:
+            pair = len(self.pair_a)
+            self.pair_a.append(a)
+            self.pair_b.append(b)
+            self.pair_port_a.append(port_a)
+            self.pair_port_b.append(port_b)
+            self.pair_state.append(state)
+            self.pair_t.append(t)
+            self.pair_timer.append(0)
+        cutoff = min(self.cutoff[a], self.cutoff[b])
+        self.pair_timer[pair] = self.queue.schedule(
+            max(int(cutoff * TICKS_PER_SECOND), 1), PAIR_EXPIRED, pair)
+        self.held[a].append(pair)
+        self.held[b].append(pair)
+        return pair
+
+    def _drop_pair(self, pair):
+        self.held[self.pair_a[pair]].remove(pair)
+        self.held[self.pair_b[pair]].remove(pair)
+        self._free_pairs.append(pair)
+        return self.pair_port_a[pair], self.pair_port_b[pair]
+
+    def _end(self, pair, node):
+        """(far node, port at node, port at far node) of a pair seen from `node`."""
+        if self.pair_a[pair] == node:
+            return self.pair_b[pair], self.pair_port_a[pair], self.pair_port_b[pair]
+        return self.pair_a[pair], self.pair_port_b[pair], self.pair_port_a[pair]
+
+    def _state_at(self, pair, t):
+        """Depolarize a stored pair's state up to time t (seconds) and return its handle."""
+        state = self.pair_state[pair]
+        age = t - self.pair_t[pair]
+        if age > 0:
+            rate = self.decay_rate[self.pair_a[pair]] + self.decay_rate[self.pair_b[pair]]
+            self.states.depolarize(state, math.exp(-age * rate))
+            self.pair_t[pair] = t
+        return state
+
+    def _settle(self, pair, t):
+        """Swap or deliver a freshly created pair, following the chain of swaps it causes."""
+        work = [pair]
+        while work:
+            pair = work.pop()
+            a = self.pair_a[pair]
+            b = self.pair_b[pair]
+            if not self.is_repeater[a] and not self.is_repeater[b]:
+                self._deliver(pair, t)
+                continue
+            for node in (a, b):
+                if self.is_repeater[node]:
+                    swapped = self._try_swap(node, pair, t)
+                    if swapped is not None:
+                        if swapped >= 0:
+                            work.append(swapped)
+                        break
+
+    def _deliver(self, pair, t):
+        state = self._state_at(pair, t)
+        self.result.delivered += 1
+        self.result.fidelity_sum += self.states.fidelity(state)
+        if self.demands_at:
+            self._serve(self.pair_a[pair], self.pair_b[pair])
+        self.states.release(state)
+        self.queue.cancel(self.pair_timer[pair])
+        port_a, port_b = self._drop_pair(pair)
+        self._release_port(port_a)
+        self._release_port(port_b)
+
+    def _try_swap(self, node, pair, t):
+        """
+        Swap `pair` at repeater `node` with another stored pair that arrived
+        over a different link and reaches a different node. Returns the new
+        pair, -1 if the swap failed, or None if no partner was available.
+        """
+        far, port, far_port = self._end(pair, node)
+        link = port >> 1
+        partner = None
+        for other in self.held[node]:
+            other_far, other_port, _ = self._end(other, node)
+            if other_port >> 1 != link and other_far != far:
+                partner = other
+                break
+        if partner is None:
+            return None
+
+        other_far, other_port, other_far_port = self._end(partner, node)
+        first = self._state_at(pair, t)
+        second = self._state_at(partner, t)
+        # Orient the pairs as (far, node) and (node, other_far); only matters
+        # for density matrices, flip() leaves the symmetric forms alone
+        if self.pair_a[pair] == node:
+            self.states.flip(first)
+        if self.pair_b[partner] == node:
+            self.states.flip(second)
+        angle = self.rotation_error[node]
+        if angle:
+            self.states.apply_local_unitary(first, rotation_z(angle), 1)
+            self.states.apply_local_unitary(second, rotation_z(angle), 0)
+        state = self.states.swap(first, second)
+        self.queue.cancel(self.pair_timer[pair])
+        self.queue.cancel(self.pair_timer[partner])
+        self._drop_pair(pair)
+        self._drop_pair(partner)
+
+        # Both of the repeater's qubits are measured out and become free
+        self.result.swaps += 1
+        self._release_port(port)
+        self._release_port(other_port)
+        if self._uniform() < self.config.swap_success:
+            return self._new_pair(far, other_far, far_port, other_far_port, state, t)
+
+        self.states.release(state)
+        self.result.failed_swaps += 1
+        self._release_port(far_port)
+        self._release_port(other_far_port)
+        return -1
+
+    # ------------------------------------------------------------------
+    # Traffic
+    # ------------------------------------------------------------------
+    def _next_request(self, demand):
+        """
+        Pull the demand's next arrival and schedule it, unless its backlog is
+        full: then the generator is parked (backpressure) until _serve frees
+        a place, and the arrival it yields next is delayed to that moment.
+        """
+        if len(self.backlog[demand]) >= self.demand_limit[demand]:
+            self.parked[demand] = True
+            return
+        self.parked[demand] = False
+        arrival = next(self.demand_arrivals[demand], None)
+        if arrival is None:
+            return  # trace exhausted
+        tick = int(arrival * TICKS_PER_SECOND)
+        if tick < self.queue.now:
+            tick = self.queue.now
+            self.result.throttled += 1
+        self.queue.schedule_at(tick, REQUEST, demand)
+
+    def _serve(self, a, b):
+        now = self.queue.now
+        for demand in self.demands_at.get((a, b), ()):
+            backlog = self.backlog[demand]
+            if backlog:
+                self.result.served += 1
+                self.result.latency_sum += (now - backlog.popleft()) / TICKS_PER_SECOND
+                if self.parked[demand]:
+                    self._next_request(demand)
+                return
+
+    def _on_request(self, demand, t):
+        self.result.requests += 1
+        self.backlog[demand].append(self.queue.now)
+        self._next_request(demand)
+
+    # ------------------------------------------------------------------
+    # Event handlers
+    # ------------------------------------------------------------------
+    def _on_link_done(self, link, t):
+        self.link_busy[link] = False
+        self.result.generated += 1
+        a = self.link_a[link]
+        b = self.link_b[link]
+        if self.tableau:
+            state = self.states.new_pair(a, b, self.link_representation, self.link_state[link])
+        else:
+            state = self.states.new(self.link_representation, self.link_state[link].copy()
+                                    if self.link_representation != WERNER else self.link_state[link])
+        pair = self._new_pair(a, b, 2 * link, 2 * link + 1, state, t)
+        self._start_link(link)
+        self._settle(pair, t)
+
+    def _on_pair_expired(self, pair, t):
+        self.states.release(self.pair_state[pair])
+        port_a, port_b = self._drop_pair(pair)
+        self.result.expired += 1
+        self._release_port(port_a)
+        self._release_port(port_b)
+
+    # ------------------------------------------------------------------
+    # Main loop
+    # ------------------------------------------------------------------
+    def cancel(self):
+        """Ask a running run() to stop after its current batch. Safe to call from any thread."""
+        self.cancelled = True
+
+    def run(self, until=None, progress=None, report_interval=0.25):
+        """
+        Process events up to `until` seconds (default: config.duration) and
+        return the result. `progress(fraction, result)` is called roughly
+        every `report_interval` wall-clock seconds; cancel() ends the run
+        early, leaving the counters gathered so far.
+        """
+        if until is None:
+            until = self.config.duration
+        start_tick = self.queue.now
+        until_tick = int(until * TICKS_PER_SECOND)
+        span = max(until_tick - start_tick, 1)
+        queue = self.queue
+        result = self.result
+        kinds = queue.kinds
+        args = queue.args
+        on_link_done = self._on_link_done
+        on_pair_expired = self._on_pair_expired
+        on_request = self._on_request
+        slots = []
+
+        started = time.perf_counter()
+        next_report = started + report_interval
+        # Only look at the clock and the cancel flag every CHECK_EVERY events
+        next_check = result.events + CHECK_EVERY
+        while True:
+            tick = queue.pop_batch(slots, until_tick)
+            if tick is None:
+                queue.now = max(queue.now, until_tick)
+                break
+            t = tick / TICKS_PER_SECOND
+            # An event may cancel a later one of the same batch, so read kinds lazily
+            for slot in slots:
+                kind = kinds[slot]
+                if kind == LINK_DONE:
+                    on_link_done(args[slot], t)
+                elif kind == PAIR_EXPIRED:
+                    on_pair_expired(args[slot], t)
+                elif kind == REQUEST:
+                    on_request(args[slot], t)
+            result.events += len(slots)
+
+            if result.events >= next_check:
+                next_check = result.events + CHECK_EVERY
+                if self.cancelled:
+                    queue.retire(slots)
+                    break
+                now = time.perf_counter()
+                if progress is not None and now >= next_report:
+                    next_report = now + report_interval
+                    result.simulated_time = tick / TICKS_PER_SECOND
+                    result.wall_time += now - started
+                    started = now
+                    progress((tick - start_tick) / span, result)
+
+        result.simulated_time = queue.now / TICKS_PER_SECOND
+        result.wall_time += time.perf_counter() - started
+        return result
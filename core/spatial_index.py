@@ -0,0 +1,135 @@
+# core/spatial_index.py
+
+import math
+
+import numpy as np
+
+from core.network_model import NODES_ADDED, NODES_MOVED, NODES_REMOVED, RESET
+
+
+class GridIndex:
+    """
+    Uniform-grid spatial index over the node positions of a NetworkModel.
+
+    Each node sits in the bucket of the square cell containing it. The
+    index listens to the model, so adds, removals and moves (including
+    every step of a drag, reported through set_position) update only the
+    cells involved. Point queries look at the few cells around the point;
+    rectangle queries gather the covered cells, or scan the coordinate
+    columns with NumPy when the rectangle covers most of the grid.
+    """
+    def __init__(self, model, cell_size=100.0):
+        self.model = model
+        self.cell_size = float(cell_size)
+        self._cells = {}      # (cx, cy) -> set of node ids
+        self._cell_of = {}    # node id -> (cx, cy)
+        model.add_listener(self._on_model_change)
+        self.rebuild()
+
+    def close(self):
+        self.model.remove_listener(self._on_model_change)
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def rebuild(self):
+        self._cells.clear()
+        self._cell_of.clear()
+        self._insert(self.model.node_ids())
+
+    def _cells_for(self, ids):
+        x = self.model.nodes["x"][ids]
+        y = self.model.nodes["y"][ids]
+        return (np.floor(x / self.cell_size).astype(np.int64).tolist(),
+                np.floor(y / self.cell_size).astype(np.int64).tolist())
+
+    def _insert(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        cells = self._cells
+        for node, cx, cy in zip(ids.tolist(), *self._cells_for(ids)):
+            key = (cx, cy)
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = bucket = set()
+            bucket.add(node)
+            self._cell_of[node] = key
+
+    def _remove(self, ids):
+        for node in ids:
+            key = self._cell_of.pop(node, None)
+            if key is not None:
+                bucket = self._cells[key]
+                bucket.discard(node)
+                if not bucket:
+                    del self._cells[key]
+
+    def _move(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        for node, cx, cy in zip(ids.tolist(), *self._cells_for(ids)):
+            key = (cx, cy)
+            old = self._cell_of.get(node)
+            if old == key or old is None:
+                continue
+            bucket = self._cells[old]
+            bucket.discard(node)
+            if not bucket:
+                del self._cells[old]
+            self._cells.setdefault(key, set()).add(node)
+            self._cell_of[node] = key
+
+    def _on_model_change(self, event, ids, name):
+        if event == NODES_ADDED:
+            self._insert(ids)
+        elif event == NODES_REMOVED:
+            self._remove(ids.tolist())
+        elif event == NODES_MOVED:
+            self._move(ids)
+        elif event == RESET:
+            self.rebuild()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _gather(self, cx0, cy0, cx1, cy1):
+        """Nodes in the cell range; all live nodes when the range spans more cells than are occupied."""
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self._cells):
+            return self.model.node_ids()
+        candidates = []
+        cells = self._cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    candidates.extend(bucket)
+        return np.array(candidates, dtype=np.int64)
+
+    def nodes_in_rect(self, x0, y0, x1, y1):
+        """Ids of the nodes inside the rectangle (corners in any order), ascending."""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        s = self.cell_size
+        cx0, cx1 = math.floor(x0 / s), math.floor(x1 / s)
+        cy0, cy1 = math.floor(y0 / s), math.floor(y1 / s)
+        candidates = np.sort(self._gather(cx0, cy0, cx1, cy1))
+        x = self.model.nodes["x"][candidates]
+        y = self.model.nodes["y"][candidates]
+        return candidates[(x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)]
+
+    def nodes_near(self, x, y, radius):
+        """Ids of the nodes within `radius` of (x, y), nearest first."""
+        s = self.cell_size
+        candidates = self._gather(math.floor((x - radius) / s), math.floor((y - radius) / s),
+                                  math.floor((x + radius) / s), math.floor((y + radius) / s))
+        if len(candidates) == 0:
+            return candidates
+        d = np.hypot(self.model.nodes["x"][candidates] - x, self.model.nodes["y"][candidates] - y)
+        order = np.argsort(d, kind="stable")
+        return candidates[order][d[order] <= radius]
+
+    def nearest(self, x, y, max_distance):
+        """The node closest to (x, y) within `max_distance`, or None."""
+        near = self.nodes_near(x, y, max_distance)
+        return int(near[0]) if len(near) else None
@@ -0,0 +1,340 @@
+# core/stabilizer.py
+
+import numpy as np
+
+from core.pair_states import BELL_DIAGONAL, WERNER
+
+WORD_BITS = 64
+
+
+def _popcount(words):
+    """Number of set bits per row of a 2-D uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    as_bytes = words.view(np.uint8).reshape(*words.shape[:-1], -1)
+    return np.unpackbits(as_bytes, axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+def _product_phase(x1, z1, x2, z2):
+    """
+    Row-wise sum of CHP's g function: the power of i picked up when Pauli
+    row (x1, z1) multiplies row (x2, z2), as popcounts of +1 and -1 terms.
+    """
+    y1 = x1 & z1
+    only_x1 = x1 & ~z1
+    only_z1 = z1 & ~x1
+    plus = (y1 & z2 & ~x2) | (only_x1 & z2 & x2) | (only_z1 & x2 & ~z2)
+    minus = (y1 & x2 & ~z2) | (only_x1 & z2 & ~x2) | (only_z1 & x2 & z2)
+    return _popcount(plus) - _popcount(minus)
+
+
+def node_qubit_offsets(model):
+    """
+    Lay the qubits of every node slot of a NetworkModel out in one register:
+    node i owns qubits offsets[i] to offsets[i + 1] - 1 (dead nodes own none).
+    """
+    qubits = np.where(model.node_mask(), model.column("num_qubits"), 0).astype(np.int64)
+    offsets = np.zeros(len(qubits) + 1, dtype=np.int64)
+    np.cumsum(qubits, out=offsets[1:])
+    return offsets
+
+
+class StabilizerState:
+    """
+    Clifford simulation of n qubits with the Aaronson-Gottesman tableau.
+
+    Rows 0..n-1 are destabilizers, rows n..2n-1 stabilizers, each a Pauli
+    string stored as packed X and Z bit rows (64 qubits per uint64 word)
+    plus a sign bit. A gate touches one bit column of every row at once,
+    and the row products needed by measurement XOR whole packed rows and
+    count phases with popcounts, so memory is O(n^2 / 64) bits and each
+    gate or measurement is O(n) or O(n^2 / 64) word operations.
+    """
+    def __init__(self, num_qubits, rng=None):
+        n = int(num_qubits)
+        self.num_qubits = n
+        self.words = max((n + WORD_BITS - 1) // WORD_BITS, 1)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.x = np.zeros((2 * n, self.words), dtype=np.uint64)
+        self.z = np.zeros((2 * n, self.words), dtype=np.uint64)
+        self.r = np.zeros(2 * n, dtype=np.uint8)
+        # Start in |0...0>: destabilizer i is X_i, stabilizer i is Z_i
+        rows = np.arange(n)
+        self.x[rows, rows // WORD_BITS] = np.left_shift(np.uint64(1), (rows % WORD_BITS).astype(np.uint64))
+        self.z[rows + n, rows // WORD_BITS] = self.x[rows, rows // WORD_BITS]
+
+    # ------------------------------------------------------------------
+    # Bit columns
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _locate(qubit):
+        return qubit // WORD_BITS, np.uint64(1) << np.uint64(qubit % WORD_BITS)
+
+    def _column(self, bits, qubit):
+        word, mask = self._locate(qubit)
+        return (bits[:, word] & mask) != 0
+
+    def _set_column(self, bits, qubit, values):
+        word, mask = self._locate(qubit)
+        bits[:, word] = np.where(values, bits[:, word] | mask, bits[:, word] & ~mask)
+
+    # ------------------------------------------------------------------
+    # Clifford gates
+    # ------------------------------------------------------------------
+    def h(self, a):
+        xa = self._column(self.x, a)
+        za = self._column(self.z, a)
+        self.r ^= (xa & za).astype(np.uint8)
+        self._set_column(self.x, a, za)
+        self._set_column(self.z, a, xa)
+
+    def s(self, a):
+        xa = self._column(self.x, a)
+        za = self._column(self.z, a)
+        self.r ^= (xa & za).astype(np.uint8)
+        self._set_column(self.z, a, za ^ xa)
+
+    def cnot(self, control, target):
+        xa = self._column(self.x, control)
+        za = self._column(self.z, control)
+        xb = self._column(self.x, target)
+        zb = self._column(self.z, target)
+        self.r ^= (xa & zb & ~(xb ^ za)).astype(np.uint8)
+        self._set_column(self.x, target, xb ^ xa)
+        self._set_column(self.z, control, za ^ zb)
+
+    def cz(self, a, b):
+        self.h(b)
+        self.cnot(a, b)
+        self.h(b)
+
+    def x_gate(self, a):
+        self.r ^= self._column(self.z, a).astype(np.uint8)
+
+    def z_gate(self, a):
+        self.r ^= self._column(self.x, a).astype(np.uint8)
+
+    def y_gate(self, a):
+        self.r ^= (self._column(self.x, a) ^ self._column(self.z, a)).astype(np.uint8)
+
+    # ------------------------------------------------------------------
+    # Measurement
+    # ------------------------------------------------------------------
+    def _rowsum(self, targets, source_x, source_z, source_r):
+        """Multiply the Pauli rows `targets` (index array) by the source row in place."""
+        x2 = self.x[targets]
+        z2 = self.z[targets]
+        phase = (2 * self.r[targets].astype(np.int64) + 2 * int(source_r)
+                 + _product_phase(source_x, source_z, x2, z2))
+        self.r[targets] = (np.mod(phase, 4) // 2).astype(np.uint8)
+        self.x[targets] = x2 ^ source_x
+        self.z[targets] = z2 ^ source_z
+
+    def measure(self, a):
+        """Measure qubit `a` in the Z basis and return the outcome (0 or 1)."""
+        n = self.num_qubits
+        xa = self._column(self.x, a)
+        anticommuting = np.flatnonzero(xa[n:])
+        if len(anticommuting):
+            # Random outcome: stabilizer p anticommutes with Z_a
+            p = n + anticommuting[0]
+            others = np.flatnonzero(xa)
+            others = others[others != p]
+            if len(others):
+                self._rowsum(others, self.x[p], self.z[p], self.r[p])
+            self.x[p - n] = self.x[p]
+            self.z[p - n] = self.z[p]
+            self.r[p - n] = self.r[p]
+            self.x[p] = 0
+            self.z[p] = 0
+            word, mask = self._locate(a)
+            self.z[p, word] = mask
+            outcome = int(self.rng.integers(2))
+            self.r[p] = outcome
+            return outcome
+
+        # Deterministic outcome: multiply together the stabilizers whose
+        # destabilizers anticommute with Z_a, in a scratch row
+        scratch_x = np.zeros((1, self.words), dtype=np.uint64)
+        scratch_z = np.zeros((1, self.words), dtype=np.uint64)
+        scratch_r = 0
+        for i in np.flatnonzero(xa[:n]) + n:
+            phase = (2 * scratch_r + 2 * int(self.r[i])
+                     + int(_product_phase(self.x[i], self.z[i], scratch_x, scratch_z)[0]))
+            scratch_r = (phase % 4) // 2
+            scratch_x = scratch_x ^ self.x[i]
+            scratch_z = scratch_z ^ self.z[i]
+        return scratch_r
+
+    def reset(self, a):
+        """Put qubit `a` back into |0>."""
+        if self.measure(a):
+            self.x_gate(a)
+
+    # ------------------------------------------------------------------
+    # Network protocols
+    # ------------------------------------------------------------------
+    def bell_pair(self, a, b):
+        """Prepare qubits a and b (assumed |0>) in |Phi+>."""
+        self.h(a)
+        self.cnot(a, b)
+
+    def bell_measurement(self, a, b):
+        """Measure a and b in the Bell basis; returns the (Z-type, X-type) correction bits."""
+        self.cnot(a, b)
+        self.h(a)
+        return self.measure(a), self.measure(b)
+
+    def swap_entanglement(self, a, b, far_a, far_b):
+        """
+        Entanglement swapping: with |Phi+> on (far_a, a) and (b, far_b), a
+        Bell measurement on a and b plus Pauli corrections on far_b leaves
+        (far_a, far_b) in |Phi+>. Returns the measurement bits.
+        """
+        z_fix, x_fix = self.bell_measurement(a, b)
+        if x_fix:
+            self.x_gate(far_b)
+        if z_fix:
+            self.z_gate(far_b)
+        return z_fix, x_fix
+
+    def ghz(self, qubits):
+        """Prepare the given qubits (assumed |0>) in a GHZ state."""
+        qubits = list(qubits)
+        self.h(qubits[0])
+        for target in qubits[1:]:
+            self.cnot(qubits[0], target)
+
+    def stabilizers(self):
+        """The stabilizer generators as Pauli strings such as '+XXI' (for inspection)."""
+        n = self.num_qubits
+        letters = np.array(["I", "X", "Z", "Y"])
+        out = []
+        for row in range(n, 2 * n):
+            xs = np.array([self._column(self.x[row:row + 1], q)[0] for q in range(n)], dtype=int)
+            zs = np.array([self._column(self.z[row:row + 1], q)[0] for q in range(n)], dtype=int)
+            out.append(("-" if self.r[row] else "+") + "".join(letters[xs + 2 * zs]))
+        return out
+
+
+class TableauPairStore:
+    """
+    Stand-in for core.pair_states.PairStore that keeps every pair as two
+    real qubits of one StabilizerState spanning the network's memories
+    (laid out by node_qubit_offsets). Used by Simulation with
+    config.backend == "stabilizer".
+
+    Mixed states become sampled Pauli errors: a Werner or Bell-diagonal
+    link state puts I, Y, X or Z on one qubit of a fresh |Phi+> with the
+    state's weights, and depolarizing by `factor` applies a uniformly
+    random Pauli with probability 1 - factor. Swaps are actual Bell
+    measurements with corrections. fidelity() is a destructive sample: it
+    Bell-measures the pair and returns 1.0 if it was found in |Phi+>, so
+    averages over delivered pairs estimate the fidelity. Local unitaries
+    outside the Clifford group (rotation_error) cannot be represented.
+    """
+    # Bell-diagonal index (Phi+, Psi-, Psi+, Phi-) -> Pauli error I, Y, X, Z
+    _ERRORS = (None, "y_gate", "x_gate", "z_gate")
+
+    def __init__(self, offsets, rng):
+        self.rng = rng
+        self.tableau = StabilizerState(int(offsets[-1]), rng)
+        self.node_of = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets)).tolist()
+        # Free qubits per node, taken from the end
+        self.free = [list(range(int(offsets[i + 1]) - 1, int(offsets[i]) - 1, -1))
+                     for i in range(len(offsets) - 1)]
+        self.qa = []
+        self.qb = []
+        self.measured = []
+        self._free = []
+
+    def __len__(self):
+        return len(self.qa) - len(self._free)
+
+    def _error(self, qubit, index):
+        if index:
+            getattr(self.tableau, self._ERRORS[index])(qubit)
+
+    def _handle(self, qa, qb):
+        if self._free:
+            handle = self._free.pop()
+            self.qa[handle] = qa
+            self.qb[handle] = qb
+            self.measured[handle] = False
+        else:
+            handle = len(self.qa)
+            self.qa.append(qa)
+            self.qb.append(qb)
+            self.measured.append(False)
+        return handle
+
+    def new_pair(self, node_a, node_b, rep, value):
+        """A fresh pair between free qubits of node_a and node_b, in link state `value` of representation `rep`."""
+        qa = self.free[node_a].pop()
+        qb = self.free[node_b].pop()
+        self.tableau.bell_pair(qa, qb)
+        if rep == WERNER:
+            if self.rng.random() >= value:
+                self._error(qa, int(self.rng.integers(4)))
+        elif rep == BELL_DIAGONAL:
+            weights = np.clip(value, 0.0, None)
+            self._error(qa, int(self.rng.choice(4, p=weights / weights.sum())))
+        else:
+            raise ValueError("The stabilizer backend only holds Werner and Bell-diagonal link states")
+        return self._handle(qa, qb)
+
+    def _reset(self, qubit):
+        self.tableau.reset(qubit)
+        self.free[self.node_of[qubit]].append(qubit)
+
+    def release(self, handle):
+        """Return the pair's qubits to their nodes, reset to |0>."""
+        for qubit in (self.qa[handle], self.qb[handle]):
+            if self.measured[handle]:
+                self.free[self.node_of[qubit]].append(qubit)
+            else:
+                self._reset(qubit)
+        self._free.append(handle)
+
+    def flip(self, handle):
+        self.qa[handle], self.qb[handle] = self.qb[handle], self.qa[handle]
+
+    def fidelity(self, handle):
+        """Sampled and destructive: 1.0 if a Bell measurement finds the pair in |Phi+>, else 0.0."""
+        qa, qb = self.qa[handle], self.qb[handle]
+        z_bit, x_bit = self.tableau.bell_measurement(qa, qb)
+        # Leave both measured qubits in |0> for release()
+        if z_bit:
+            self.tableau.x_gate(qa)
+        if x_bit:
+            self.tableau.x_gate(qb)
+        self.measured[handle] = True
+        return 0.0 if z_bit or x_bit else 1.0
+
+    def depolarize(self, handle, factor):
+        """With probability 1 - factor, a uniformly random Pauli on one qubit (the pair becomes maximally mixed)."""
+        if self.rng.random() >= factor:
+            self._error(self.qa[handle], int(self.rng.integers(4)))
+
+    def apply_local_unitary(self, handle, unitary, side):
+        raise ValueError("The stabilizer backend cannot apply non-Clifford rotations")
+
+    def swap(self, first, second):
+        """
+        Bell-measure the middle qubits of (far, node) and (node, other far)
+        and correct the second far qubit. Consumes both inputs and returns
+        the new handle, with the first pair's far qubit on side 0.
+        """
+        far_a, mid_a = self.qa[first], self.qb[first]
+        mid_b, far_b = self.qa[second], self.qb[second]
+        z_bit, x_bit = self.tableau.swap_entanglement(mid_a, mid_b, far_a, far_b)
+        # The measured middle qubits read z_bit and x_bit; flip them back to |0>
+        if z_bit:
+            self.tableau.x_gate(mid_a)
+        if x_bit:
+            self.tableau.x_gate(mid_b)
+        self.free[self.node_of[mid_a]].append(mid_a)
+        self.free[self.node_of[mid_b]].append(mid_b)
+        self._free.append(first)
+        self._free.append(second)
+        return self._handle(far_a, far_b)
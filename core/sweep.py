@@ -0,0 +1,415 @@
+# core/sweep.py
+
+import copy
+import csv
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+
+from core.link_physics import link_lengths
+from core.monte_carlo import METRICS, RunningStats, trial_metrics
+from core.network_model import CATEGORICAL_COLUMNS, NODE_COLUMNS
+from core.purification import PROTOCOLS
+from core.routing import PathCache, path_fidelity
+from core.simulation import BACKENDS, Simulation, SimulationConfig
+
+# Parameter sweeps: a SweepSpec names node properties and SimulationConfig
+# fields and how to vary them (a full grid, or a Latin-hypercube sample of
+# their ranges); Sweep runs every design point in a process pool and
+# collects one row of metrics per point into a SweepStore.
+
+# Sweepable node properties and SimulationConfig fields
+NODE_PARAMETERS = tuple(name for name in NODE_COLUMNS if name not in ("x", "y"))
+CONFIG_PARAMETERS = tuple(f.name for f in fields(SimulationConfig)
+                          if f.name not in ("rotation_error", "traffic", "seed"))
+CONFIG_CHOICES = {"purification": PROTOCOLS, "backend": BACKENDS}
+INTEGER_PARAMETERS = {"num_qubits", "purification_rounds"}
+
+DESIGNS = ("grid", "lhs")
+
+# Columns of a point's results: the Monte Carlo statistics over its trials,
+# then the best-route quality of config.traffic's demands (NaN without
+# traffic or routes), then the point's wall time in its worker
+POINT_METRICS = (("trials",) + METRICS + tuple(name + "_std" for name in METRICS)
+                 + ("route_fidelity", "route_hops", "wall_time"))
+
+# A running sweep rewrites its store file at most this often (seconds)
+SAVE_INTERVAL = 5.0
+
+
+def _choices(name):
+    return CATEGORICAL_COLUMNS.get(name) or CONFIG_CHOICES.get(name)
+
+
+def parameter_value(name, value):
+    """Check and convert one value of parameter `name` (from text or a number)."""
+    choices = _choices(name)
+    if choices is not None:
+        value = str(value).strip()
+        if value not in choices:
+            raise ValueError(f"Unknown {name} {value!r} (one of {', '.join(choices)})")
+        return value
+    number = float(value)
+    return int(round(number)) if name in INTEGER_PARAMETERS else number
+
+
+@dataclass
+class SweepParameter:
+    """
+    One swept quantity: a node property (set on `nodes`, or on every live
+    node when None) or a SimulationConfig field. It takes the listed
+    `values`, or spans [low, high], log-uniformly with `log`: a grid
+    splits the range into SweepSpec.samples steps, a Latin hypercube
+    draws from it.
+    """
+    name: str
+    values: list = None
+    low: float = None
+    high: float = None
+    log: bool = False
+    nodes: list = None
+
+    def __post_init__(self):
+        if self.name not in NODE_PARAMETERS + CONFIG_PARAMETERS:
+            raise ValueError(f"Cannot sweep {self.name!r} (one of "
+                             f"{', '.join(NODE_PARAMETERS + CONFIG_PARAMETERS)})")
+        if self.values is not None:
+            self.values = [parameter_value(self.name, v) for v in self.values]
+            if not self.values:
+                raise ValueError(f"No values given for {self.name}")
+            return
+        if _choices(self.name) is not None:
+            raise ValueError(f"{self.name} takes a list of values, not a range")
+        if self.low is None or self.high is None or self.low > self.high:
+            raise ValueError(f"{self.name} needs values or a range low..high")
+        if self.log and self.low <= 0:
+            raise ValueError(f"A log range of {self.name} must be positive")
+
+    @classmethod
+    def parse(cls, name, text, nodes=None):
+        """From text: 'v1, v2, ...', or a range 'low..high', with ':log' for log spacing."""
+        text, _, spacing = text.strip().partition(":")
+        log = spacing.strip().lower() == "log"
+        if spacing and not log:
+            raise ValueError(f"Unknown spacing {spacing!r} for {name} (only 'log')")
+        low, sep, high = text.partition("..")
+        if sep:
+            return cls(name, low=float(low), high=float(high), log=log, nodes=nodes)
+        return cls(name, values=[v for v in text.split(",") if v.strip()], nodes=nodes)
+
+    @property
+    def is_node_property(self):
+        return self.name in NODE_PARAMETERS
+
+    def _span(self, u):
+        """Map u in [0, 1] onto the range; u = 0 and 1 give low and high exactly."""
+        if self.log:
+            value = np.exp(np.log(self.low) + u * (np.log(self.high) - np.log(self.low)))
+        else:
+            value = self.low + u * (self.high - self.low)
+        value = np.where(u <= 0.0, self.low, np.where(u >= 1.0, self.high, value))
+        return np.rint(value) if self.name in INTEGER_PARAMETERS else value
+
+    def grid_values(self, steps):
+        if self.values is not None:
+            return list(self.values)
+        steps = max(int(steps), 1)
+        if self.log:
+            value = np.geomspace(self.low, self.high, steps)
+        else:
+            value = np.linspace(self.low, self.high, steps)
+        if self.name in INTEGER_PARAMETERS:
+            value = np.rint(value)
+        return [parameter_value(self.name, v) for v in value.tolist()]
+
+    def sample(self, u):
+        """Values for stratified uniforms `u` (a Latin-hypercube column)."""
+        if self.values is not None:
+            index = np.minimum((u * len(self.values)).astype(np.int64), len(self.values) - 1)
+            return [self.values[i] for i in index.tolist()]
+        return [parameter_value(self.name, v) for v in self._span(u).tolist()]
+
+
+@dataclass
+class SweepSpec:
+    """
+    What to sweep and how: `parameters` (SweepParameter) combined as a full
+    "grid" or an "lhs" (Latin hypercube) of `samples` points, each point
+    simulated `trials` times. `samples` is also the number of steps a grid
+    splits each range into. `seed` fixes the design and every trial.
+    """
+    parameters: list
+    design: str = "grid"
+    samples: int = 10
+    trials: int = 1
+    seed: int = None
+
+    def __post_init__(self):
+        if self.design not in DESIGNS:
+            raise ValueError(f"Unknown sweep design {self.design!r}")
+        if not self.parameters:
+            raise ValueError("A sweep needs at least one parameter")
+        names = [p.name for p in self.parameters]
+        if len(set(names)) != len(names):
+            raise ValueError("Each parameter can only be swept once")
+        self.samples = max(int(self.samples), 1)
+        self.trials = max(int(self.trials), 1)
+
+    def points(self, rng):
+        """The design: {parameter name: array with one value per point}."""
+        if self.design == "grid":
+            axes = [p.grid_values(self.samples) for p in self.parameters]
+            rows = list(itertools.product(*axes))
+            columns = zip(*rows)
+        else:
+            n = self.samples
+            # One stratum per point on every axis, strata paired at random
+            columns = [p.sample((rng.permutation(n) + rng.random(n)) / n) for p in self.parameters]
+        return {p.name: np.asarray(column) for p, column in zip(self.parameters, columns)}
+
+
+class SweepStore:
+    """
+    Results of a sweep as columns: one array per parameter and per
+    POINT_METRICS entry, one row per design point. Parameter columns come
+    from the design up front; metric rows are filled as points finish, in
+    any order, and `done` marks them. Saved as .npz (all columns plus
+    `done`) or .csv (finished rows).
+    """
+    def __init__(self, points):
+        self.parameters = list(points)
+        self.size = len(next(iter(points.values()))) if points else 0
+        self.columns = dict(points)
+        for name in POINT_METRICS:
+            self.columns[name] = np.full(self.size, np.nan)
+        self.done = np.zeros(self.size, dtype=bool)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def completed(self):
+        return int(np.count_nonzero(self.done))
+
+    def put(self, index, row):
+        for name, value in row.items():
+            self.columns[name][index] = value
+        self.done[index] = True
+
+    def row(self, index):
+        return {name: column[index].item() for name, column in self.columns.items()}
+
+    def rows(self):
+        """Finished rows as dicts, in design order."""
+        return [self.row(i) for i in np.flatnonzero(self.done).tolist()]
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp = path + ".tmp"
+        if path.lower().endswith(".csv"):
+            with open(temp, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(self.columns))
+                writer.writeheader()
+                writer.writerows(self.rows())
+        else:
+            with open(temp, "wb") as f:
+                np.savez(f, done=self.done, **self.columns)
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a store saved as .npz."""
+        with np.load(path) as data:
+            columns = {name: data[name] for name in data.files if name != "done"}
+            done = data["done"]
+        store = cls({name: column for name, column in columns.items() if name not in POINT_METRICS})
+        store.columns.update(columns)
+        store.done = done
+        return store
+
+
+class SweepResult:
+    """The store of a sweep, as far as it got."""
+    def __init__(self, store, entropy):
+        self.store = store
+        self.entropy = entropy  # root seed; reruns with it reproduce design and trials
+        self.wall_time = 0.0
+
+    def best(self, metric="delivery_rate"):
+        """Index of the finished point with the highest `metric`, or None."""
+        values = np.where(self.store.done, self.store.columns[metric], -np.inf)
+        return int(np.argmax(values)) if self.store.done.any() else None
+
+    def summary(self):
+        store = self.store
+        text = f"{store.completed}/{len(store)} points"
+        best = self.best()
+        if best is not None:
+            row = store.row(best)
+            where = ", ".join(f"{name}={row[name]:g}" if isinstance(row[name], float) else f"{name}={row[name]}"
+                              for name in store.parameters)
+            text += (f", best {row['delivery_rate']:.1f} pairs/s "
+                     f"(fidelity {row['mean_fidelity']:.3f}) at {where}")
+        return text + f", {self.wall_time:.1f} s"
+
+    def as_dict(self):
+        return {"entropy": self.entropy, "wall_time": self.wall_time, "points": self.store.rows()}
+
+
+# ----------------------------------------------------------------------
+# Worker side. Each process receives the model, base config and design once
+# (pool initializer) and keeps a _PointRunner across tasks, which only
+# carry point indices.
+# ----------------------------------------------------------------------
+class _PointRunner:
+    """
+    Simulates design points on its own copy of the model, reusing what no
+    swept parameter changes: link lengths (positions are never swept) and
+    a PathCache, whose incremental invalidation keeps the routes of
+    config.traffic across points that leave routing inputs alone.
+    """
+    def __init__(self, model, config, parameters, points, trials, entropy):
+        self.model = model
+        self.config = config
+        self.parameters = parameters
+        self.points = points
+        self.trials = trials
+        self.entropy = entropy
+        self.link_lengths = link_lengths(model)
+        self.routes = PathCache(model, k=1, metric="fidelity", config=config) if config.traffic else None
+        self.targets = {p.name: np.asarray(p.nodes if p.nodes is not None else model.node_ids(), dtype=np.int64)
+                        for p in parameters if p.is_node_property}
+
+    def run(self, index):
+        started = time.perf_counter()
+        changes = {}
+        for p in self.parameters:
+            value = self.points[p.name][index].item()
+            if p.is_node_property:
+                self.model.set_node_attributes(self.targets[p.name], p.name, value)
+            else:
+                changes[p.name] = value
+        config = replace(self.config, **changes)
+
+        stats = RunningStats()
+        for trial in range(self.trials):
+            # Point i, trial j always draws from the same stream, whatever the chunking
+            seed = np.random.SeedSequence(self.entropy, spawn_key=(index, trial))
+            result = Simulation(self.model, replace(config, seed=seed), self.link_lengths).run()
+            stats.add(trial_metrics(result))
+        row = stats.as_dict()
+
+        if self.routes is not None:
+            self.routes.config = config
+            found = [self.routes.best_path(d.source, d.target) for d in config.traffic]
+            found = [path for path in found if path is not None]
+            if found:
+                row["route_fidelity"] = float(np.mean([path_fidelity(path) for path in found]))
+                row["route_hops"] = float(np.mean([len(path.edges) for path in found]))
+        row["wall_time"] = time.perf_counter() - started
+        return row
+
+
+_worker_runner = None
+
+
+def _init_worker(*args):
+    global _worker_runner
+    _worker_runner = _PointRunner(*args)
+
+
+def _run_points(indices):
+    return [(index, _worker_runner.run(index)) for index in indices]
+
+
+class Sweep:
+    """
+    Runs every point of a SweepSpec and streams the results into a
+    SweepStore (saved to `path`, if given, every SAVE_INTERVAL seconds and
+    at the end).
+
+    The model and config are copied on construction, so they may be edited
+    while the sweep runs. Points are split into chunks over a ProcessPoolExecutor
+    (`workers=1` runs inline); each worker gets the model and design once.
+    Has the same run()/cancel() interface as Simulation and MonteCarlo.
+    """
+    def __init__(self, model, config, spec, workers=None, path=None, chunks_per_worker=4):
+        self.model = copy.deepcopy(model)
+        self.config = copy.deepcopy(config or SimulationConfig())
+        self.spec = spec
+        self.path = path
+        self.entropy = np.random.SeedSequence(spec.seed if spec.seed is not None else self.config.seed).entropy
+        self.points = spec.points(np.random.default_rng(self.entropy))
+        self.num_points = len(next(iter(self.points.values())))
+        self.workers = max(1, min(workers or os.cpu_count() or 1, self.num_points))
+        self.chunks_per_worker = chunks_per_worker
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop handing out points; chunks already running are discarded."""
+        self.cancelled = True
+
+    def _chunks(self):
+        count = min(self.num_points, self.workers * self.chunks_per_worker)
+        bounds = np.linspace(0, self.num_points, count + 1).astype(int)
+        return [list(range(lo, hi)) for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()) if hi > lo]
+
+    def run(self, progress=None):
+        result = SweepResult(SweepStore(self.points), self.entropy)
+        started = time.perf_counter()
+        saved = started
+        runner_args = (self.model, self.config, self.spec.parameters, self.points,
+                       self.spec.trials, self.entropy)
+
+        def collect(rows):
+            nonlocal saved
+            for index, row in rows:
+                result.store.put(index, row)
+            result.wall_time = time.perf_counter() - started
+            if self.path and time.perf_counter() - saved > SAVE_INTERVAL:
+                result.store.save(self.path)
+                saved = time.perf_counter()
+            if progress is not None:
+                progress(result.store.completed / self.num_points, result)
+
+        try:
+            if self.workers == 1:
+                runner = _PointRunner(*runner_args)
+                for chunk in self._chunks():
+                    if self.cancelled:
+                        break
+                    collect([(index, runner.run(index)) for index in chunk])
+                return result
+
+            # Spawn rather than fork: the GUI process must not be forked with Qt running
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=runner_args,
+            )
+            try:
+                futures = [executor.submit(_run_points, chunk) for chunk in self._chunks()]
+                for future in as_completed(futures):
+                    collect(future.result())
+                    if self.cancelled:
+                        break
+            finally:
+                executor.shutdown(wait=not self.cancelled, cancel_futures=True)
+            return result
+        finally:
+            result.wall_time = time.perf_counter() - started
+            if self.path:
+                result.store.save(self.path)
+
+
+def run_sweep(model, config, spec, workers=None, path=None, progress=None):
+    """Headless convenience wrapper: run a SweepSpec over `model` and return the SweepResult."""
+    return Sweep(model, config, spec, workers, path).run(progress)
@@ -0,0 +1,101 @@
+# core/traffic.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Entanglement requests between node pairs, as lazy streams of arrival
+# times in seconds. A generator only ever holds its next few draws, so a
+# day-long horizon costs no more memory than a second; the simulation
+# pulls one arrival per demand at a time (see Simulation._next_request).
+
+PATTERNS = ("poisson", "bursty", "trace")
+
+
+def poisson_arrivals(rate, rng, start=0.0, block=1024):
+    """Poisson process of `rate` requests per second; gaps are drawn `block` at a time."""
+    if rate <= 0:
+        return
+    t = start
+    scale = 1.0 / rate
+    while True:
+        for gap in rng.exponential(scale, block).tolist():
+            t += gap
+            yield t
+
+
+def bursty_arrivals(rate, mean_on, mean_off, rng, start=0.0):
+    """
+    On/off (interrupted Poisson) process: bursts of exponentially
+    distributed length `mean_on` seconds separated by silences of mean
+    `mean_off`. The rate inside a burst is chosen so the long-run mean
+    stays `rate` requests per second.
+    """
+    if rate <= 0 or mean_on <= 0:
+        return
+    peak = rate * (mean_on + max(mean_off, 0.0)) / mean_on
+    t = start
+    while True:
+        end = t + rng.exponential(mean_on)
+        for arrival in poisson_arrivals(peak, rng, t, block=16):
+            if arrival >= end:
+                break
+            yield arrival
+        t = end + (rng.exponential(mean_off) if mean_off > 0 else 0.0)
+
+
+def trace_arrivals(path, start=0.0):
+    """
+    Replay a request trace: a text file with one arrival time in seconds
+    per line (ascending; further comma-separated columns and '#' comments
+    are ignored). The file is read line by line as requests are consumed.
+    """
+    with open(path) as trace:
+        for line in trace:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                yield start + float(line.split(",", 1)[0])
+
+
+@dataclass
+class TrafficDemand:
+    """
+    Requests for end-to-end pairs between `source` and `target`.
+
+    `rate` is the mean number of requests per second (poisson, bursty),
+    `mean_on`/`mean_off` the burst and silence lengths (bursty) and
+    `trace` a file of arrival times (trace). At most `max_pending`
+    requests wait unserved; while that backlog is full no further arrivals
+    are drawn, and they resume once a pair is delivered.
+    """
+    source: int
+    target: int
+    pattern: str = "poisson"
+    rate: float = 1.0
+    mean_on: float = 0.1
+    mean_off: float = 0.9
+    trace: str = None
+    max_pending: int = 64
+
+    def arrivals(self, rng):
+        """Fresh lazy generator of this demand's arrival times."""
+        if self.pattern == "poisson":
+            return poisson_arrivals(self.rate, rng)
+        if self.pattern == "bursty":
+            return bursty_arrivals(self.rate, self.mean_on, self.mean_off, rng)
+        if self.pattern == "trace":
+            return trace_arrivals(self.trace)
+        raise ValueError(f"Unknown traffic pattern {self.pattern!r}")
+
+    def describe(self):
+        if self.pattern == "trace":
+            return f"{self.source} -> {self.target}: trace {self.trace}"
+        text = f"{self.source} -> {self.target}: {self.pattern}, {self.rate:g} req/s"
+        if self.pattern == "bursty":
+            text += f" (bursts {self.mean_on:g} s, gaps {self.mean_off:g} s)"
+        return text
+
+
+def demand_rngs(rng, count):
+    """Independent generators for `count` demands, derived from a simulation's rng."""
+    return [np.random.default_rng(seed) for seed in rng.integers(2**63, size=count).tolist()]
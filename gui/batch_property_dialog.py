@@ -0,0 +1,131 @@
+# gui/batch_property_dialog.py
+
+import numpy as np
+from PyQt5.QtWidgets import (
+    QDialog, QFormLayout, QLabel, QLineEdit, QComboBox, QCheckBox,
+    QPushButton, QVBoxLayout, QMessageBox
+)
+
+from core.network_model import NODE_TYPES, QUBIT_TECHS, decode
+from gui.node_property_dialog import parse_property
+
+PROPERTY_LABELS = {
+    "node_type": "Node Type:",
+    "num_qubits": "Number of Qubits:",
+    "qubit_tech": "Qubit Tech:",
+    "coherence_time": "Coherence Time (s):",
+    "insertion_loss": "Photon Insertion Loss (dB):",
+}
+CHOICES = {"node_type": NODE_TYPES, "qubit_tech": QUBIT_TECHS}
+
+
+class BatchPropertyDialog(QDialog):
+    """
+    Edit properties of many nodes at once: the selected nodes, all nodes,
+    or all nodes of one type or qubit technology. Each field shows the
+    value the target nodes share (blank when they differ) and only ticked
+    properties are changed; editing a field ticks it.
+
+    The dialog does not touch the model. After OK, `node_ids` and the
+    validated `values` ({property: value}) are for the scene to apply in
+    one step (QuantumNetworkScene.set_node_properties).
+    """
+    def __init__(self, model, selected_ids, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.selected_ids = np.asarray(selected_ids, dtype=np.int64)
+        self.node_ids = np.empty(0, dtype=np.int64)
+        self.values = {}
+        self.setWindowTitle("Edit Node Properties")
+        self.setup_ui()
+        self.update_target()
+
+    def setup_ui(self):
+        layout = QFormLayout()
+
+        # Target: the selection or a filter, as (label, criteria); None is the selection
+        self.targets = [(f"Selected nodes ({len(self.selected_ids)})", None), ("All nodes", {})]
+        self.targets += [(f"All {node_type} nodes", {"node_type": node_type}) for node_type in NODE_TYPES]
+        self.targets += [(f"All {tech} nodes", {"qubit_tech": tech}) for tech in QUBIT_TECHS]
+        self.targetCombo = QComboBox()
+        self.targetCombo.addItems([label for label, _ in self.targets])
+        if len(self.selected_ids) == 0:
+            self.targetCombo.setCurrentIndex(1)
+        self.targetCombo.currentIndexChanged.connect(self.update_target)
+        layout.addRow(QLabel("Apply To:"), self.targetCombo)
+        self.countLabel = QLabel()
+        layout.addRow(QLabel(""), self.countLabel)
+
+        # One ticked-or-not row per property
+        self.checks = {}
+        self.fields = {}
+        for name, label in PROPERTY_LABELS.items():
+            check = QCheckBox(label)
+            if name in CHOICES:
+                field = QComboBox()
+                field.addItems(CHOICES[name])
+                field.activated.connect(lambda _, check=check: check.setChecked(True))
+            else:
+                field = QLineEdit()
+                field.textEdited.connect(lambda _, check=check: check.setChecked(True))
+            self.checks[name] = check
+            self.fields[name] = field
+            layout.addRow(check, field)
+
+        # Buttons
+        button_layout = QVBoxLayout()
+        self.okButton = QPushButton("OK")
+        self.cancelButton = QPushButton("Cancel")
+        button_layout.addWidget(self.okButton)
+        button_layout.addWidget(self.cancelButton)
+
+        layout.addRow(button_layout)
+        self.setLayout(layout)
+
+        # Connect signals
+        self.okButton.clicked.connect(self.accept)
+        self.cancelButton.clicked.connect(self.reject)
+
+    def target_ids(self):
+        criteria = self.targets[self.targetCombo.currentIndex()][1]
+        if criteria is None:
+            return self.selected_ids
+        return self.model.nodes_where(**criteria)
+
+    def update_target(self):
+        """Show the size of the current target and the property values its nodes share."""
+        ids = self.target_ids()
+        self.countLabel.setText(f"{len(ids)} node(s)")
+        for name, field in self.fields.items():
+            column = self.model.nodes[name][ids]
+            shared = len(ids) > 0 and bool((column == column[0]).all())
+            if name in CHOICES:
+                if shared:
+                    field.setCurrentText(decode(name, column[0]))
+            else:
+                field.setText(str(decode(name, column[0])) if shared else "")
+                field.setPlaceholderText("" if shared else "(mixed)")
+
+    def accept(self):
+        """Validate every ticked field once, then close with `node_ids` and `values` set."""
+        ids = self.target_ids()
+        if len(ids) == 0:
+            QMessageBox.warning(self, "Edit Node Properties", "No nodes match the selected target.")
+            return
+        values = {}
+        for name, check in self.checks.items():
+            if not check.isChecked():
+                continue
+            field = self.fields[name]
+            if name in CHOICES:
+                values[name] = field.currentText()
+                continue
+            try:
+                values[name] = parse_property(name, field.text())
+            except ValueError as exc:
+                QMessageBox.warning(self, "Invalid Input", str(exc))
+                field.setFocus()
+                return
+        self.node_ids = ids
+        self.values = values
+        super().accept()
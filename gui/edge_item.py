@@ -8,11 +8,17 @@ from gui.node_item import NodeItem
 class EdgeItem(QGraphicsLineItem):
     """
     Represents a connection (fiber link) between two NodeItems.
+    The link itself is row `edge_id` of the scene's NetworkModel.
     """
-    def __init__(self, source: NodeItem, target: NodeItem):
+    # Shared by every edge; paint runs far too often to build pens there
+    PEN = QPen(QColor("black"), 2)
+    SELECTED_PEN = QPen(QColor("red"), 2, Qt.DashLine)
+
+    def __init__(self, source: NodeItem, target: NodeItem, edge_id: int):
         super().__init__()
         self.source_node = source
         self.target_node = target
+        self.edge_id = edge_id
 
         self.setFlags(QGraphicsLineItem.ItemIsSelectable)
         
@@ -21,7 +27,7 @@ class EdgeItem(QGraphicsLineItem):
         self.target_node.add_edge(self)
 
         #Appearance
-        self.setPen(QPen(QColor("black"), 2))
+        self.setPen(self.PEN)
 
         self.update_positions()
 
@@ -32,16 +38,16 @@ class EdgeItem(QGraphicsLineItem):
         self.setLine(p1.x(), p1.y(), p2.x(), p2.y())
 
     def delete(self):
-        """Remove the edge from the source and target nodes."""
-        self.source_node.remove_edge(self)
-        self.target_node.remove_edge(self)
+        """Remove the edge from the model, the source and target nodes, and the scene."""
         if self.scene() is not None:
-            self.scene().removeItem(self)
+            self.scene().delete_edge(self)
+        else:
+            self.source_node.model.remove_edge(self.edge_id)
+            self.source_node.remove_edge(self)
+            self.target_node.remove_edge(self)
 
     def paint(self, painter, option, widget=None):
         """Customize edge appearance when selected."""
-        if self.isSelected():
-            painter.setPen(QPen(QColor("red"), 2, Qt.DashLine))  # Highlight with dashed red line
-        else:
-            painter.setPen(QPen(QColor("black"), 2))  # Default black line
-        super().paint(painter, option, widget)
+        # QGraphicsLineItem.paint would reset the pen to self.pen(), so draw the line here
+        painter.setPen(self.SELECTED_PEN if self.isSelected() else self.PEN)
+        painter.drawLine(self.line())
@@ -0,0 +1,301 @@
+# gui/edge_layer.py
+
+import math
+
+import numpy as np
+from PyQt5.QtGui import QColor, QPainterPath, QPen
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtWidgets import QGraphicsItem
+
+from core.network_model import EDGES_ADDED, EDGES_REMOVED, NODES_MOVED, RESET
+
+# Coarsest level of detail: endpoints snapped to a 2**16 scene-unit grid
+MAX_LEVEL = 16
+# Levels of detail whose tile paths are kept while zooming back and forth
+CACHED_LEVELS = 3
+
+
+class EdgeLayer(QGraphicsItem):
+    """
+    Draws every edge of a NetworkModel as one graphics item, straight from
+    the model's endpoint and coordinate columns.
+
+    Edges are bucketed into square tiles by their midpoint. Each tile keeps
+    the bounding box of its edges and a cached QPainterPath of them, so a
+    repaint only visits the tiles overlapping the exposed area and draws
+    each with a single drawPath call. Model events mark the affected tiles
+    dirty; their paths are rebuilt the next time they are drawn.
+
+    Level of detail: when a screen pixel covers more than one scene unit,
+    endpoints are snapped to a grid of about a pixel (level k: 2**k scene
+    units) before the path is built. Links that collapse to a point are
+    culled and links that snap onto the same segment are merged, so a
+    zoomed-out view of a dense map strokes far fewer lines.
+
+    Selected edges (ids in `selected`) are drawn on top with the same red
+    dashed pen EdgeItem uses.
+    """
+    def __init__(self, model, tile_size=None):
+        super().__init__()
+        self.model = model
+        self.selected = set()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.setZValue(-1)  # below the nodes, like the lines they replace
+
+        self._pen = QPen(QColor("black"), 2)
+        self._thin_pen = QPen(QColor("black"), 0)  # cosmetic, for zoomed-out views
+        self._selected_pen = QPen(QColor("red"), 2, Qt.DashLine)
+        self._fixed_tile_size = tile_size
+        self._selected_path = None
+        self._moved = set()
+        model.add_listener(self._on_model_change)
+        self.rebuild()
+
+    def close(self):
+        self.model.remove_listener(self._on_model_change)
+
+    # ------------------------------------------------------------------
+    # Tiles
+    # ------------------------------------------------------------------
+    def rebuild(self):
+        """Re-bucket every edge; used initially and after a model reset."""
+        model = self.model
+        ids = model.edge_ids()
+        if self._fixed_tile_size:
+            self.tile_size = float(self._fixed_tile_size)
+        else:
+            # About 32 x 32 tiles over the current extent
+            mask = model.node_mask()
+            extent = 0.0
+            if mask.any():
+                x = model.column("x")[mask]
+                y = model.column("y")[mask]
+                extent = max(x.max() - x.min(), y.max() - y.min())
+            self.tile_size = max(extent / 32.0, 500.0)
+        self._edge_tile = np.full(max(model.edge_slots, 64), -1, dtype=np.int64)
+        self._members = {}     # tile key -> set of edge ids
+        self._tile_bounds = {}  # tile key -> (x0, y0, x1, y1) of its edges
+        self._paths = {}        # level -> {tile key: QPainterPath}
+        self._dirty = set()
+        self._moved.clear()
+        self.selected &= set(ids.tolist())
+        self._selected_path = None
+
+        self.prepareGeometryChange()
+        self._bounds = QRectF()
+        self._assign(ids)
+        self._refresh_tiles()
+        self.update()
+
+    def _tile_keys(self, ids):
+        """Tile code of each edge's midpoint: tx << 32 | ty (offset to stay positive)."""
+        src, dst = self.model.edge_endpoints(ids)
+        x = self.model.nodes["x"]
+        y = self.model.nodes["y"]
+        tx = np.floor((x[src] + x[dst]) / (2 * self.tile_size)).astype(np.int64) + (1 << 31)
+        ty = np.floor((y[src] + y[dst]) / (2 * self.tile_size)).astype(np.int64) + (1 << 31)
+        return (tx << 32) | ty
+
+    def _assign(self, ids):
+        """Put edges (not currently in any tile) into the tiles of their midpoints."""
+        if len(ids) == 0:
+            return
+        if ids.max() >= len(self._edge_tile):
+            grown = np.full(max(int(ids.max()) + 1, 2 * len(self._edge_tile)), -1, dtype=np.int64)
+            grown[:len(self._edge_tile)] = self._edge_tile
+            self._edge_tile = grown
+        keys = self._tile_keys(ids)
+        self._edge_tile[ids] = keys
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        ids = ids[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        for start, stop in zip(starts.tolist(), np.r_[starts[1:], len(keys)].tolist()):
+            key = int(keys[start])
+            members = self._members.get(key)
+            if members is None:
+                self._members[key] = members = set()
+            members.update(ids[start:stop].tolist())
+            self._dirty.add(key)
+
+    def _unassign(self, ids):
+        tiles = self._edge_tile[ids]
+        for edge_id, key in zip(ids.tolist(), tiles.tolist()):
+            if key < 0:
+                continue
+            self._members[key].discard(edge_id)
+            self._dirty.add(key)
+        self._edge_tile[ids] = -1
+
+    def _refresh_tiles(self):
+        """Recompute the bounds of dirty tiles and drop their cached paths."""
+        if not self._dirty:
+            return
+        x = self.model.nodes["x"]
+        y = self.model.nodes["y"]
+        grown = QRectF(self._bounds)
+        for key in self._dirty:
+            for paths in self._paths.values():
+                paths.pop(key, None)
+            members = self._members.get(key)
+            if not members:
+                self._members.pop(key, None)
+                self._tile_bounds.pop(key, None)
+                continue
+            ids = np.fromiter(members, dtype=np.int64, count=len(members))
+            src, dst = self.model.edge_endpoints(ids)
+            xs = np.concatenate([x[src], x[dst]])
+            ys = np.concatenate([y[src], y[dst]])
+            bounds = (float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max()))
+            self._tile_bounds[key] = bounds
+            grown = grown.united(QRectF(bounds[0], bounds[1], bounds[2] - bounds[0], bounds[3] - bounds[1]))
+        self._dirty.clear()
+        self._selected_path = None
+        if grown != self._bounds:
+            self.prepareGeometryChange()
+            self._bounds = grown
+
+    def _apply_moves(self):
+        """Re-bucket the edges of nodes moved since the last repaint."""
+        if not self._moved:
+            return
+        moved = np.fromiter(self._moved, dtype=np.int64, count=len(self._moved))
+        self._moved.clear()
+        m = self.model.edge_slots
+        touched = self.model.edge_alive[:m] & (np.isin(self.model.edge_src[:m], moved) |
+                                               np.isin(self.model.edge_dst[:m], moved))
+        ids = np.flatnonzero(touched)
+        self._unassign(ids)
+        self._assign(ids)
+
+    def flush(self):
+        """Bring the tiles up to date with the model; the scene calls this once per frame."""
+        self._apply_moves()
+        self._refresh_tiles()
+
+    def _on_model_change(self, event, ids, name):
+        if event == EDGES_ADDED:
+            self._assign(np.asarray(ids, dtype=np.int64))
+            self._refresh_tiles()
+        elif event == EDGES_REMOVED:
+            ids = np.asarray(ids, dtype=np.int64)
+            self._unassign(ids[ids < len(self._edge_tile)])
+            self.selected.difference_update(ids.tolist())
+            self._refresh_tiles()
+        elif event == NODES_MOVED:
+            # Re-bucketing waits for flush(); only the bounds must grow now,
+            # as geometry changes are not allowed during paint()
+            self._moved.update(ids.tolist())
+            self._selected_path = None
+            x = self.model.nodes["x"][ids]
+            y = self.model.nodes["y"][ids]
+            x0, y0, x1, y1 = float(x.min()), float(y.min()), float(x.max()), float(y.max())
+            if not self._bounds.contains(QRectF(x0, y0, x1 - x0, y1 - y0)):
+                self.prepareGeometryChange()
+                self._bounds = self._bounds.united(QRectF(x0, y0, x1 - x0, y1 - y0))
+        elif event == RESET:
+            self.rebuild()
+            return
+        else:
+            return
+        self.update()
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+    def _segments(self, ids, level):
+        """(x1, y1, x2, y2) rows of `ids`, simplified for the level of detail."""
+        src, dst = self.model.edge_endpoints(ids)
+        x = self.model.nodes["x"]
+        y = self.model.nodes["y"]
+        lines = np.stack([x[src], y[src], x[dst], y[dst]], axis=1)
+        if level == 0:
+            return lines
+        grid = float(2 ** level)
+        snapped = np.round(lines / grid)
+        # Collapsed links are culled; links snapping onto the same segment
+        # (in either direction) are merged into one
+        snapped = snapped[(snapped[:, 0] != snapped[:, 2]) | (snapped[:, 1] != snapped[:, 3])]
+        flip = (snapped[:, 0] > snapped[:, 2]) | ((snapped[:, 0] == snapped[:, 2]) & (snapped[:, 1] > snapped[:, 3]))
+        snapped[flip] = snapped[flip][:, [2, 3, 0, 1]]
+        return np.unique(snapped, axis=0) * grid
+
+    @staticmethod
+    def _path(lines):
+        path = QPainterPath()
+        move_to = path.moveTo
+        line_to = path.lineTo
+        for x1, y1, x2, y2 in lines.tolist():
+            move_to(x1, y1)
+            line_to(x2, y2)
+        return path
+
+    def _tile_path(self, key, level):
+        paths = self._paths.get(level)
+        if paths is None:
+            if len(self._paths) >= CACHED_LEVELS:
+                del self._paths[next(iter(self._paths))]
+            self._paths[level] = paths = {}
+        path = paths.get(key)
+        if path is None:
+            members = self._members[key]
+            ids = np.fromiter(members, dtype=np.int64, count=len(members))
+            paths[key] = path = self._path(self._segments(ids, level))
+        return path
+
+    # ------------------------------------------------------------------
+    # QGraphicsItem
+    # ------------------------------------------------------------------
+    def boundingRect(self):
+        return self._bounds.adjusted(-2, -2, 2, 2)
+
+    def paint(self, painter, option, widget=None):
+        self.flush()
+
+        scale = painter.worldTransform().m11()
+        units_per_pixel = 1.0 / scale if scale > 0 else 1.0
+        level = 0 if units_per_pixel <= 1.0 else min(math.ceil(math.log2(units_per_pixel)), MAX_LEVEL)
+
+        exposed = option.exposedRect.adjusted(-2, -2, 2, 2)
+        left, top, right, bottom = exposed.left(), exposed.top(), exposed.right(), exposed.bottom()
+        painter.setPen(self._pen if scale >= 0.5 else self._thin_pen)
+        for key, (x0, y0, x1, y1) in self._tile_bounds.items():
+            if x1 >= left and x0 <= right and y1 >= top and y0 <= bottom:
+                painter.drawPath(self._tile_path(key, level))
+
+        if self.selected:
+            if self._selected_path is None:
+                ids = np.fromiter(self.selected, dtype=np.int64, count=len(self.selected))
+                self._selected_path = self._path(self._segments(ids, 0))
+            painter.setPen(self._selected_pen)
+            painter.drawPath(self._selected_path)
+
+    # ------------------------------------------------------------------
+    # Selection and picking
+    # ------------------------------------------------------------------
+    def set_selected(self, edge_ids, add=False):
+        if not add:
+            self.selected.clear()
+        self.selected.update(int(i) for i in edge_ids)
+        self._selected_path = None
+        self.update()
+
+    def edge_at(self, x, y, tolerance):
+        """Id of the edge passing closest to (x, y), within `tolerance`; None otherwise."""
+        self.flush()
+        candidates = [
+            members for key, members in self._members.items()
+            if self._tile_bounds[key][0] - tolerance <= x <= self._tile_bounds[key][2] + tolerance
+            and self._tile_bounds[key][1] - tolerance <= y <= self._tile_bounds[key][3] + tolerance
+        ]
+        if not candidates:
+            return None
+        ids = np.fromiter((i for members in candidates for i in members), dtype=np.int64)
+        x1, y1, x2, y2 = self._segments(ids, 0).T
+        dx = x2 - x1
+        dy = y2 - y1
+        length2 = dx * dx + dy * dy
+        t = np.clip(((x - x1) * dx + (y - y1) * dy) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+        distance = np.hypot(x1 + t * dx - x, y1 + t * dy - y)
+        best = int(np.argmin(distance))
+        return int(ids[best]) if distance[best] <= tolerance else None
@@ -1,14 +1,32 @@
+import copy
+import os
+
+import numpy as np
 from PyQt5.QtGui import QPalette, QColor
 from PyQt5.QtWidgets import (
     QMainWindow, QMenuBar, QToolBar, QStatusBar, QAction,
     QGraphicsView, QFileDialog, QMessageBox,
-    QWidget, QVBoxLayout, QLabel, QInputDialog, QMenu
+    QWidget, QVBoxLayout, QLabel, QInputDialog, QMenu, QProgressDialog, QApplication
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QSettings, QStandardPaths
 
 
+from core.journal import (
+    Journal, autosave_base, discard_autosave, lock_autosave, orphaned_autosaves, recover, unlock_autosave,
+)
+from core.link_physics import compute_link_budget
+from core.network_io import load_network, save_network
+from core.pair_states import REPRESENTATION_NAMES, link_representation
+from core.purification import PROTOCOLS, pumped_links
+from core.routing import PathCache, path_fidelity
+from core.simulation import BACKENDS, Simulation, SimulationConfig
+from core.traffic import PATTERNS, TrafficDemand
 from gui.network_scene import QuantumNetworkScene
+from gui.simulation_worker import SimulationWorker
+from gui.undo_stack import AddRowsCommand
 
+# QSettings key read by main.py to decide whether to show the welcome page
+SHOW_WELCOME_SETTING = "startup/show_welcome"
 
 class QuantumNetworkWindow(QMainWindow):
     def __init__(self):
@@ -19,11 +37,19 @@ class QuantumNetworkWindow(QMainWindow):
         # Set up dark theme palette
         self.setup_palette()
 
+        # Parameters used by Simulation > Run
+        self.sim_config = SimulationConfig()
+        self.sim_worker = None
+        self.current_file = None
+
         # Create scene and view
         self.scene = QuantumNetworkScene()
         self.view = QGraphicsView(self.scene)
         self.setCentralWidget(self.view)
 
+        # Routes for Traffic Setup, kept up to date as the scene is edited
+        self.path_cache = PathCache(self.scene.model, k=3, metric="fidelity", config=self.sim_config)
+
         # Menus / Toolbar
         self.create_menu_bar()
         self.create_tool_bar()
@@ -33,6 +59,24 @@ class QuantumNetworkWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready")
 
+        # Polls the running simulation's progress queue
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(200)
+        self.progress_timer.timeout.connect(self.poll_simulation)
+
+        # Crash-recovery autosave: a snapshot plus a journal of edits, one
+        # per running instance, started once a crashed session's autosave
+        # has been dealt with
+        self.autosave_dir = os.path.join(
+            QStandardPaths.writableLocation(QStandardPaths.AppDataLocation), "autosave"
+        )
+        self.autosave_base = autosave_base(self.autosave_dir)
+        self.journal = None
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setInterval(2000)
+        self.autosave_timer.timeout.connect(self.autosave)
+        QTimer.singleShot(0, self.start_autosave)
+
         # Optional global style sheet
         self.setStyleSheet("""
             QToolBar {
@@ -92,14 +136,36 @@ class QuantumNetworkWindow(QMainWindow):
         open_action.triggered.connect(self.open_file)
         save_action = QAction("Save...", self)
         save_action.triggered.connect(self.save_file)
+        import_action = QAction("Import Sites and Links...", self)
+        import_action.triggered.connect(self.import_network)
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
 
         file_menu.addAction(open_action)
         file_menu.addAction(save_action)
+        file_menu.addAction(import_action)
         file_menu.addSeparator()
         file_menu.addAction(exit_action)
 
+        # Edit Menu
+        edit_menu = QMenu("Edit", self)
+        menu_bar.addMenu(edit_menu)
+        self.undo_action = QAction("Undo", self)
+        self.undo_action.setShortcut("Ctrl+Z")
+        self.undo_action.triggered.connect(self.scene.undo_stack.undo)
+        self.redo_action = QAction("Redo", self)
+        self.redo_action.setShortcut("Ctrl+Shift+Z")
+        self.redo_action.triggered.connect(self.scene.undo_stack.redo)
+        self.scene.undo_stack.indexChanged.connect(self.update_undo_actions)
+        edit_menu.addAction(self.undo_action)
+        edit_menu.addAction(self.redo_action)
+        self.update_undo_actions()
+        edit_menu.addSeparator()
+        batch_edit_action = QAction("Edit Node Properties...", self)
+        batch_edit_action.setShortcut("Ctrl+E")
+        batch_edit_action.triggered.connect(self.on_batch_properties)
+        edit_menu.addAction(batch_edit_action)
+
         # Simulation Menu
         sim_menu = QMenu("Simulation", self)
         menu_bar.addMenu(sim_menu)
@@ -109,6 +175,9 @@ class QuantumNetworkWindow(QMainWindow):
         traffic_setup_action = QAction("Traffic Setup", self)
         configure_action = QAction("Configure", self)
         run_action = QAction("Run", self)
+        monte_carlo_action = QAction("Run Monte Carlo...", self)
+        self.cancel_run_action = QAction("Cancel Run", self)
+        self.cancel_run_action.setEnabled(False)
         analyze_action = QAction("Analyze", self)
 
         # Connect Simulation Menu actions
@@ -117,6 +186,8 @@ class QuantumNetworkWindow(QMainWindow):
         traffic_setup_action.triggered.connect(self.on_traffic_setup)
         configure_action.triggered.connect(self.on_configure)
         run_action.triggered.connect(self.on_run)
+        monte_carlo_action.triggered.connect(self.on_run_monte_carlo)
+        self.cancel_run_action.triggered.connect(self.on_cancel_run)
         analyze_action.triggered.connect(self.on_analyze)
 
         sim_menu.addAction(ent_protocols_action)
@@ -125,8 +196,36 @@ class QuantumNetworkWindow(QMainWindow):
         sim_menu.addSeparator()
         sim_menu.addAction(configure_action)
         sim_menu.addAction(run_action)
+        sim_menu.addAction(monte_carlo_action)
+        sim_menu.addAction(self.cancel_run_action)
         sim_menu.addAction(analyze_action)
 
+        # View Menu
+        view_menu = QMenu("View", self)
+        menu_bar.addMenu(view_menu)
+        self.batched_edges_action = QAction("Batched Link Rendering", self)
+        self.batched_edges_action.setCheckable(True)
+        self.batched_edges_action.setToolTip("Draw all links as one layer with level of detail (for large maps)")
+        self.batched_edges_action.toggled.connect(
+            lambda checked: self.scene.set_edge_rendering("batched" if checked else "items"))
+        self.scene.edge_rendering_changed.connect(
+            lambda mode: self.batched_edges_action.setChecked(mode == "batched"))
+        view_menu.addAction(self.batched_edges_action)
+        self.batched_nodes_action = QAction("Batched Node Rendering", self)
+        self.batched_nodes_action.setCheckable(True)
+        self.batched_nodes_action.setToolTip("Draw all nodes as one layer of cached sprites (for large maps)")
+        self.batched_nodes_action.toggled.connect(
+            lambda checked: self.scene.set_node_rendering("batched" if checked else "items"))
+        self.scene.node_rendering_changed.connect(
+            lambda mode: self.batched_nodes_action.setChecked(mode == "batched"))
+        view_menu.addAction(self.batched_nodes_action)
+        view_menu.addSeparator()
+        show_welcome_action = QAction("Show Welcome Screen at Startup", self)
+        show_welcome_action.setCheckable(True)
+        show_welcome_action.setChecked(QSettings().value(SHOW_WELCOME_SETTING, True, type=bool))
+        show_welcome_action.toggled.connect(lambda checked: QSettings().setValue(SHOW_WELCOME_SETTING, checked))
+        view_menu.addAction(show_welcome_action)
+
         # Help Menu
         help_menu = QMenu("Help", self)
         menu_bar.addMenu(help_menu)
@@ -134,6 +233,21 @@ class QuantumNetworkWindow(QMainWindow):
         about_action.triggered.connect(self.show_about_dialog)
         help_menu.addAction(about_action)
 
+    def update_undo_actions(self):
+        stack = self.scene.undo_stack
+        self.undo_action.setEnabled(stack.can_undo())
+        self.undo_action.setText(f"Undo {stack.undoText()}" if stack.can_undo() else "Undo")
+        self.redo_action.setEnabled(stack.can_redo())
+        self.redo_action.setText(f"Redo {stack.redoText()}" if stack.can_redo() else "Redo")
+
+    def on_batch_properties(self):
+        from gui.batch_property_dialog import BatchPropertyDialog
+
+        dialog = BatchPropertyDialog(self.scene.model, self.scene.selected_node_ids(), self)
+        if dialog.exec_() and dialog.values:
+            self.scene.set_node_properties(dialog.node_ids, dialog.values)
+            self.status_bar.showMessage(f"Edited {len(dialog.node_ids)} node(s).", 3000)
+
     def create_tool_bar(self):
         """
         Toolbar with text-based actions.
@@ -169,47 +283,380 @@ class QuantumNetworkWindow(QMainWindow):
     # Simulation Menu Handlers
     # ---------------------------
     def on_entanglement_protocols(self):
-        self.status_bar.showMessage("Entanglement Protocols clicked", 3000)
-        # TODO: Implement functionality
+        swap_success, ok = QInputDialog.getDouble(
+            self, "Entanglement Protocols", "Bell-state measurement success probability:",
+            self.sim_config.swap_success, 0.0, 1.0, 3
+        )
+        if not ok:
+            return
+        self.sim_config.swap_success = swap_success
+
+        # Pair states as mixed-state records, or as qubits of one Clifford tableau
+        backend, ok = QInputDialog.getItem(
+            self, "Entanglement Protocols", "Pair state backend:",
+            BACKENDS, BACKENDS.index(self.sim_config.backend), False
+        )
+        if ok:
+            self.sim_config.backend = backend
+
+        # Coherent swap errors are set per node, on the current selection
+        nodes = self.scene.selected_node_ids()
+        if nodes:
+            current = self.sim_config.rotation_error.get(nodes[0], 0.0)
+            angle, ok = QInputDialog.getDouble(
+                self, "Entanglement Protocols",
+                f"Coherent Z over-rotation of swaps at the {len(nodes)} selected node(s) (rad):",
+                current, -3.1416, 3.1416, 4
+            )
+            if ok:
+                for node in nodes:
+                    if angle:
+                        self.sim_config.rotation_error[node] = angle
+                    else:
+                        self.sim_config.rotation_error.pop(node, None)
+
+        representation = REPRESENTATION_NAMES[link_representation(
+            self.sim_config.purification, self.sim_config.purification_rounds)]
+        message = f"Link pairs are simulated as {representation} states"
+        if self.sim_config.backend == "stabilizer":
+            message = (f"Link pairs are simulated as qubits of one stabilizer tableau, "
+                       f"with {representation} noise sampled as Pauli errors")
+            if self.sim_config.rotation_error:
+                message += "; coherent swap errors need the pairs backend"
+        elif self.sim_config.rotation_error:
+            message += (f"; pairs swapped at {len(self.sim_config.rotation_error)} node(s) "
+                        f"with coherent errors become density matrices")
+        self.status_bar.showMessage(message + ".", 5000)
 
     def on_purification(self):
-        self.status_bar.showMessage("Purification/Error Correction clicked", 3000)
-        # TODO: Implement functionality
+        protocol, ok = QInputDialog.getItem(
+            self, "Purification", "Link-level pumping protocol:",
+            PROTOCOLS, PROTOCOLS.index(self.sim_config.purification), False
+        )
+        if not ok:
+            return
+        rounds = 0
+        if protocol != "none":
+            rounds, ok = QInputDialog.getInt(
+                self, "Purification", "Pumping rounds per link:",
+                max(self.sim_config.purification_rounds, 1), 1, 20
+            )
+            if not ok:
+                return
+        self.sim_config.purification = protocol
+        self.sim_config.purification_rounds = rounds
+
+        states, pair_yield = pumped_links(self.sim_config.initial_fidelity, rounds, protocol)
+        self.status_bar.showMessage(
+            f"Purification: {protocol}, {rounds} round(s). Link pairs reach fidelity "
+            f"{float(states[0]):.3f} at {float(pair_yield):.1%} of the raw rate.", 5000
+        )
 
     def on_traffic_setup(self):
-        self.status_bar.showMessage("Traffic Setup clicked", 3000)
-        # TODO: Implement functionality
+        nodes = self.scene.selected_node_ids()
+        if len(nodes) != 2:
+            self.status_bar.showMessage("Traffic Setup: select the two end nodes of a request.", 3000)
+            return
+        source, target = nodes
+        paths = self.path_cache.paths(source, target)
+        if not paths:
+            QMessageBox.information(self, "Traffic Setup",
+                                    "No path between the selected nodes runs through repeaters only.")
+            return
+
+        # Highlight the best route
+        self.scene.select_edges(paths[0].edges)
+        rows = "".join(
+            f"<li>{len(path.edges)} link(s), fidelity ~ {path_fidelity(path):.3f}</li>" for path in paths
+        )
+        QMessageBox.information(self, "Traffic Setup", f"<p>Best routes for this pair:</p><ol>{rows}</ol>")
+
+        demand = self.ask_traffic_demand(source, target)
+        if demand is None:
+            return
+        traffic = [d for d in self.sim_config.traffic
+                   if {d.source, d.target} != {source, target}]
+        if demand.pattern != "none":
+            traffic.append(demand)
+        self.sim_config.traffic = traffic
+        self.status_bar.showMessage(f"{len(traffic)} traffic demand(s) configured.", 5000)
+
+    def ask_traffic_demand(self, source, target):
+        """Prompt for the request pattern between two nodes; pattern 'none' removes the demand."""
+        choices = ("none",) + PATTERNS
+        pattern, ok = QInputDialog.getItem(self, "Traffic Setup", "Request pattern:", choices, 1, False)
+        if not ok:
+            return None
+        demand = TrafficDemand(source, target, pattern)
+        if pattern == "trace":
+            demand.trace, _ = QFileDialog.getOpenFileName(
+                self, "Request Trace", "", "Traces (*.txt *.csv);;All Files (*)"
+            )
+            return demand if demand.trace else None
+        if pattern in ("poisson", "bursty"):
+            demand.rate, ok = QInputDialog.getDouble(
+                self, "Traffic Setup", "Mean requests per second:", demand.rate, 0.001, 1e6, 3
+            )
+            if not ok:
+                return None
+        if pattern == "bursty":
+            demand.mean_on, ok = QInputDialog.getDouble(
+                self, "Traffic Setup", "Mean burst length (s):", demand.mean_on, 1e-6, 1e5, 6
+            )
+            if not ok:
+                return None
+            demand.mean_off, ok = QInputDialog.getDouble(
+                self, "Traffic Setup", "Mean gap between bursts (s):", demand.mean_off, 0.0, 1e5, 6
+            )
+            if not ok:
+                return None
+        return demand
 
     def on_configure(self):
-        self.status_bar.showMessage("Configure clicked", 3000)
-        # TODO: Implement functionality
+        """Set up a parameter sweep and run it on the background worker."""
+        if not self.can_start_simulation():
+            return
+        from core.sweep import Sweep
+        from gui.sweep_dialog import SweepDialog
+
+        dialog = SweepDialog(self.scene.model, self.scene.selected_node_ids(), self)
+        if dialog.exec_():
+            # The sweep copies the model, so editing may continue while it runs
+            self.start_simulation(Sweep(self.scene.model, self.sim_config, dialog.spec,
+                                        dialog.workers, dialog.path))
 
     def on_run(self):
-        self.status_bar.showMessage("Run Simulation clicked", 3000)
-        # TODO: Implement functionality
+        if self.can_start_simulation():
+            # The simulation copies the topology here, so editing may continue while it runs;
+            # it gets its own config, so settings changed meanwhile apply to the next run
+            self.start_simulation(Simulation(self.scene.model, copy.deepcopy(self.sim_config)))
+
+    def on_run_monte_carlo(self):
+        if not self.can_start_simulation():
+            return
+        trials, ok = QInputDialog.getInt(self, "Monte Carlo", "Number of trials:", 100, 2, 10**7)
+        if ok:
+            # Loaded on first use: it pulls in multiprocessing and concurrent.futures
+            from core.monte_carlo import MonteCarlo
+
+            # The run copies the model and config here, so editing may continue while it runs
+            self.start_simulation(MonteCarlo(self.scene.model, self.sim_config, trials))
+
+    def can_start_simulation(self):
+        if self.sim_worker is not None:
+            self.status_bar.showMessage("A simulation is already running.", 3000)
+            return False
+        if self.scene.model.num_edges == 0:
+            self.status_bar.showMessage("Nothing to simulate: connect some nodes first.", 3000)
+            return False
+        return True
+
+    def start_simulation(self, job):
+        """Run a Simulation, MonteCarlo or Sweep job on the background worker."""
+        self.sim_worker = SimulationWorker(job, parent=self)
+        self.sim_worker.finished.connect(self.on_run_finished)
+        self.cancel_run_action.setEnabled(True)
+        self.status_bar.showMessage("Simulation started...")
+        self.sim_worker.start()
+        self.progress_timer.start()
+
+    def on_cancel_run(self):
+        if self.sim_worker is not None:
+            self.sim_worker.cancel()
+            self.status_bar.showMessage("Cancelling simulation...")
+
+    def poll_simulation(self):
+        """Show the newest progress snapshot of the running simulation."""
+        if self.sim_worker is None:
+            return
+        snapshots = self.sim_worker.drain()
+        if snapshots:
+            fraction, summary = snapshots[-1]
+            self.status_bar.showMessage(f"Running: {fraction:.0%} | {summary}")
+
+    def on_run_finished(self):
+        self.progress_timer.stop()
+        self.cancel_run_action.setEnabled(False)
+        worker, self.sim_worker = self.sim_worker, None
+        worker.drain()
+
+        if worker.error is not None:
+            self.status_bar.showMessage("Simulation failed.", 5000)
+            QMessageBox.warning(self, "Simulation Error", str(worker.error))
+            return
+        status = "Cancelled" if worker.was_cancelled() else "Finished"
+        self.status_bar.showMessage(f"{status}: {worker.result.summary()}")
+
+    def closeEvent(self, event):
+        # Do not destroy a QThread that is still running
+        if self.sim_worker is not None:
+            self.sim_worker.cancel()
+            self.sim_worker.wait()
+        # A clean exit leaves nothing to recover
+        self.autosave_timer.stop()
+        if self.journal is not None:
+            self.journal.close(discard=True)
+            self.journal = None
+        super().closeEvent(event)
+
+    # ---------------------------
+    # Autosave
+    # ---------------------------
+    def start_autosave(self):
+        # Only autosaves of sessions that are gone count (running instances
+        # hold theirs locked); the most recent is offered, and locked while
+        # it is, so two new instances cannot both take it
+        orphans = orphaned_autosaves(self.autosave_dir)
+        lock = lock_autosave(orphans[0]) if orphans else None
+        if lock is not None:
+            try:
+                self.offer_recovery(orphans[0])
+            finally:
+                discard_autosave(orphans[0])
+                unlock_autosave(lock, orphans[0])
+        try:
+            self.journal = Journal(self.scene.model, self.autosave_base)
+        except (OSError, RuntimeError) as exc:
+            self.status_bar.showMessage(f"Autosave disabled: {exc}", 5000)
+            return
+        self.autosave()
+        self.autosave_timer.start()
+
+    def offer_recovery(self, base):
+        answer = QMessageBox.question(
+            self, "Recover Network",
+            "A previous session did not exit cleanly. Recover its unsaved network?"
+        )
+        if answer != QMessageBox.Yes:
+            return
+        self.scene.clear_network()
+        try:
+            recover(self.scene.model, base)
+        except (OSError, ValueError, KeyError) as exc:
+            QMessageBox.warning(self, "Recover Network", f"Recovery failed:\n{exc}")
+        model = self.scene.model
+        self.scene.add_items(model.node_ids(), model.edge_ids())
+        self.status_bar.showMessage(
+            f"Recovered {model.num_nodes} nodes and {model.num_edges} links.", 5000
+        )
+
+    def autosave(self):
+        try:
+            self.journal.flush()
+        except OSError as exc:
+            self.autosave_timer.stop()
+            self.status_bar.showMessage(f"Autosave disabled: {exc}", 5000)
 
     def on_analyze(self):
-        self.status_bar.showMessage("Analyze clicked", 3000)
-        # TODO: Implement functionality
+        if self.scene.model.num_edges == 0:
+            self.status_bar.showMessage("Nothing to analyze: connect some nodes first.", 3000)
+            return
+        budget = compute_link_budget(self.scene.model, self.sim_config.attenuation_db_per_km,
+                                     self.sim_config.min_attempt_time)
+        worst = budget.rate.argmin()
+        QMessageBox.information(self, "Link Budget",
+                                f"<p>{len(budget)} links, {budget.length_km.sum():.1f} km of fiber</p>"
+                                f"<p>Attenuation: {budget.attenuation_db.min():.2f} - "
+                                f"{budget.attenuation_db.max():.2f} dB</p>"
+                                f"<p>Heralding success: median {np.median(budget.success_probability):.2e}</p>"
+                                f"<p>Entanglement rate: median {np.median(budget.rate):.1f} pairs/s, "
+                                f"slowest link {budget.rate[worst]:.2f} pairs/s "
+                                f"({budget.length_km[worst]:.1f} km)</p>")
 
     # ---------------------------
     # File Menu Handlers
     # ---------------------------
+    NETWORK_FILTER = ("Network Files (*.json *.qnet);;JSON Files (*.json);;"
+                      "Binary Network Files (*.qnet);;All Files (*)")
+
     def open_file(self):
-        filename, _ = QFileDialog.getOpenFileName(
-            self, "Open Network", "", "JSON Files (*.json);;All Files (*)"
-        )
+        filename, _ = QFileDialog.getOpenFileName(self, "Open Network", "", self.NETWORK_FILTER)
         if filename:
-            QMessageBox.information(self, "Open File", f"Opened file: {filename}")
-            # TODO: Implement actual JSON load logic
+            self.load_network_file(filename)
+
+    def load_network_file(self, filename):
+        self.scene.clear_network()
+        try:
+            load_network(filename, self.scene.model)
+        except (OSError, ValueError, KeyError) as exc:
+            self.scene.clear_network()
+            QMessageBox.warning(self, "Open File", f"Could not open {filename}:\n{exc}")
+            return False
+        # Per-node settings refer to the previous network's ids
+        self.sim_config.rotation_error.clear()
+        self.sim_config.traffic = []
+
+        model = self.scene.model
+        self.scene.add_items(model.node_ids(), model.edge_ids())
+        self.current_file = filename
+        self.status_bar.showMessage(
+            f"Opened {filename}: {model.num_nodes} nodes, {model.num_edges} links.", 5000
+        )
+        return True
 
     def save_file(self):
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Save Network", "", "JSON Files (*.json);;All Files (*)"
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Network", "", self.NETWORK_FILTER)
+        if not filename:
+            return
+        try:
+            save_network(self.scene.model, filename)
+        except OSError as exc:
+            QMessageBox.warning(self, "Save File", f"Could not save {filename}:\n{exc}")
+            return
+        self.current_file = filename
+        self.status_bar.showMessage(f"Saved {filename}.", 5000)
+
+    def import_network(self):
+        """Add sites and links from CSV or GeoJSON files to the current network."""
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Import Sites and Links", "",
+            "Sites and Links (*.csv *.txt *.geojson *.json *.geojsonl *.geojsons *.ndjson);;All Files (*)"
         )
-        if filename:
-            QMessageBox.information(self, "Save File", f"Saved file: {filename}")
-            # TODO: Implement actual JSON save logic
+        if not paths:
+            return
+        from core.importers import BulkImporter, is_link_csv
+
+        # Links refer to sites, so node files go first
+        try:
+            paths.sort(key=is_link_csv)
+        except OSError as exc:
+            QMessageBox.warning(self, "Import", str(exc))
+            return
+
+        importer = BulkImporter(self.scene.model)
+        progress = QProgressDialog("Importing...", "Stop", 0, 0, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+        stopped = False
+        # The whole import is one undo step; each batch only records its ids
+        self.scene.undo_stack.beginMacro("Import Sites and Links")
+        try:
+            with self.scene.bulk_insert():
+                for path in paths:
+                    for node_ids, edge_ids in importer.import_file(path):
+                        self.scene.add_items(node_ids, edge_ids)
+                        self.scene.undo_stack.push(AddRowsCommand(self.scene, node_ids, edge_ids))
+                        progress.setLabelText(
+                            f"Imported {importer.num_nodes} sites and {importer.num_edges} links..."
+                        )
+                        QApplication.processEvents()
+                        if progress.wasCanceled():
+                            stopped = True
+                            break
+                    if stopped:
+                        break
+        except (OSError, ValueError, KeyError) as exc:
+            QMessageBox.warning(self, "Import", f"Import failed:\n{exc}")
+        finally:
+            self.scene.undo_stack.endMacro()
+            progress.close()
+
+        message = f"Imported {importer.num_nodes} sites and {importer.num_edges} links"
+        if importer.skipped:
+            message += f" ({importer.skipped} rows skipped)"
+        if stopped:
+            message += "; stopped early"
+        self.status_bar.showMessage(message + ".", 5000)
 
     # ---------------------------
     # Help Menu Handler
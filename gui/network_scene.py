@@ -1,43 +1,531 @@
 # gui/network_scene.py
 
-from PyQt5.QtWidgets import QGraphicsScene, QInputDialog, QMessageBox
-from PyQt5.QtCore import Qt
-from gui.node_item import NodeItem
+from contextlib import contextmanager
+
+import numpy as np
+from PyQt5.QtWidgets import QGraphicsRectItem, QGraphicsScene, QInputDialog, QMessageBox
+from PyQt5.QtGui import QBrush, QColor, QPen
+from PyQt5.QtCore import Qt, QRectF, QTimer, pyqtSignal
+from core.network_model import NODES_CHANGED, RESET, NetworkModel, PIXELS_PER_KM, encode
+from core.spatial_index import GridIndex
+from gui.node_item import NodeItem, NodeRecord
+from gui.node_property_dialog import NodePropertyDialog
 from gui.edge_item import EdgeItem
+from gui.edge_layer import EdgeLayer
+from gui.node_layer import NodeLayer
+from gui.undo_stack import AddRowsCommand, DeleteRowsCommand, MoveNodesCommand, SetPropertiesCommand, UndoHistory
 
 class QuantumNetworkScene(QGraphicsScene):
     """
     Scene handling interactive modes: add node, connect nodes, move nodes.
+
+    The topology itself is kept in `self.model` (a Qt-free NetworkModel);
+    NodeItem/EdgeItem are views over its rows, indexed by id in
+    `node_items` and `edge_items`.
+
+    Nodes are located through `spatial_index`, a grid over the model's
+    coordinate columns, rather than Qt's BSP tree: the BSP tree is rebuilt
+    whenever items are added or moved, which takes seconds on maps with
+    tens of thousands of long fiber lines. Clicks, connect-mode snapping
+    and rubber-band selection all query the grid.
+
+    Edges are drawn either as one EdgeItem each ("items") or all together
+    by a single EdgeLayer ("batched"), which big maps switch to
+    automatically; in batched mode `edge_items` stays empty and selected
+    edges are tracked by the layer. selected_edge_ids() and
+    select_edges() work in both modes.
+
+    Nodes likewise: NodeItems, or a single NodeLayer blitting cached
+    sprites, in which case the scene itself handles selecting, dragging
+    and editing nodes and hands out NodeRecords where a NodeItem would be
+    expected. Batched nodes imply batched edges.
+
+    Interactive edits (adding, connecting, moving, deleting, editing
+    properties) are pushed to `undo_stack`; loading or clearing the model
+    empties it.
     """
+    # Scene units from a node's centre that count as a hit (NodeItem is 30 across)
+    NODE_PICK_RADIUS = 15
+    # Screen pixels within which a click in connect mode snaps to a node
+    SNAP_DISTANCE = 20
+    # Maps with more links than this are drawn by an EdgeLayer
+    BATCHED_EDGE_THRESHOLD = 20000
+    # Maps with more nodes than this are drawn by a NodeLayer
+    BATCHED_NODE_THRESHOLD = 20000
+
+    edge_rendering_changed = pyqtSignal(str)
+    node_rendering_changed = pyqtSignal(str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setSceneRect(0, 0, 1000, 700)
+        self.setItemIndexMethod(QGraphicsScene.NoIndex)
 
         self.current_mode = "add_node"
         self.temp_source_node = None
 
+        self.model = NetworkModel()
+        self.model.add_listener(self._on_model_change)
+        self.spatial_index = GridIndex(self.model)
+        self.undo_stack = UndoHistory(self)
+        self.node_items = {}
+        self.edge_items = {}
+        self.edge_layer = None
+        self.node_layer = None
+        self._bulk_depth = 0
+        self._band_origin = None
+        self._band = None
+        self._drag = None  # batched nodes: (press position, ids, start x, start y)
+        self._move_start = None  # NodeItems being dragged: (ids, start x, start y)
+
+        # Dragged NodeItems and the edges whose endpoints moved: their
+        # positions go to the model and the edges are redrawn together,
+        # once per frame
+        self._moved_nodes = {}
+        self._dirty_edges = set()
+        self._edge_timer = QTimer(self)
+        self._edge_timer.setSingleShot(True)
+        self._edge_timer.timeout.connect(self.flush_edge_updates)
+
+    def _on_model_change(self, event, ids, name):
+        if event == RESET:
+            # Ids were renumbered or dropped; no command can be replayed
+            self.undo_stack.clear()
+        elif event == NODES_CHANGED and name == "node_type" and self.node_items:
+            for node_id in ids.tolist():
+                node = self.node_items.get(node_id)
+                if node is not None:
+                    node.update_appearance()
+
     def setMode(self, mode):
         self.current_mode = mode
         if mode == "connect":
             self.temp_source_node = None
 
+    def create_node(self, x, y, **properties):
+        """Add a node to the model and a NodeItem viewing it to the scene (a NodeRecord in batched mode)."""
+        node_id = self.model.add_node(x, y, **properties)
+        if self.node_layer is not None:
+            return NodeRecord(self.model, node_id)
+        node = NodeItem(self.model, node_id)
+        self.node_items[node_id] = node
+        self.addItem(node)
+        return node
+
+    def create_edge(self, source, target):
+        """
+        Add an edge between two NodeItems to the model and the scene and
+        return its id. In batched mode no EdgeItem is made (the layer draws it).
+        """
+        edge_id = self.model.add_edge(source.node_id, target.node_id)
+        if self.edge_layer is None:
+            edge = EdgeItem(source, target, edge_id)
+            self.edge_items[edge_id] = edge
+            self.addItem(edge)
+        return edge_id
+
+    @property
+    def edge_rendering(self):
+        return "batched" if self.edge_layer is not None else "items"
+
+    def set_edge_rendering(self, mode):
+        """Switch between one EdgeItem per link ("items") and a single EdgeLayer ("batched")."""
+        if mode == self.edge_rendering:
+            return
+        selected = self.selected_edge_ids()
+        if mode == "batched":
+            for edge in self.edge_items.values():
+                self.removeItem(edge)
+            for node in self.node_items.values():
+                node.edges.clear()
+            self.edge_items.clear()
+            self._dirty_edges.clear()
+            self.edge_layer = EdgeLayer(self.model)
+            self.addItem(self.edge_layer)
+        elif mode == "items":
+            self.set_node_rendering("items")
+            self.edge_layer.close()
+            self.removeItem(self.edge_layer)
+            self.edge_layer = None
+            self._add_edge_items(self.model.edge_ids().tolist())
+        else:
+            raise ValueError(f"Unknown edge rendering {mode!r}")
+        self.select_edges(selected)
+        self.edge_rendering_changed.emit(mode)
+
+    @property
+    def node_rendering(self):
+        return "batched" if self.node_layer is not None else "items"
+
+    def set_node_rendering(self, mode):
+        """Switch between one NodeItem per node ("items") and a single NodeLayer ("batched")."""
+        if mode == self.node_rendering:
+            return
+        selected = self.selected_node_ids()
+        self.temp_source_node = None
+        if mode == "batched":
+            self.set_edge_rendering("batched")
+            self.blockSignals(True)
+            for node in self.node_items.values():
+                self.removeItem(node)
+            self.blockSignals(False)
+            self.node_items.clear()
+            self.node_layer = NodeLayer(self.model, self.spatial_index, self.NODE_PICK_RADIUS * 2)
+            self.addItem(self.node_layer)
+        elif mode == "items":
+            self.node_layer.close()
+            self.removeItem(self.node_layer)
+            self.node_layer = None
+            self._add_node_items(self.model.node_ids().tolist())
+        else:
+            raise ValueError(f"Unknown node rendering {mode!r}")
+        self.select_nodes(selected)
+        self.node_rendering_changed.emit(mode)
+
+    @contextmanager
+    def bulk_insert(self):
+        """
+        Suspend view repaints while many items are added, then fit the
+        scene rect once at the end. Nested uses only restore on the
+        outermost exit.
+        """
+        self._bulk_depth += 1
+        if self._bulk_depth == 1:
+            for view in self.views():
+                view.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self._bulk_depth -= 1
+            if self._bulk_depth == 0:
+                for view in self.views():
+                    view.setUpdatesEnabled(True)
+                self.fit_scene_rect()
+
+    def add_items(self, node_ids=(), edge_ids=(), batch_size=20000, progress=None):
+        """
+        Create items for model rows that were added in bulk (file loads,
+        imports), inside bulk_insert(). `progress(done, total)` is called
+        after every batch.
+        """
+        node_ids = [int(i) for i in node_ids]
+        edge_ids = [int(i) for i in edge_ids]
+        total = len(node_ids) + len(edge_ids)
+        with self.bulk_insert():
+            done = 0
+            if self.node_layer is None and len(self.node_items) + len(node_ids) > self.BATCHED_NODE_THRESHOLD:
+                self.set_node_rendering("batched")
+            if self.node_layer is not None:
+                node_ids = []  # drawn by the layer
+            for start in range(0, len(node_ids), batch_size):
+                self._add_node_items(node_ids[start:start + batch_size])
+                done += len(node_ids[start:start + batch_size])
+                if progress is not None:
+                    progress(done, total)
+            if self.edge_layer is None and len(self.edge_items) + len(edge_ids) > self.BATCHED_EDGE_THRESHOLD:
+                self.set_edge_rendering("batched")
+            if self.edge_layer is not None:
+                # The layer picked the new rows up from the model already
+                if progress is not None:
+                    progress(total, total)
+                return
+            for start in range(0, len(edge_ids), batch_size):
+                self._add_edge_items(edge_ids[start:start + batch_size])
+                done += min(batch_size, len(edge_ids) - start)
+                if progress is not None:
+                    progress(done, total)
+
+    def _add_node_items(self, node_ids):
+        for node_id in node_ids:
+            node = NodeItem(self.model, node_id)
+            self.node_items[node_id] = node
+            self.addItem(node)
+
+    def _add_edge_items(self, edge_ids):
+        src, dst = self.model.edge_endpoints(edge_ids)
+        for edge_id, s, t in zip(edge_ids, src.tolist(), dst.tolist()):
+            edge = EdgeItem(self.node_items[s], self.node_items[t], edge_id)
+            self.edge_items[edge_id] = edge
+            self.addItem(edge)
+
+    def node_moved(self, node):
+        """
+        Mark a NodeItem whose position changed. Its coordinates reach the
+        model in flush_edge_updates(), one set_positions() call for every
+        node moved since the last frame, so listeners hear of a drag once
+        per frame rather than once per node.
+        """
+        self._moved_nodes[node.node_id] = node
+        self.edges_moved(node.edges)
+
+    def edges_moved(self, edges):
+        """
+        Mark edges whose endpoints moved. Their lines are recomputed in one
+        pass by flush_edge_updates(), which runs after the current mouse
+        move (or before the next frame for programmatic moves), so an edge
+        shared by two dragged nodes is only touched once.
+        """
+        self._dirty_edges.update(edges)
+        if not self._edge_timer.isActive():
+            self._edge_timer.start(0)
+
+    def flush_edge_updates(self):
+        """Write moved nodes to the model, then set the line of every dirty edge from its columns."""
+        self._edge_timer.stop()
+        if self._moved_nodes:
+            nodes = [node for node_id, node in self._moved_nodes.items() if self.node_items.get(node_id) is node]
+            self._moved_nodes.clear()
+            if nodes:
+                ids = np.fromiter((node.node_id for node in nodes), dtype=np.int64, count=len(nodes))
+                xy = np.array([(node.x(), node.y()) for node in nodes], dtype=np.float64).reshape(-1, 2)
+                self.model.set_positions(ids, xy[:, 0], xy[:, 1])
+        if self.edge_layer is not None:
+            self.edge_layer.flush()
+        edges = [edge for edge in self._dirty_edges if edge.edge_id in self.edge_items]
+        self._dirty_edges.clear()
+        if not edges:
+            return
+        ids = np.fromiter((edge.edge_id for edge in edges), dtype=np.int64, count=len(edges))
+        src, dst = self.model.edge_endpoints(ids)
+        x = self.model.nodes["x"]
+        y = self.model.nodes["y"]
+        lines = np.stack([x[src], y[src], x[dst], y[dst]], axis=1).tolist()
+        for edge, (x1, y1, x2, y2) in zip(edges, lines):
+            edge.setLine(x1, y1, x2, y2)
+
+    def fit_scene_rect(self, margin=100.0):
+        """Grow the scene rect to cover every node (from the model's columns)."""
+        mask = self.model.node_mask()
+        if not mask.any():
+            return
+        x = self.model.column("x")[mask]
+        y = self.model.column("y")[mask]
+        rect = QRectF(x.min() - margin, y.min() - margin,
+                      x.max() - x.min() + 2 * margin, y.max() - y.min() + 2 * margin)
+        self.setSceneRect(self.sceneRect().united(rect))
+
+    def clear_network(self):
+        """Remove every node and edge from the scene and the model."""
+        # Keep the layers alive through clear(); they reset with the model
+        layers = [layer for layer in (self.edge_layer, self.node_layer) if layer is not None]
+        for layer in layers:
+            self.removeItem(layer)
+        self.clear()
+        for layer in layers:
+            self.addItem(layer)
+        self.node_items.clear()
+        self.edge_items.clear()
+        self.temp_source_node = None
+        self._moved_nodes.clear()
+        self._dirty_edges.clear()
+        self._band_origin = None
+        self._band = None
+        self._drag = None
+        self.model.clear()
+
+    def delete_node(self, node):
+        """Remove a node, its incident edges, and their items."""
+        self.delete_nodes([node.node_id])
+
+    def delete_edge(self, edge):
+        """Remove a single edge and its item."""
+        self.delete_edges([edge.edge_id])
+
+    def delete_nodes(self, node_ids):
+        """
+        Remove many nodes, all their incident edges and the items of both in
+        one pass. Ids that are already gone are ignored. Returns the ids of
+        the edges removed with the nodes.
+        """
+        node_ids = np.unique(np.asarray(node_ids, dtype=np.int64))
+        edge_ids = self.model.remove_nodes(node_ids)
+        # One selectionChanged for the whole deletion instead of one per item
+        self.blockSignals(True)
+        try:
+            self._remove_edge_items(edge_ids)
+            for node_id in node_ids.tolist():
+                node = self.node_items.pop(node_id, None)
+                if node is not None:
+                    self.removeItem(node)
+            if self.temp_source_node is not None and not self.model.has_node(self.temp_source_node.node_id):
+                self.temp_source_node = None
+        finally:
+            self.blockSignals(False)
+        self.selectionChanged.emit()
+        return edge_ids
+
+    def delete_edges(self, edge_ids):
+        """Remove many edges and their items in one pass; ids already gone are ignored."""
+        edge_ids = np.unique(np.asarray(edge_ids, dtype=np.int64))
+        self.model.remove_edges(edge_ids)
+        self.blockSignals(True)
+        try:
+            self._remove_edge_items(edge_ids)
+        finally:
+            self.blockSignals(False)
+        self.selectionChanged.emit()
+
+    def _remove_edge_items(self, edge_ids):
+        for edge_id in edge_ids.tolist():
+            edge = self.edge_items.pop(edge_id, None)
+            if edge is None:
+                continue  # batched mode, or removed already
+            edge.source_node.remove_edge(edge)
+            edge.target_node.remove_edge(edge)
+            self._dirty_edges.discard(edge)
+            if edge.scene() is self:
+                self.removeItem(edge)
+
+    def delete_selection(self):
+        """Delete the selected nodes with their edges and the other selected edges, as one undo step."""
+        node_ids = self.selected_node_ids()
+        edge_ids = self.selected_edge_ids()
+        if node_ids or edge_ids:
+            self.undo_stack.push(DeleteRowsCommand(self, node_ids, edge_ids,
+                                                   f"Delete {len(node_ids)} Node(s), {len(edge_ids)} Link(s)"))
+
+    def move_nodes(self, node_ids, x, y):
+        """Put nodes at new positions, moving their items (or the layers) along."""
+        if self.node_layer is not None:
+            self.model.set_positions(node_ids, x, y)
+        else:
+            for node_id, px, py in zip(np.asarray(node_ids).tolist(), np.asarray(x).tolist(), np.asarray(y).tolist()):
+                node = self.node_items.get(node_id)
+                if node is not None:
+                    node.setPos(px, py)
+        self.flush_edge_updates()
+
+    def node_properties_edited(self, node_ids, changes):
+        """Record property edits already applied (by NodePropertyDialog) as one undo step."""
+        changes = {name: ([old] * len(node_ids), new) for name, (old, new) in changes.items()}
+        self.undo_stack.push(SetPropertiesCommand(self, node_ids, changes))
+
+    def set_node_properties(self, node_ids, values):
+        """
+        Set properties {name: value} on many nodes as one undo step. Each
+        property is one vectorized model update, so listeners (routing
+        weights, node colors, the journal) hear about it once.
+        """
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        changes = {}
+        for name, value in values.items():
+            old = self.model.nodes[name][node_ids].copy()
+            if (old == encode(name, value)).all():
+                continue
+            self.model.set_node_attributes(node_ids, name, value)
+            changes[name] = (old, value)
+        if changes:
+            self.undo_stack.push(SetPropertiesCommand(self, node_ids, changes,
+                                                      f"Edit {len(node_ids)} Node(s)"))
+
+    def _push_move(self, node_ids, old_x, old_y):
+        """Record a finished drag of `node_ids`, if it moved them at all."""
+        self.flush_edge_updates()
+        new_x = self.model.nodes["x"][node_ids].copy()
+        new_y = self.model.nodes["y"][node_ids].copy()
+        if np.array_equal(new_x, old_x) and np.array_equal(new_y, old_y):
+            return
+        self.undo_stack.push(MoveNodesCommand(self, node_ids, old_x, old_y, new_x, new_y,
+                                              f"Move {len(node_ids)} Node(s)"))
+
+    def selected_node_ids(self):
+        if self.node_layer is not None:
+            return sorted(self.node_layer.selected)
+        return [item.node_id for item in self.selectedItems() if isinstance(item, NodeItem)]
+
+    def select_nodes(self, node_ids, add=True):
+        """Select the given nodes, in addition to the current selection unless `add` is False."""
+        if self.node_layer is not None:
+            self.node_layer.set_selected(node_ids, add=add)
+            self.selectionChanged.emit()
+            return
+        # One selectionChanged for the whole set instead of one per node
+        self.blockSignals(True)
+        try:
+            if not add:
+                for item in self.selectedItems():
+                    if isinstance(item, NodeItem):
+                        item.setSelected(False)
+            for node_id in node_ids:
+                node = self.node_items.get(int(node_id))
+                if node is not None:
+                    node.setSelected(True)
+        finally:
+            self.blockSignals(False)
+        self.selectionChanged.emit()
+
+    def selected_edge_ids(self):
+        if self.edge_layer is not None:
+            return sorted(self.edge_layer.selected)
+        return [item.edge_id for item in self.selectedItems() if isinstance(item, EdgeItem)]
+
+    def select_edges(self, edge_ids, add=True):
+        """Select the given edges, in addition to the current selection unless `add` is False."""
+        if self.edge_layer is not None:
+            self.edge_layer.set_selected(edge_ids, add=add)
+            return
+        if not add:
+            for item in self.selectedItems():
+                if isinstance(item, EdgeItem):
+                    item.setSelected(False)
+        for edge_id in edge_ids:
+            edge = self.edge_items.get(int(edge_id))
+            if edge is not None:
+                edge.setSelected(True)
+
+    def edge_at(self, pos, distance=0.0):
+        """Id of the batched-mode edge within `distance` scene units of `pos`, or None."""
+        if self.edge_layer is None:
+            return None
+        return self.edge_layer.edge_at(pos.x(), pos.y(), distance)
+
+    def node_at(self, pos, distance=0.0):
+        """
+        The NodeItem (NodeRecord in batched mode) under scene position
+        `pos`, or the one nearest to it within `distance` scene units of its
+        outline; None if there is none.
+        """
+        node_id = self.spatial_index.nearest(pos.x(), pos.y(), self.NODE_PICK_RADIUS + distance)
+        if node_id is None:
+            return None
+        if self.node_layer is not None:
+            return NodeRecord(self.model, node_id)
+        return self.node_items.get(node_id)
+
+    def view_scale(self):
+        """Scene units per screen pixel of the first view (1 without a view)."""
+        if not self.views():
+            return 1.0
+        scale = self.views()[0].transform().m11()
+        return 1.0 / scale if scale > 0 else 1.0
+
+    def select_nodes_in_rect(self, rect, add=False):
+        """Select the nodes inside scene rect `rect`; keep the current selection with `add`."""
+        ids = self.spatial_index.nodes_in_rect(rect.left(), rect.top(), rect.right(), rect.bottom())
+        if not add:
+            self.blockSignals(True)
+            self.clearSelection()
+            self.blockSignals(False)
+            if self.edge_layer is not None:
+                self.edge_layer.set_selected(())
+        self.select_nodes(ids.tolist(), add=add)
+        return ids
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             if not self.views():
                 super().mousePressEvent(event)
                 return
 
-            view = self.views()[0]
-            item_clicked = self.itemAt(event.scenePos(), view.transform())
-
             if self.current_mode == "add_node":
                 x = event.scenePos().x()
                 y = event.scenePos().y()
-                node = NodeItem(x, y)
-                self.addItem(node)
+                node = self.create_node(x, y)
+                self.undo_stack.push(AddRowsCommand(self, [node.node_id], text="Add Node"))
 
             elif self.current_mode == "connect":
-                if isinstance(item_clicked, NodeItem):
+                item_clicked = self.node_at(event.scenePos(), self.SNAP_DISTANCE * self.view_scale())
+                if item_clicked is not None:
                     if self.temp_source_node is None:
                         # Select the first node
                         self.temp_source_node = item_clicked
@@ -45,24 +533,98 @@ class QuantumNetworkScene(QGraphicsScene):
                     else:
                         # Connect to the second node
                         if item_clicked != self.temp_source_node:
-                            edge = EdgeItem(self.temp_source_node, item_clicked)
-                            self.addItem(edge)
+                            edge_id = self.create_edge(self.temp_source_node, item_clicked)
+                            self.undo_stack.push(AddRowsCommand(self, edge_ids=[edge_id], text="Connect Nodes"))
                             self.statusBarMessage("Nodes connected.")
                         self.temp_source_node = None
                 else:
                     self.temp_source_node = None
 
             else:
-                # Move mode or default
-                pass
+                # Move mode: a press on empty space starts a selection rectangle
+                if self.node_layer is not None and self._press_batched_node(event):
+                    return
+                super().mousePressEvent(event)
+                if isinstance(self.mouseGrabberItem(), NodeItem):
+                    ids = np.array(self.selected_node_ids(), dtype=np.int64)
+                    self._move_start = (ids, self.model.nodes["x"][ids].copy(), self.model.nodes["y"][ids].copy())
+                if self.mouseGrabberItem() is None and self.node_at(event.scenePos()) is None:
+                    # Batched links are not items, so they are picked here
+                    add = bool(event.modifiers() & Qt.ControlModifier)
+                    edge_id = self.edge_at(event.scenePos(), 4 * self.view_scale())
+                    if edge_id is not None:
+                        self.select_edges([edge_id], add=add)
+                    else:
+                        if not add and self.edge_layer is not None:
+                            self.edge_layer.set_selected(())
+                        if not add and self.node_layer is not None and self.node_layer.selected:
+                            self.select_nodes((), add=False)
+                        self._band_origin = event.scenePos()
+                return
 
         super().mousePressEvent(event)
 
+    def _press_batched_node(self, event):
+        """Select (Ctrl: toggle) the batched node under the cursor and start dragging the selection."""
+        node = self.node_at(event.scenePos())
+        if node is None:
+            return False
+        selected = self.node_layer.selected
+        if event.modifiers() & Qt.ControlModifier:
+            if node.node_id in selected:
+                selected.discard(node.node_id)
+                self.node_layer.update()
+                self.selectionChanged.emit()
+                return True
+            self.select_nodes([node.node_id])
+        elif node.node_id not in selected:
+            self.clearSelection()
+            if self.edge_layer is not None:
+                self.edge_layer.set_selected(())
+            self.select_nodes([node.node_id], add=False)
+        ids = np.fromiter(selected, dtype=np.int64, count=len(selected))
+        self._drag = (event.scenePos(), ids, self.model.nodes["x"][ids].copy(), self.model.nodes["y"][ids].copy())
+        return True
+
     def mouseMoveEvent(self, event):
-        # Optionally, show a "rubber band" line while connecting
+        if self._drag is not None:
+            origin, ids, x, y = self._drag
+            delta = event.scenePos() - origin
+            self.model.set_positions(ids, x + delta.x(), y + delta.y())
+            self.flush_edge_updates()
+            return
+        if self._band_origin is not None:
+            rect = QRectF(self._band_origin, event.scenePos()).normalized()
+            if self._band is None:
+                self._band = QGraphicsRectItem()
+                self._band.setPen(QPen(QColor("steelblue"), 0, Qt.DashLine))
+                self._band.setBrush(QBrush(QColor(70, 130, 180, 40)))
+                self._band.setZValue(1e9)
+                self.addItem(self._band)
+            self._band.setRect(rect)
+            return
         super().mouseMoveEvent(event)
+        # A drag has moved every selected node by now
+        self.flush_edge_updates()
 
     def mouseReleaseEvent(self, event):
+        if self._drag is not None:
+            _, ids, x, y = self._drag
+            self._drag = None
+            self._push_move(ids, x, y)
+            return
+        if self._move_start is not None:
+            super().mouseReleaseEvent(event)
+            self._push_move(*self._move_start)
+            self._move_start = None
+            return
+        if self._band_origin is not None:
+            rect = QRectF(self._band_origin, event.scenePos()).normalized()
+            self._band_origin = None
+            if self._band is not None:
+                self.removeItem(self._band)
+                self._band = None
+                self.select_nodes_in_rect(rect, add=bool(event.modifiers() & Qt.ControlModifier))
         super().mouseReleaseEvent(event)
 
     def addNodeAtCoordinates(self):
@@ -78,11 +640,11 @@ class QuantumNetworkScene(QGraphicsScene):
             return
 
         try:
-            # Apply a scale factor if necessary (e.g., 1 km = 10 pixels)
-            x_val = float(x_str) * 10  # Example scale factor
-            y_val = float(y_str) * 10
-            node = NodeItem(x_val, y_val)
-            self.addItem(node)
+            # Apply the km-to-pixel scale factor
+            x_val = float(x_str) * PIXELS_PER_KM
+            y_val = float(y_str) * PIXELS_PER_KM
+            node = self.create_node(x_val, y_val)
+            self.undo_stack.push(AddRowsCommand(self, [node.node_id], text="Add Node"))
             self.statusBarMessage(f"Node added at ({x_val}, {y_val}) pixels.")
         except ValueError:
             QMessageBox.warning(None, "Invalid Input", "Coordinates must be numeric.")
@@ -97,21 +659,27 @@ class QuantumNetworkScene(QGraphicsScene):
         if hasattr(window, 'status_bar'):
             window.status_bar.showMessage(message, timeout)
 
+    def _edit_batched_node(self, event):
+        """Open the property dialog of the batched node under the cursor, if any."""
+        node = self.node_at(event.scenePos()) if self.node_layer is not None else None
+        if node is None:
+            return False
+        dialog = NodePropertyDialog(node)
+        if dialog.exec_() and dialog.changes:
+            self.node_properties_edited([node.node_id], dialog.changes)
+        return True
+
+    def mouseDoubleClickEvent(self, event):
+        if not self._edit_batched_node(event):
+            super().mouseDoubleClickEvent(event)
+
+    def contextMenuEvent(self, event):
+        if not self._edit_batched_node(event):
+            super().contextMenuEvent(event)
+
     def keyPressEvent(self, event):
         """Handle key press events for deleting selected items."""
         if event.key() == Qt.Key_Delete:
-            for item in self.selectedItems():
-                # Remove edges connected to a node
-                if isinstance(item, NodeItem):
-                    item.remove_all_edges(self)
-
-                # Remove the edge itself
-                elif isinstance(item, EdgeItem):
-                    item.source_node.remove_edge(item)
-                    item.target_node.remove_edge(item)
-                    self.removeItem(item)
-
-                # Remove the item itself (node or edge)
-                self.removeItem(item)
+            self.delete_selection()
         else:
             super().keyPressEvent(event)
@@ -5,6 +5,30 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QGraphicsEllipseItem
 from gui.node_property_dialog import NodePropertyDialog
 
+# Fill color of each node type; built once and shared by every NodeItem
+# and by the batched NodeLayer
+NODE_COLORS = {
+    "memory": QColor("yellow"),
+    "detector": QColor("lightblue"),
+    "memory-detector": QColor("pink"),
+    "repeater": QColor("lightgreen"),
+}
+DEFAULT_NODE_COLOR = QColor("gray")
+_NODE_BRUSHES = {node_type: QBrush(color) for node_type, color in NODE_COLORS.items()}
+_DEFAULT_BRUSH = QBrush(DEFAULT_NODE_COLOR)
+
+
+def _model_property(name):
+    """Expose a NetworkModel node column as a plain attribute of the item."""
+    def getter(self):
+        return self.model.get_node_attribute(self.node_id, name)
+
+    def setter(self, value):
+        self.model.set_node_attribute(self.node_id, name, value)
+
+    return property(getter, setter)
+
+
 class NodeItem(QGraphicsEllipseItem):
     """
     Represents a quantum network node with attributes:
@@ -13,69 +37,63 @@ class NodeItem(QGraphicsEllipseItem):
       - qubit_tech
       - coherence_time
       - insertion_loss
+
+    The attributes live in the scene's NetworkModel row `node_id`; the item
+    is only a view over that row.
     """
-    def __init__(self, x, y, radius=30):
+    node_type = _model_property("node_type")
+    num_qubits = _model_property("num_qubits")
+    qubit_tech = _model_property("qubit_tech")
+    coherence_time = _model_property("coherence_time")
+    insertion_loss = _model_property("insertion_loss")
+
+    def __init__(self, model, node_id, radius=30):
         super().__init__(-radius/2, -radius/2, radius, radius)
-        self.setPos(x, y)
+        self.model = model
+        self.node_id = node_id
+        self.setPos(model.nodes["x"][node_id], model.nodes["y"][node_id])
         self.setFlags(
     QGraphicsEllipseItem.ItemIsSelectable |
     QGraphicsEllipseItem.ItemIsMovable |
     QGraphicsEllipseItem.ItemSendsGeometryChanges  # Enable itemChange for position changes
 )
 
-        # Default properties
-        self.node_type = "memory"
-        self.num_qubits = 1
-        self.qubit_tech = "Color centers"
-        self.coherence_time = 1.0
-        self.insertion_loss = 0.0
-
         self.radius = radius
-        self.edges = [] # List of edges connected to the node
+        self.edges = set() # Edges connected to the node
         self.setPen(QPen(Qt.black, 2))
-        self.setBrush(QBrush(QColor("yellow")))
+        self.update_appearance()
 
     def contextMenuEvent(self, event):
         """Right-click opens the property dialog to edit node properties."""
-        dialog = NodePropertyDialog(self)
-        dialog.exec_()
+        self.edit_properties()
 
     def mouseDoubleClickEvent(self, event):
         """Double-click opens the property dialog."""
+        self.edit_properties()
+
+    def edit_properties(self):
         dialog = NodePropertyDialog(self)
-        dialog.exec_()
+        if dialog.exec_() and dialog.changes and hasattr(self.scene(), "node_properties_edited"):
+            self.scene().node_properties_edited([self.node_id], dialog.changes)
 
     def update_appearance(self):
         """Update the node's color based on its type."""
-        type_color_map = {
-            "memory": QColor("yellow"),
-            "detector": QColor("lightblue"),
-            "memory-detector": QColor("pink"),
-            "repeater": QColor("lightgreen")
-        }
-        color = type_color_map.get(self.node_type, QColor("gray"))
-        self.setBrush(QBrush(color))
+        self.setBrush(_NODE_BRUSHES.get(self.node_type, _DEFAULT_BRUSH))
 
     def add_edge (self, edge):
         """Add an edge to the node."""
-        if not hasattr(self, "edges"):
-            self.edges = []
-        self.edges.append(edge)
+        self.edges.add(edge)
 
     def remove_edge(self, edge):
-        """Remove an edge from the node."""
-        if hasattr(self, "edges"):
-            self.edges.remove(edge)
+        """Remove an edge from the node (no-op if it is not attached)."""
+        self.edges.discard(edge)
 
     def remove_all_edges(self, scene):
         """Remove all edges connected to the node."""
-        for edge in self.get_edges()[:]: # Copy the list to avoid modification during iteration
-            scene.removeItem(edge) # Remove the edge from the scene
-            edge.source_node.remove_edge(edge) 
-            edge.target_node.remove_edge(edge)
+        scene.delete_edges([edge.edge_id for edge in self.edges]) # Drops them from the model, both nodes and the scene
 
     def get_edges(self):
-        """Return the list of edges connected to the node."""
+        """Return the set of edges connected to the node."""
         return self.edges
     
     def get_node_type(self):
@@ -84,7 +102,44 @@ class NodeItem(QGraphicsEllipseItem):
 
     def itemChange(self, change, value):
         """Update the edges connected to the node."""
-        if change == QGraphicsEllipseItem.ItemPositionChange:
-            for edge in self.edges:
-                edge.update_positions()
-        return super().itemChange(change, value)
\ No newline at end of file
+        if change == QGraphicsEllipseItem.ItemPositionHasChanged:
+            scene = self.scene()
+            if hasattr(scene, "node_moved"):
+                # Deferred: the scene writes every moved node to the model
+                # in one call and redraws each edge once per frame
+                scene.node_moved(self)
+            else:
+                # Keep the model's coordinate columns in sync with the view
+                self.model.set_position(self.node_id, value.x(), value.y())
+                for edge in self.edges:
+                    edge.update_positions()
+        return super().itemChange(change, value)
+
+
+class NodeRecord:
+    """
+    Stand-in for a NodeItem when nodes are drawn by a NodeLayer: the same
+    model-backed attributes, for the property dialog and connect mode,
+    without a graphics item. The layer repaints on model changes itself.
+    """
+    node_type = _model_property("node_type")
+    num_qubits = _model_property("num_qubits")
+    qubit_tech = _model_property("qubit_tech")
+    coherence_time = _model_property("coherence_time")
+    insertion_loss = _model_property("insertion_loss")
+
+    def __init__(self, model, node_id):
+        self.model = model
+        self.node_id = node_id
+
+    def __eq__(self, other):
+        return isinstance(other, NodeRecord) and other.model is self.model and other.node_id == self.node_id
+
+    def __hash__(self):
+        return hash(self.node_id)
+
+    def update_appearance(self):
+        pass
+
+    def get_node_type(self):
+        return self.node_type
@@ -0,0 +1,171 @@
+# gui/node_layer.py
+
+import math
+
+import numpy as np
+from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap, QPolygonF
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtWidgets import QGraphicsItem
+
+from core.network_model import NODE_TYPES, NODES_ADDED, NODES_CHANGED, NODES_MOVED, NODES_REMOVED, RESET
+from gui.node_item import DEFAULT_NODE_COLOR, NODE_COLORS
+
+# Nodes smaller than this on screen are drawn as dots
+DOT_PIXELS = 4
+# Sprites are rendered for zoom factors 2**k, k in this range
+MIN_ZOOM_LEVEL, MAX_ZOOM_LEVEL = -2, 4
+SELECTED_COLOR = QColor("#BB86FC")
+
+
+class NodeLayer(QGraphicsItem):
+    """
+    Draws every node of a NetworkModel as one graphics item.
+
+    Each node type is pre-rendered once per selection state and zoom level
+    (powers of two) into a sprite pixmap; a repaint looks up the visible
+    nodes in the scene's GridIndex and blits them with one
+    drawPixmapFragments call per sprite. Nodes smaller than DOT_PIXELS on
+    screen are drawn as dots instead: one drawPoints call per type, with
+    the point array filled straight from NumPy.
+
+    Selection is the set of ids in `selected`; the scene handles clicks,
+    drags and the property dialog (through NodeRecord).
+    """
+    def __init__(self, model, spatial_index, diameter=30):
+        super().__init__()
+        self.model = model
+        self.spatial_index = spatial_index
+        self.diameter = diameter
+        self.selected = set()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+        self._sprites = {}  # (type code, selected, zoom level) -> QPixmap
+        self._dot_pens = {}  # (type code, selected) -> QPen
+        self._bounds = QRectF()
+        model.add_listener(self._on_model_change)
+        self._grow(model.node_ids())
+
+    def close(self):
+        self.model.remove_listener(self._on_model_change)
+
+    def _grow(self, ids):
+        """Extend the bounding rect over nodes `ids`."""
+        if len(ids) == 0:
+            return
+        x = self.model.nodes["x"][ids]
+        y = self.model.nodes["y"][ids]
+        r = self.diameter
+        rect = QRectF(float(x.min()) - r, float(y.min()) - r,
+                      float(x.max() - x.min()) + 2 * r, float(y.max() - y.min()) + 2 * r)
+        if not self._bounds.contains(rect):
+            self.prepareGeometryChange()
+            self._bounds = self._bounds.united(rect)
+
+    def _on_model_change(self, event, ids, name):
+        if event in (NODES_ADDED, NODES_MOVED):
+            self._grow(ids)
+        elif event == NODES_REMOVED:
+            self.selected.difference_update(ids.tolist())
+        elif event == RESET:
+            self.selected.clear()
+            self.prepareGeometryChange()
+            self._bounds = QRectF()
+            self._grow(self.model.node_ids())
+        elif event != NODES_CHANGED:
+            return
+        self.update()
+
+    def set_selected(self, node_ids, add=False):
+        if not add:
+            self.selected.clear()
+        self.selected.update(int(i) for i in node_ids)
+        self.update()
+
+    # ------------------------------------------------------------------
+    # Sprites
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _color(code):
+        return NODE_COLORS.get(NODE_TYPES[code] if code < len(NODE_TYPES) else None, DEFAULT_NODE_COLOR)
+
+    def _sprite(self, code, selected, level):
+        key = (code, selected, level)
+        pixmap = self._sprites.get(key)
+        if pixmap is None:
+            zoom = 2.0 ** level
+            side = self.diameter + 4  # room for the outline
+            pixmap = QPixmap(max(int(math.ceil(side * zoom)), 1), max(int(math.ceil(side * zoom)), 1))
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.scale(pixmap.width() / side, pixmap.height() / side)
+            painter.translate(side / 2, side / 2)
+            r = self.diameter / 2
+            painter.setPen(QPen(Qt.black, 2))
+            painter.setBrush(self._color(code))
+            painter.drawEllipse(QRectF(-r, -r, 2 * r, 2 * r))
+            if selected:
+                # Same dashed box Qt draws around a selected NodeItem
+                painter.setPen(QPen(Qt.black, 0, Qt.DashLine))
+                painter.setBrush(Qt.NoBrush)
+                painter.drawRect(QRectF(-r - 1, -r - 1, 2 * r + 2, 2 * r + 2))
+            painter.end()
+            self._sprites[key] = pixmap
+        return pixmap
+
+    def _dot_pen(self, code, selected):
+        pen = self._dot_pens.get((code, selected))
+        if pen is None:
+            pen = QPen(SELECTED_COLOR if selected else self._color(code), DOT_PIXELS - 1)
+            pen.setCosmetic(True)
+            self._dot_pens[(code, selected)] = pen
+        return pen
+
+    # ------------------------------------------------------------------
+    # QGraphicsItem
+    # ------------------------------------------------------------------
+    def boundingRect(self):
+        return self._bounds
+
+    def paint(self, painter, option, widget=None):
+        r = self.diameter
+        exposed = option.exposedRect
+        ids = self.spatial_index.nodes_in_rect(exposed.left() - r, exposed.top() - r,
+                                               exposed.right() + r, exposed.bottom() + r)
+        if len(ids) == 0:
+            return
+        x = self.model.nodes["x"][ids]
+        y = self.model.nodes["y"][ids]
+        codes = self.model.nodes["node_type"][ids]
+        selected = np.zeros(len(ids), dtype=bool)
+        if self.selected:
+            selected = np.isin(ids, np.fromiter(self.selected, dtype=np.int64, count=len(self.selected)))
+
+        scale = painter.worldTransform().m11()
+        dots = self.diameter * scale < DOT_PIXELS
+        level = min(max(math.ceil(math.log2(scale)) if scale > 0 else 0, MIN_ZOOM_LEVEL), MAX_ZOOM_LEVEL)
+        side = self.diameter + 4
+        for code in np.unique(codes).tolist():
+            for state in (False, True):
+                mask = (codes == code) & (selected == state)
+                count = int(np.count_nonzero(mask))
+                if count == 0:
+                    continue
+                if dots:
+                    points = QPolygonF()
+                    points.fill(QPointF(), count)
+                    buffer = points.data()
+                    buffer.setsize(16 * count)
+                    xy = np.frombuffer(buffer, dtype=np.float64).reshape(count, 2)
+                    xy[:, 0] = x[mask]
+                    xy[:, 1] = y[mask]
+                    painter.setPen(self._dot_pen(code, state))
+                    painter.drawPoints(points)
+                else:
+                    pixmap = self._sprite(code, state, level)
+                    source = QRectF(0, 0, pixmap.width(), pixmap.height())
+                    factor = side / pixmap.width()
+                    create = QPainter.PixmapFragment.create
+                    fragments = [create(QPointF(px, py), source, factor, factor)
+                                 for px, py in zip(x[mask].tolist(), y[mask].tolist())]
+                    painter.drawPixmapFragments(fragments, pixmap)
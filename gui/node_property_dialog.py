@@ -4,6 +4,27 @@ from PyQt5.QtWidgets import (
     QDialog, QFormLayout, QLabel, QLineEdit, QComboBox,
     QPushButton, QVBoxLayout, QMessageBox
 )
+from core.network_model import NODE_TYPES, QUBIT_TECHS
+
+# Numeric properties: (parse, lower bound, message shown when invalid)
+NUMERIC_PROPERTIES = {
+    "num_qubits": (int, 1, "Number of Qubits must be a positive integer."),
+    "coherence_time": (float, 0, "Coherence Time must be a non-negative number."),
+    "insertion_loss": (float, 0, "Photon Insertion Loss must be a non-negative number."),
+}
+
+
+def parse_property(name, text):
+    """Parse the text of a numeric property field; ValueError carries the message to show."""
+    parse, lower, message = NUMERIC_PROPERTIES[name]
+    try:
+        value = parse(text)
+    except ValueError:
+        raise ValueError(message) from None
+    if value < lower:
+        raise ValueError(message)
+    return value
+
 
 class NodePropertyDialog(QDialog):
     """
@@ -17,6 +38,7 @@ class NodePropertyDialog(QDialog):
     def __init__(self, node_item, parent=None):
         super().__init__(parent)
         self.node_item = node_item
+        self.changes = {}  # property name -> (old value, new value), filled by accept()
         self.setWindowTitle("Node Properties")
         self.setup_ui()
 
@@ -25,7 +47,7 @@ class NodePropertyDialog(QDialog):
 
         # Node Type
         self.nodeTypeCombo = QComboBox()
-        self.nodeTypeCombo.addItems(["memory", "detector", "memory-detector", "repeater"])
+        self.nodeTypeCombo.addItems(NODE_TYPES)
         self.nodeTypeCombo.setCurrentText(self.node_item.node_type)
         layout.addRow(QLabel("Node Type:"), self.nodeTypeCombo)
 
@@ -35,7 +57,7 @@ class NodePropertyDialog(QDialog):
 
         # Qubit Technology
         self.qubitTechCombo = QComboBox()
-        self.qubitTechCombo.addItems(["Color centers", "Atoms", "Ions", "Superconducting"])
+        self.qubitTechCombo.addItems(QUBIT_TECHS)
         self.qubitTechCombo.setCurrentText(self.node_item.qubit_tech)
         layout.addRow(QLabel("Qubit Tech:"), self.qubitTechCombo)
 
@@ -62,42 +84,29 @@ class NodePropertyDialog(QDialog):
         self.cancelButton.clicked.connect(self.reject)
 
     def accept(self):
-        """Save changes and update the node."""
-        # Update node_type
-        self.node_item.node_type = self.nodeTypeCombo.currentText()
-
-        # Update num_qubits with validation
+        """Validate every field, then write only the changed properties to the node."""
         try:
-            num_qubits = int(self.qubitsEdit.text())
-            if num_qubits < 1:
-                raise ValueError
-            self.node_item.num_qubits = num_qubits
-        except ValueError:
-            QMessageBox.warning(self, "Invalid Input", "Number of Qubits must be a positive integer.")
+            num_qubits = parse_property("num_qubits", self.qubitsEdit.text())
+            coherence_time = parse_property("coherence_time", self.coherenceTimeEdit.text())
+            insertion_loss = parse_property("insertion_loss", self.insertionLossEdit.text())
+        except ValueError as exc:
+            QMessageBox.warning(self, "Invalid Input", str(exc))
             return
 
-        # Update qubit_tech
-        self.node_item.qubit_tech = self.qubitTechCombo.currentText()
-
-        # Update coherence_time with validation
-        try:
-            coherence_time = float(self.coherenceTimeEdit.text())
-            if coherence_time < 0:
-                raise ValueError
-            self.node_item.coherence_time = coherence_time
-        except ValueError:
-            QMessageBox.warning(self, "Invalid Input", "Coherence Time must be a non-negative number.")
-            return
-
-        # Update insertion_loss with validation
-        try:
-            insertion_loss = float(self.insertionLossEdit.text())
-            if insertion_loss < 0:
-                raise ValueError
-            self.node_item.insertion_loss = insertion_loss
-        except ValueError:
-            QMessageBox.warning(self, "Invalid Input", "Photon Insertion Loss must be a non-negative number.")
-            return
+        # Each assignment is one model edit (and one autosave journal entry),
+        # so unchanged fields are skipped
+        values = {
+            "node_type": self.nodeTypeCombo.currentText(),
+            "num_qubits": num_qubits,
+            "qubit_tech": self.qubitTechCombo.currentText(),
+            "coherence_time": coherence_time,
+            "insertion_loss": insertion_loss,
+        }
+        for name, value in values.items():
+            old = getattr(self.node_item, name)
+            if old != value:
+                setattr(self.node_item, name, value)
+                self.changes[name] = (old, value)
 
         # Update appearance based on node_type
         self.node_item.update_appearance()
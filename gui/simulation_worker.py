@@ -0,0 +1,55 @@
+# gui/simulation_worker.py
+
+import queue
+
+from PyQt5.QtCore import QThread
+
+
+class SimulationWorker(QThread):
+    """
+    Runs a core Simulation or MonteCarlo job off the GUI thread.
+
+    Progress snapshots (fraction done plus a one-line summary) are pushed
+    into a small bounded queue that the window drains on a timer. When the
+    GUI falls behind, the oldest snapshot is dropped rather than blocking
+    the simulation. `result` and `error` are set once the thread finishes.
+    """
+    def __init__(self, job, max_pending=16, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.progress_queue = queue.Queue(maxsize=max_pending)
+        self.result = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.result = self.job.run(progress=self.report)
+        except Exception as exc:  # surfaced by the window once the thread finishes
+            self.error = exc
+
+    def report(self, fraction, result):
+        snapshot = (fraction, result.summary())
+        while True:
+            try:
+                self.progress_queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self.progress_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def cancel(self):
+        self.job.cancel()
+
+    def was_cancelled(self):
+        return self.job.cancelled
+
+    def drain(self):
+        """Return every snapshot queued since the last call (oldest first)."""
+        snapshots = []
+        while True:
+            try:
+                snapshots.append(self.progress_queue.get_nowait())
+            except queue.Empty:
+                return snapshots
@@ -0,0 +1,145 @@
+# gui/sweep_dialog.py
+
+import numpy as np
+from PyQt5.QtWidgets import (
+    QDialog, QFormLayout, QLabel, QLineEdit, QComboBox, QSpinBox, QFileDialog,
+    QHBoxLayout, QPushButton, QVBoxLayout, QMessageBox
+)
+
+from core.network_model import NODE_TYPES, QUBIT_TECHS
+from core.sweep import CONFIG_PARAMETERS, DESIGNS, NODE_PARAMETERS, SweepParameter, SweepSpec
+
+# Rows of (parameter, values) in the dialog; unused rows are left at NO_PARAMETER
+PARAMETER_ROWS = 4
+NO_PARAMETER = "(none)"
+DESIGN_LABELS = {"grid": "Full grid", "lhs": "Latin hypercube"}
+SWEEP_FILTER = "Sweep Results (*.npz);;CSV Files (*.csv)"
+
+
+class SweepDialog(QDialog):
+    """
+    Set up a parameter sweep: up to PARAMETER_ROWS node properties or
+    simulation settings, each given as a list of values ("1, 2, 4") or a
+    range ("0.01..10", "0.01..10:log" for log spacing), combined as a full
+    grid or a Latin-hypercube sample.
+
+    Node properties are set on the chosen target nodes at each point. After
+    OK, `spec` (core.sweep.SweepSpec), `workers` (None for one per CPU) and
+    `path` (results file, or None) describe the sweep to run.
+    """
+    def __init__(self, model, selected_ids, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.selected_ids = np.asarray(selected_ids, dtype=np.int64)
+        self.spec = None
+        self.workers = None
+        self.path = None
+        self.setWindowTitle("Configure Parameter Sweep")
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QFormLayout()
+
+        # Parameter rows
+        self.rows = []
+        for i in range(PARAMETER_ROWS):
+            combo = QComboBox()
+            combo.addItems((NO_PARAMETER,) + NODE_PARAMETERS + CONFIG_PARAMETERS)
+            values = QLineEdit()
+            values.setPlaceholderText("1, 2, 4   or   0.01..10:log")
+            combo.currentTextChanged.connect(lambda text, values=values: values.setEnabled(text != NO_PARAMETER))
+            values.setEnabled(False)
+            self.rows.append((combo, values))
+            layout.addRow(combo, values)
+        self.rows[0][0].setCurrentText("coherence_time")
+        self.rows[0][1].setText("0.01..10:log")
+
+        # Nodes the node properties are swept on, as (label, criteria); None is the selection
+        self.targets = [(f"Selected nodes ({len(self.selected_ids)})", None), ("All nodes", {})]
+        self.targets += [(f"All {node_type} nodes", {"node_type": node_type}) for node_type in NODE_TYPES]
+        self.targets += [(f"All {tech} nodes", {"qubit_tech": tech}) for tech in QUBIT_TECHS]
+        self.targetCombo = QComboBox()
+        self.targetCombo.addItems([label for label, _ in self.targets])
+        self.targetCombo.setCurrentIndex(0 if len(self.selected_ids) else 1)
+        layout.addRow(QLabel("Node Properties On:"), self.targetCombo)
+
+        # Design
+        self.designCombo = QComboBox()
+        self.designCombo.addItems([DESIGN_LABELS[d] for d in DESIGNS])
+        layout.addRow(QLabel("Design:"), self.designCombo)
+        self.samplesSpin = QSpinBox()
+        self.samplesSpin.setRange(1, 100000)
+        self.samplesSpin.setValue(10)
+        self.samplesSpin.setToolTip("Steps per range (grid) or number of points (Latin hypercube)")
+        layout.addRow(QLabel("Samples:"), self.samplesSpin)
+        self.trialsSpin = QSpinBox()
+        self.trialsSpin.setRange(1, 10**6)
+        layout.addRow(QLabel("Trials per Point:"), self.trialsSpin)
+        self.workersSpin = QSpinBox()
+        self.workersSpin.setRange(0, 256)
+        self.workersSpin.setSpecialValueText("One per CPU")
+        layout.addRow(QLabel("Worker Processes:"), self.workersSpin)
+
+        # Results file
+        path_layout = QHBoxLayout()
+        self.pathEdit = QLineEdit()
+        self.pathEdit.setPlaceholderText("(not saved)")
+        browse = QPushButton("Browse...")
+        browse.clicked.connect(self.browse)
+        path_layout.addWidget(self.pathEdit)
+        path_layout.addWidget(browse)
+        layout.addRow(QLabel("Results File:"), path_layout)
+
+        # Buttons
+        button_layout = QVBoxLayout()
+        self.okButton = QPushButton("Run Sweep")
+        self.cancelButton = QPushButton("Cancel")
+        button_layout.addWidget(self.okButton)
+        button_layout.addWidget(self.cancelButton)
+
+        layout.addRow(button_layout)
+        self.setLayout(layout)
+
+        # Connect signals
+        self.okButton.clicked.connect(self.accept)
+        self.cancelButton.clicked.connect(self.reject)
+
+    def browse(self):
+        filename, chosen = QFileDialog.getSaveFileName(self, "Sweep Results", self.pathEdit.text(), SWEEP_FILTER)
+        if filename:
+            if not filename.lower().endswith((".npz", ".csv")):
+                filename += ".csv" if chosen.startswith("CSV") else ".npz"
+            self.pathEdit.setText(filename)
+
+    def target_ids(self):
+        criteria = self.targets[self.targetCombo.currentIndex()][1]
+        if criteria is None:
+            return self.selected_ids
+        return self.model.nodes_where(**criteria)
+
+    def accept(self):
+        """Parse every used row, then close with `spec`, `workers` and `path` set."""
+        nodes = self.target_ids()
+        parameters = []
+        for combo, values in self.rows:
+            name = combo.currentText()
+            if name == NO_PARAMETER:
+                continue
+            if name in NODE_PARAMETERS and len(nodes) == 0:
+                QMessageBox.warning(self, "Parameter Sweep", "No nodes match the selected target.")
+                return
+            try:
+                parameters.append(SweepParameter.parse(name, values.text(), nodes.tolist()))
+            except ValueError as exc:
+                QMessageBox.warning(self, "Invalid Input", str(exc))
+                values.setFocus()
+                return
+        try:
+            self.spec = SweepSpec(parameters, DESIGNS[self.designCombo.currentIndex()],
+                                  self.samplesSpin.value(), self.trialsSpin.value())
+        except ValueError as exc:
+            QMessageBox.warning(self, "Parameter Sweep", str(exc))
+            return
+        self.workers = self.workersSpin.value() or None
+        self.path = self.pathEdit.text().strip() or None
+        super().accept()
@@ -1,35 +1,270 @@
-from PyQt5.QtWidgets import QUndoCommand
+# gui/undo_stack.py
 
-class AddNodeCommand(QUndoCommand):
-    def __init__(self, scene, node_item, description="Add Node"):
-        super().__init__(description)
+import numpy as np
+from PyQt5.QtWidgets import QUndoCommand, QUndoStack
+
+from core.network_model import NODE_COLUMNS
+
+# Undo history for the network editor. Commands never hold graphics items:
+# they keep node/edge ids plus NumPy copies of just the rows they need, and
+# go through the scene (delete_nodes, add_items, move_nodes, ...) so that
+# items, layers and the model stay in step in every rendering mode. Removed
+# rows are brought back under their old ids (NetworkModel.restore_nodes),
+# so later commands' ids stay valid across undo and redo.
+
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+MOVE_NODES_ID = 1
+
+
+class UndoHistory(QUndoStack):
+    """
+    QUndoStack capped by the memory its commands hold rather than by their
+    number. Whenever the total exceeds `memory_limit` bytes, the commands
+    furthest from the current index, on either the undo or the redo side,
+    drop their data and become a barrier that undo or redo stops at.
+    `count_limit` still bounds the (by then tiny) expired commands kept.
+
+    Use this class's undo()/redo() (and can_undo()/can_redo()) rather than
+    the actions from createUndoAction(), which bypass the barrier.
+    """
+    def __init__(self, parent=None, memory_limit=DEFAULT_MEMORY_LIMIT, count_limit=1000):
+        super().__init__(parent)
+        self.memory_limit = memory_limit
+        self.setUndoLimit(count_limit)
+        if parent is not None:
+            # ~QUndoStack clears the stack, emitting indexChanged to slots
+            # that would then query a half-destroyed object
+            parent.destroyed.connect(lambda: self.blockSignals(True))
+
+    def push(self, command):
+        super().push(command)
+        self.enforce_limit()
+
+    def can_undo(self):
+        return self.canUndo() and not _expired(self.command(self.index() - 1))
+
+    def undo(self):
+        if self.can_undo():
+            super().undo()
+            self.enforce_limit()
+
+    def can_redo(self):
+        return self.canRedo() and not _expired(self.command(self.index()))
+
+    def redo(self):
+        if self.can_redo():
+            super().redo()
+            self.enforce_limit()
+
+    def memory_used(self):
+        return sum(_cost(self.command(i)) for i in range(self.count()))
+
+    def enforce_limit(self):
+        used = self.memory_used()
+        # Undone commands hold the rows redo needs, so they count as well;
+        # expire from both ends inwards, furthest from the index first
+        index = self.index()
+        order = sorted(range(self.count()), key=lambda i: -(index - 1 - i if i < index else i - index))
+        for i in order:
+            if used <= self.memory_limit:
+                break
+            command = self.command(i)
+            used -= _cost(command)
+            _expire(command)
+            used += _cost(command)
+
+
+def _commands(command):
+    """A command and, for macros, its children."""
+    yield command
+    for i in range(command.childCount()):
+        yield from _commands(command.child(i))
+
+
+def _cost(command):
+    return sum(getattr(c, "cost", lambda: 0)() for c in _commands(command))
+
+
+def _expired(command):
+    return command is not None and any(getattr(c, "expired", False) for c in _commands(command))
+
+
+def _expire(command):
+    for c in _commands(command):
+        if hasattr(c, "expire"):
+            c.expire()
+
+
+class NetworkCommand(QUndoCommand):
+    """Base for the editor's commands: a scene, a cost in bytes, and expiry."""
+    def __init__(self, scene, text):
+        super().__init__(text)
         self.scene = scene
-        self.node_item = node_item
-        self.added = False
+        self.expired = False
+
+    def cost(self):
+        return sum(a.nbytes for a in vars(self).values() if isinstance(a, np.ndarray))
+
+    def expire(self):
+        """Drop the data needed to undo; the history will not undo past this command."""
+        self.expired = True
+        for name, value in list(vars(self).items()):
+            if isinstance(value, np.ndarray):
+                setattr(self, name, value[:0])
+
+
+class _Rows:
+    """Copies of node rows and edge rows, to restore them under their ids."""
+    def __init__(self, model, node_ids, edge_ids):
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.columns = {name: model.nodes[name][self.node_ids].copy() for name in NODE_COLUMNS}
+        self.edge_ids = np.asarray(edge_ids, dtype=np.int64)
+        self.src, self.dst = (a.copy() for a in model.edge_endpoints(self.edge_ids))
+
+    @property
+    def nbytes(self):
+        return (self.node_ids.nbytes + self.edge_ids.nbytes + self.src.nbytes + self.dst.nbytes
+                + sum(a.nbytes for a in self.columns.values()))
+
+    def restore(self, scene):
+        columns = dict(self.columns)
+        x = columns.pop("x")
+        y = columns.pop("y")
+        scene.model.restore_nodes(self.node_ids, x, y, **columns)
+        scene.model.restore_edges(self.edge_ids, self.src, self.dst)
+        scene.add_items(self.node_ids, self.edge_ids)
+
+
+def _incident_edges(model, node_ids):
+    m = model.edge_slots
+    incident = model.edge_alive[:m] & (np.isin(model.edge_src[:m], node_ids) | np.isin(model.edge_dst[:m], node_ids))
+    return np.flatnonzero(incident)
+
+
+class AddRowsCommand(NetworkCommand):
+    """
+    Nodes and edges that were just added (by a click, a connection or an
+    import batch). While applied only the ids are kept; the rows are
+    copied on undo, to be restored by redo.
+    """
+    def __init__(self, scene, node_ids=(), edge_ids=(), text="Add"):
+        super().__init__(scene, text)
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.edge_ids = np.asarray(edge_ids, dtype=np.int64)
+        self.rows = None
+        self.applied = True
+
+    def cost(self):
+        return super().cost() + (self.rows.nbytes if self.rows is not None else 0)
+
+    def expire(self):
+        super().expire()
+        self.rows = None
 
     def redo(self):
-        if not self.added:
-            self.scene.addItem(self.node_item)
-            self.added = True
-        else:
-            self.scene.addItem(self.node_item)
+        if self.applied:
+            return  # pushed after the fact
+        self.rows.restore(self.scene)
+        self.rows = None
+        self.applied = True
 
     def undo(self):
-        self.scene.removeItem(self.node_item)
+        model = self.scene.model
+        self.rows = _Rows(model, self.node_ids,
+                          np.union1d(self.edge_ids, _incident_edges(model, self.node_ids)))
+        self.scene.delete_edges(self.edge_ids)
+        self.scene.delete_nodes(self.node_ids)
+        self.applied = False
 
-class AddEdgeCommand(QUndoCommand):
-    def __init__(self, scene, edge_item, description="Add Edge"):
-        super().__init__(description)
-        self.scene = scene
-        self.edge_item = edge_item
-        self.added = False
+
+class DeleteRowsCommand(NetworkCommand):
+    """Deletion of nodes (with their incident edges) and edges; undo restores them."""
+    def __init__(self, scene, node_ids=(), edge_ids=(), text="Delete"):
+        super().__init__(scene, text)
+        model = scene.model
+        node_ids = np.unique(np.asarray(node_ids, dtype=np.int64))
+        node_ids = node_ids[model.node_alive[node_ids]]
+        edge_ids = np.unique(np.asarray(edge_ids, dtype=np.int64))
+        edge_ids = np.union1d(edge_ids[model.edge_alive[edge_ids]], _incident_edges(model, node_ids))
+        self.rows = _Rows(model, node_ids, edge_ids)
+
+    def cost(self):
+        return self.rows.nbytes if self.rows is not None else 0
+
+    def expire(self):
+        super().expire()
+        self.rows = None
+
+    def redo(self):
+        self.scene.delete_edges(self.rows.edge_ids)
+        self.scene.delete_nodes(self.rows.node_ids)
+
+    def undo(self):
+        self.rows.restore(self.scene)
+
+
+class MoveNodesCommand(NetworkCommand):
+    """
+    Nodes moved from (old_x, old_y) to (new_x, new_y). Consecutive moves of
+    the same nodes merge into one command.
+    """
+    def __init__(self, scene, node_ids, old_x, old_y, new_x, new_y, text="Move"):
+        super().__init__(scene, text)
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.old_x = np.asarray(old_x, dtype=np.float64)
+        self.old_y = np.asarray(old_y, dtype=np.float64)
+        self.new_x = np.asarray(new_x, dtype=np.float64)
+        self.new_y = np.asarray(new_y, dtype=np.float64)
+        self.applied = True
+
+    def id(self):
+        return MOVE_NODES_ID
+
+    def mergeWith(self, other):
+        if self.expired or not np.array_equal(other.node_ids, self.node_ids):
+            return False
+        self.new_x = other.new_x
+        self.new_y = other.new_y
+        return True
+
+    def redo(self):
+        if self.applied:
+            return
+        self.scene.move_nodes(self.node_ids, self.new_x, self.new_y)
+        self.applied = True
+
+    def undo(self):
+        self.scene.move_nodes(self.node_ids, self.old_x, self.old_y)
+        self.applied = False
+
+
+class SetPropertiesCommand(NetworkCommand):
+    """
+    Property edits on a set of nodes: `changes` maps a column name to
+    (old values, new value) where the old values are one per node and the
+    new value is shared (or one per node).
+    """
+    def __init__(self, scene, node_ids, changes, text="Edit Properties", applied=True):
+        super().__init__(scene, text)
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.changes = {name: (np.asarray(old), np.asarray(new)) for name, (old, new) in changes.items()}
+        self.applied = applied
+
+    def cost(self):
+        return self.node_ids.nbytes + sum(old.nbytes + new.nbytes for old, new in self.changes.values())
+
+    def expire(self):
+        super().expire()
+        self.changes = {}
 
     def redo(self):
-        if not self.added:
-            self.scene.addItem(self.edge_item)
-            self.added = True
-        else:
-            self.scene.addItem(self.edge_item)
+        if self.applied:
+            return
+        for name, (_, new) in self.changes.items():
+            self.scene.model.set_node_attributes(self.node_ids, name, new)
+        self.applied = True
 
     def undo(self):
-        self.scene.removeItem(self.edge_item)
+        for name, (old, _) in self.changes.items():
+            self.scene.model.set_node_attributes(self.node_ids, name, old)
+        self.applied = False
@@ -1,17 +1,41 @@
 import sys
 import math
-import random
+import time
+
+import numpy as np
 from PyQt5.QtCore import (
-    Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect
+    Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect, QPointF, QEvent
 )
 from PyQt5.QtGui import (
-    QPainter, QLinearGradient, QColor, QFont
+    QPainter, QLinearGradient, QColor, QFont, QPen, QPolygonF, QImage, QPixmap
 )
 from PyQt5.QtWidgets import (
     QApplication, QDialog, QLabel, QPushButton, QVBoxLayout,
     QHBoxLayout, QSpacerItem, QSizePolicy, QMessageBox, QGraphicsOpacityEffect, QWidget
 )
 
+# Star opacities are quantized to this many levels, one pen and one
+# drawPoints call each (per dot size)
+ALPHA_BUCKETS = 16
+
+# The background gradient is rendered into a texture this small, scaled up
+# into a cached window-sized pixmap, and redrawn only when its hue has
+# shifted by GRADIENT_STEP degrees
+GRADIENT_TEXTURE_SIZE = (96, 64)
+GRADIENT_STEP = 2.0
+
+# Frame pacing (ms): the nominal interval, the slowest it is throttled to
+# when frames run over budget, and the poll interval while not exposed
+FRAME_INTERVAL = 30
+MAX_FRAME_INTERVAL = 120
+HIDDEN_POLL_INTERVAL = 250
+# A frame is over budget when painting it takes this share of the interval
+FRAME_BUDGET = 0.5
+
+# Corner lines grow this many pixels per nominal frame
+LINE_SPEED = 15
+
+
 class LineWidget(QWidget):
     """
     A simple widget representing a white line (rectangle).
@@ -34,7 +58,9 @@ class AnimatedBackgroundWidget(QDialog):
       1. A dynamic rainbow gradient background that shifts over time.
       2. A starfield/particle layer drawn on top (animated).
       3. Title, subtitle, and buttons with sequential fade-in animations.
-      4. Animated white lines from corners to near the middle of the screen. (Not appearing for some reason)
+      4. Animated white lines from corners to near the middle of the screen.
+    The animation only runs while the dialog is shown and exposed, and
+    throttles itself when frames take too long to paint.
     """
 
     def __init__(self, parent=None):
@@ -43,12 +69,22 @@ class AnimatedBackgroundWidget(QDialog):
         self.setFixedSize(1800, 1200)
         self.setModal(True)
 
-        # Rainbow gradient counter
-        self.gradient_counter = 0
+        # Rainbow gradient counter (in nominal frames) and its cached rendering
+        self.gradient_counter = 0.0
+        self.background = None
+        self.background_key = None
+
+        # Corner lines (see setup_lines)
+        self.lines_top_left = []
+        self.lines_bottom_left = []
+        self.lines_bottom_right = []
+        self.lines_done = True
 
         # Starfield/particle data
         self.num_particles = 5000  # Increase or decrease for more/less stars
-        self.particles = []
+        self.particles = {}
+        self.rng = np.random.default_rng()
+        self.star_pens = {}  # (alpha bucket, size) -> QPen
 
         # references to the UI elements to animate them
         self.title_label = None
@@ -64,14 +100,30 @@ class AnimatedBackgroundWidget(QDialog):
         # Initialize the starfield
         self.init_particles()
 
-        # Timer for both gradient and starfield animations (~33 FPS)
+        # Timer for gradient, starfield and line animations (~33 FPS), only
+        # running while the dialog is shown; see update_animation
         self.animation_timer = QTimer(self)
         self.animation_timer.timeout.connect(self.update_animation)
-        self.animation_timer.start(30)
+        self.frame_interval = FRAME_INTERVAL
+        self.frame_cost = 0.0  # moving average of paintEvent time, ms
+        self.last_tick = None
 
     def showEvent(self, event):
         super().showEvent(event)
         self.setup_lines()  # Initialize lines after widget is shown
+        self.start_animation()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.animation_timer.stop()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            if self.isMinimized():
+                self.animation_timer.stop()
+            elif self.isVisible():
+                self.start_animation()
 
 
     # -------------------------------------------------------------------------
@@ -147,6 +199,7 @@ class AnimatedBackgroundWidget(QDialog):
         self.lines_top_left = []
         self.lines_bottom_left = []
         self.lines_bottom_right = []
+        self.lines_done = False
 
         line_thickness = 10
         spacing = 80
@@ -161,6 +214,8 @@ class AnimatedBackgroundWidget(QDialog):
                 'x': edge_offset + i * spacing,
                 'y': edge_offset,
                 'length': 0,  # Start with zero length
+                'max_length': h / 2 - edge_offset,  # stop near the middle
+                'direction': 1,
                 'orientation': 'vertical',
                 'opacity': 1.0,
             })
@@ -169,7 +224,9 @@ class AnimatedBackgroundWidget(QDialog):
             self.lines_bottom_left.append({
                 'x': edge_offset,
                 'y': h - edge_offset - (i + 1) * spacing,
-                'length': 0,  
+                'length': 0,
+                'max_length': w / 2 - edge_offset,
+                'direction': 1,
                 'orientation': 'horizontal',
                 'opacity': 1.0,
             })
@@ -178,27 +235,27 @@ class AnimatedBackgroundWidget(QDialog):
             self.lines_bottom_right.append({
                 'x': w - edge_offset - (i + 1) * spacing,
                 'y': h - edge_offset,
-                'length': 0,  
+                'length': 0,
+                'max_length': h / 2 - edge_offset,
+                'direction': -1,
                 'orientation': 'vertical',
                 'opacity': 1.0,
             })
 
         self.update()  # Trigger repaint
 
-    def update_lines(self):
+    def update_lines(self, steps=1.0):
         """
-        Extend the lines 
+        Extend the lines by `steps` nominal frames' worth, up to their
+        max_length; once all are there they are left alone.
         """
-        def update_line(line):
-            if line['orientation'] == 'vertical':
-                line['length'] += 15  # Extend downward/upward
-            elif line['orientation'] == 'horizontal':
-                line['length'] += 15  # Extend rightward
-
+        if self.lines_done:
+            return
+        self.lines_done = True
         for line in self.lines_top_left + self.lines_bottom_left + self.lines_bottom_right:
-            update_line(line)
-
-        self.update()  # Trigger repaint
+            line['length'] = min(line['length'] + LINE_SPEED * steps, line['max_length'])
+            if line['length'] < line['max_length']:
+                self.lines_done = False
 
 
 
@@ -299,62 +356,146 @@ class AnimatedBackgroundWidget(QDialog):
     # -------------------------------------------------------------------------
     def init_particles(self):
         """
-        Initialize a list of particles for the starfield effect.
-        Each particle is a dict with:
+        Initialize the particles for the starfield effect: a dict of NumPy
+        arrays, one entry per particle in each of
           x, y, speed, alpha, size
         """
-        self.particles = []
-        for _ in range(self.num_particles):
-            self.particles.append({
-                'x': random.uniform(0, self.width()),
-                'y': random.uniform(0, self.height()),
-                'speed': random.uniform(0.5, 2.5),
-                'alpha': random.uniform(0.3, 1.0),
-                'size': random.uniform(1.0, 3.0)
-            })
+        n = self.num_particles
+        uniform = self.rng.uniform
+        self.particles = {
+            'x': uniform(0, self.width(), n),
+            'y': uniform(0, self.height(), n),
+            'speed': uniform(0.5, 2.5, n),
+            'alpha': uniform(0.3, 1.0, n),
+            'size': uniform(1.0, 3.0, n),
+        }
 
-    def update_particles(self):
+    def update_particles(self, steps=1.0):
+        """
+        Move and fade out all particles at once, by `steps` nominal frames'
+        worth. Those gone off screen or too faint respawn near the top.
+        """
+        p = self.particles
+        uniform = self.rng.uniform
+        p['y'] += p['speed'] * steps
+        # Fade them slightly
+        p['alpha'] -= 0.005 * steps * uniform(0.5, 1.5, self.num_particles)
+
+        respawn = np.flatnonzero((p['y'] > self.height()) | (p['alpha'] < 0.1))
+        if len(respawn):
+            k = len(respawn)
+            p['x'][respawn] = uniform(0, self.width(), k)
+            p['y'][respawn] = -10.0  # Just above top
+            p['speed'][respawn] = uniform(0.5, 2.5, k)
+            p['alpha'][respawn] = uniform(0.5, 1.0, k)
+            p['size'][respawn] = uniform(1.0, 3.0, k)
+
+    def star_pen(self, bucket, size):
+        pen = self.star_pens.get((bucket, size))
+        if pen is None:
+            pen = QPen(QColor(255, 255, 255, int(bucket * 255 / (ALPHA_BUCKETS - 1))), size)
+            pen.setCapStyle(Qt.SquareCap)  # far cheaper than round dots, alike at this size
+            self.star_pens[(bucket, size)] = pen
+        return pen
+
+    def draw_particles(self, painter):
         """
-        Move and fade out each particle. If it goes off screen or too faint, reset it.
+        Draw the starfield with one drawPoints call per (alpha bucket, size)
+        group: particles are sorted by group and each run of points is
+        written straight into a QPolygonF from NumPy.
         """
-        for p in self.particles:
-            p['y'] += p['speed']
-            # Fade it slightly
-            p['alpha'] -= 0.005 * random.uniform(0.5, 1.5)
-
-            # If off-screen or nearly invisible, respawn near top
-            if p['y'] > self.height() or p['alpha'] < 0.1:
-                p['x'] = random.uniform(0, self.width())
-                p['y'] = -10.0  # Just above top
-                p['speed'] = random.uniform(0.5, 2.5)
-                p['alpha'] = random.uniform(0.5, 1.0)
-                p['size'] = random.uniform(1.0, 3.0)
+        p = self.particles
+        size = p['size'].astype(np.int64)  # the dot sizes drawEllipse used to round to
+        bucket = np.rint(np.clip(p['alpha'], 0.0, 1.0) * (ALPHA_BUCKETS - 1)).astype(np.int64)
+        group = bucket * 4 + size
+        order = np.argsort(group, kind="stable")
+        group = group[order]
+        # Centre of the size x size square the star covers
+        x = np.floor(p['x'][order]) + size[order] / 2.0
+        y = np.floor(p['y'][order]) + size[order] / 2.0
+
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+        for start, stop in zip(starts.tolist(), np.r_[starts[1:], len(group)].tolist()):
+            key = int(group[start])
+            if key < 4:
+                continue  # alpha bucket 0 is invisible
+            count = stop - start
+            points = QPolygonF()
+            points.fill(QPointF(), count)
+            buffer = points.data()
+            buffer.setsize(16 * count)
+            xy = np.frombuffer(buffer, dtype=np.float64).reshape(count, 2)
+            xy[:, 0] = x[start:stop]
+            xy[:, 1] = y[start:stop]
+            painter.setPen(self.star_pen(key // 4, key % 4))
+            painter.drawPoints(points)
 
     # -------------------------------------------------------------------------
     # Animation Timer
     # -------------------------------------------------------------------------
+    def start_animation(self):
+        self.frame_interval = FRAME_INTERVAL
+        self.last_tick = None
+        self.animation_timer.start(self.frame_interval)
+
     def update_animation(self):
         """
-        Called ~30 times/sec:
+        Called ~30 times/sec while shown:
          - Shift the rainbow gradient
          - Update starfield
          - Update lines
          - Repaint
+        Motion is scaled by the time since the last tick, so the animation
+        keeps its speed when pace_frames() throttles the timer.
         """
-        self.gradient_counter += 1
-        self.update_particles()
-        self.update_lines()
+        handle = self.windowHandle()
+        if handle is not None and not handle.isExposed():
+            # Occluded or on another desktop: only poll for exposure
+            self.last_tick = None
+            self.animation_timer.setInterval(HIDDEN_POLL_INTERVAL)
+            return
+
+        now = time.perf_counter()
+        elapsed = FRAME_INTERVAL if self.last_tick is None else (now - self.last_tick) * 1000.0
+        self.last_tick = now
+        steps = min(elapsed, MAX_FRAME_INTERVAL) / FRAME_INTERVAL
+
+        self.gradient_counter += steps
+        self.update_particles(steps)
+        self.update_lines(steps)
+        self.pace_frames()
         self.update()
 
+    def pace_frames(self):
+        """
+        Halve the frame rate while painting runs over FRAME_BUDGET of the
+        interval (down to MAX_FRAME_INTERVAL), and double it back once
+        frames are cheap again.
+        """
+        interval = self.frame_interval
+        if self.frame_cost > interval * FRAME_BUDGET:
+            interval = min(interval * 2, MAX_FRAME_INTERVAL)
+        elif self.frame_cost < interval * FRAME_BUDGET / 4:
+            interval = max(interval // 2, FRAME_INTERVAL)
+        if interval != self.frame_interval or self.animation_timer.interval() != interval:
+            self.frame_interval = interval
+            self.animation_timer.setInterval(interval)
+
     # -------------------------------------------------------------------------
     # Painting the Gradient + Starfield
     # -------------------------------------------------------------------------
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        rect = self.rect()
+    def gradient_background(self):
+        """
+        The window-sized background for the current gradient_counter. The
+        gradient is drawn into a GRADIENT_TEXTURE_SIZE image and scaled up;
+        both are only redone every GRADIENT_STEP degrees of hue shift.
+        """
+        step = int(self.gradient_counter * 0.5 / GRADIENT_STEP)
+        key = (step, self.width(), self.height())
+        if key == self.background_key:
+            return self.background
 
-        # 1) Draw the rainbow gradient background
-        shift = self.gradient_counter * 0.5
+        shift = step * GRADIENT_STEP
         r = 120 + 50 * math.sin(math.radians(shift))
         g = 120 + 50 * math.sin(math.radians(shift + 120))
         b = 120 + 50 * math.sin(math.radians(shift + 240))
@@ -366,21 +507,33 @@ class AnimatedBackgroundWidget(QDialog):
         start_color = QColor(int(r), int(g), int(b))
         end_color = QColor(int(r2), int(g2), int(b2))
 
-        gradient = QLinearGradient(rect.topLeft(), rect.bottomRight())
+        texture = QImage(*GRADIENT_TEXTURE_SIZE, QImage.Format_RGB32)
+        gradient = QLinearGradient(QPointF(0, 0), QPointF(*GRADIENT_TEXTURE_SIZE))
         gradient.setColorAt(0, start_color)
         gradient.setColorAt(1, end_color)
+        painter = QPainter(texture)
+        painter.fillRect(texture.rect(), gradient)
+        painter.end()
+
+        if self.background is None or self.background.size() != self.size():
+            self.background = QPixmap(self.size())
+        painter = QPainter(self.background)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.drawImage(self.background.rect(), texture)
+        painter.end()
+        self.background_key = key
+        return self.background
 
-        painter.fillRect(rect, gradient)
+    def paintEvent(self, event):
+        started = time.perf_counter()
+        painter = QPainter(self)
+
+        # 1) Draw the rainbow gradient background
+        painter.drawPixmap(0, 0, self.gradient_background())
 
         # 2) Draw the starfield on top
-        for p in self.particles:
-            alpha_clamped = max(0.0, min(1.0, p['alpha']))
-            particle_color = QColor(255, 255, 255, int(alpha_clamped * 255))
-            painter.setBrush(particle_color)
-            painter.setPen(Qt.NoPen)
-            painter.drawEllipse(int(p['x']), int(p['y']),
-                                int(p['size']), int(p['size']))
-            
+        self.draw_particles(painter)
+
         # 3) Draw whooshing lines
         def draw_lines(lines):
             for line in lines:
@@ -389,18 +542,22 @@ class AnimatedBackgroundWidget(QDialog):
                 pen.setColor(color)
                 pen.setWidth(10)  # Adjust thickness
                 painter.setPen(pen)
+                x, y = line['x'], line['y']
+                length = line['length'] * line['direction']
                 if line['orientation'] == 'vertical':
-                    painter.drawLine(line['x'], line['y'], line['x'], line['y'] + line['length'])
+                    painter.drawLine(QPointF(x, y), QPointF(x, y + length))
                 elif line['orientation'] == 'horizontal':
-                    painter.drawLine(line['x'], line['y'], line['x'] + line['length'], line['y'])
-        
+                    painter.drawLine(QPointF(x, y), QPointF(x + length, y))
+
         draw_lines(self.lines_top_left)
         draw_lines(self.lines_bottom_left)
         draw_lines(self.lines_bottom_right)
 
-
+        painter.end()
         # Let the normal UI draw last (e.g. labels, buttons)
         super().paintEvent(event)
+        cost = (time.perf_counter() - started) * 1000.0
+        self.frame_cost = 0.8 * self.frame_cost + 0.2 * cost
 
 
 def main():
@@ -1,23 +1,100 @@
 # main.py
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
 import sys
+
+from PyQt5.QtCore import QEvent, QObject, QSettings, QTimer
 from PyQt5.QtWidgets import QApplication, QDialog
-from gui.welcome_page import AnimatedBackgroundWidget
-from gui.main_window import QuantumNetworkWindow  # main simulator window
+
+# The welcome page and the main window (with the scene, items, dialogs and
+# core modules behind it) are imported only when they are about to be shown.
+
+# Time-to-first-interactive-frame target for --benchmark-startup: from this
+# module starting to run until the main window has painted and the event
+# loop is idle again
+STARTUP_TARGET_MS = 1000
+
+# QSettings key of View > Show Welcome Screen at Startup (gui.main_window's
+# SHOW_WELCOME_SETTING, repeated here so the splash path does not import it)
+SHOW_WELCOME_SETTING = "startup/show_welcome"
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py", description="Quantum Network Simulator")
+    parser.add_argument("network", nargs="?", help="network file (.json or .qnet) to open at launch")
+    parser.add_argument("--no-splash", action="store_true",
+                        help="skip the welcome screen (implied when a network file is given)")
+    parser.add_argument("--benchmark-startup", action="store_true",
+                        help="print the time to the main window's first frame and exit "
+                             f"(status 1 if over {STARTUP_TARGET_MS} ms); implies --no-splash")
+    # Qt's own options (-style, -platform, ...) are left to QApplication
+    args, _ = parser.parse_known_args(argv[1:])
+    return args
+
+
+class FirstFrameProbe(QObject):
+    """Calls `callback` once `widget` has painted and the event loop is idle again."""
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            # Runs after this paint and whatever else is already queued
+            QTimer.singleShot(0, self.callback)
+        return False
+
+
+def report_startup(app, window):
+    elapsed = (time.perf_counter() - STARTED) * 1000.0
+    verdict = "ok" if elapsed <= STARTUP_TARGET_MS else "over target"
+    print(f"First interactive frame after {elapsed:.0f} ms (target {STARTUP_TARGET_MS} ms): {verdict}")
+    # A regular close, so the autosave is cleaned up as on any clean exit
+    app.setQuitOnLastWindowClosed(False)
+    window.close()
+    app.exit(0 if elapsed <= STARTUP_TARGET_MS else 1)
+
 
 def main():
     app = QApplication(sys.argv)
+    # Names the per-user data directory (autosave lives there)
+    app.setOrganizationName("QuantumNetSim")
+    app.setApplicationName("Quantum Network Simulator")
+    args = parse_args(sys.argv)
+
+    show_welcome = QSettings().value(SHOW_WELCOME_SETTING, True, type=bool)
+    if show_welcome and not (args.no_splash or args.network or args.benchmark_startup):
+        from gui.welcome_page import AnimatedBackgroundWidget
+
+        # Instantiate the new animated welcome page
+        welcome = AnimatedBackgroundWidget()
+        # Load the main window's modules while the welcome page is up
+        QTimer.singleShot(500, lambda: __import__("gui.main_window"))
 
-    # Instantiate the new animated welcome page
-    welcome = AnimatedBackgroundWidget()
-    
-    # If user clicks 'Start', proceed to main simulator
-    if welcome.exec_() == QDialog.Accepted:
-        window = QuantumNetworkWindow()
-        window.show()
-        sys.exit(app.exec_())
-    else:
         # If user closes the welcome page without clicking 'Start', just exit
-        sys.exit(0)
+        if welcome.exec_() != QDialog.Accepted:
+            sys.exit(0)
+        welcome.deleteLater()
+
+    from gui.main_window import QuantumNetworkWindow  # main simulator window
+
+    window = QuantumNetworkWindow()
+
+    def first_frame():
+        if args.benchmark_startup:
+            report_startup(app, window)
+        elif args.network:
+            # Only now, so the window is up while a large file loads
+            window.load_network_file(args.network)
+
+    FirstFrameProbe(window.view.viewport(), first_frame)
+    window.show()
+    sys.exit(app.exec_())
 
 if __name__ == "__main__":
     main()
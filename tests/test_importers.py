@@ -0,0 +1,48 @@
+# tests/test_importers.py
+
+import json
+
+from core.importers import BulkImporter
+from core.network_model import PIXELS_PER_KM, NetworkModel
+
+
+def _run(importer, path):
+    for _ in importer.import_file(str(path)):
+        pass
+
+
+def _links(model, importer):
+    names = {node_id: name for name, node_id in importer.ids.items()}
+    src, dst = model.edge_endpoints()
+    return sorted((names[a], names[b]) for a, b in zip(src.tolist(), dst.tolist()))
+
+
+def test_skipped_csv_rows_keep_their_row_numbers(tmp_path):
+    nodes = tmp_path / "nodes.csv"
+    nodes.write_text("x,y\n0,0\n1\n2,0\n3,0\n")
+    links = tmp_path / "links.csv"
+    links.write_text("source,target\n0,2\n2,3\n")
+    model = NetworkModel()
+    importer = BulkImporter(model)
+    _run(importer, nodes)
+    _run(importer, links)
+    assert importer.skipped == 1
+    assert sorted(importer.ids) == ["0", "2", "3"]
+    assert model.nodes["x"][importer.ids["3"]] == 3.0 * PIXELS_PER_KM
+    assert _links(model, importer) == [("0", "2"), ("2", "3")]
+
+
+def test_malformed_geojson_features_are_skipped(tmp_path):
+    point = lambda lon, lat: {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]}}
+    line = lambda coordinates, **properties: {"type": "Feature", "properties": properties,
+                                              "geometry": {"type": "LineString", "coordinates": coordinates}}
+    features = [point(0.0, 0.0), point(None, None), point(0.01, 0.0), point(0.02, 0.0),
+                line([[None, None]]), line([]), line([[0.0, 0.0], [0.01, 0.0]]), line(None, source="2", target="3")]
+    path = tmp_path / "sites.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+    model = NetworkModel()
+    importer = BulkImporter(model)
+    _run(importer, path)
+    assert importer.skipped == 3
+    assert sorted(importer.ids) == ["0", "2", "3"]
+    assert _links(model, importer) == [("0", "2"), ("2", "3")]
@@ -0,0 +1,98 @@
+# tests/test_journal.py
+
+import os
+
+import numpy as np
+import pytest
+
+from core.journal import Journal, autosave_base, lock_path, orphaned_autosaves, recover
+from core.network_model import NODE_COLUMNS, NetworkModel
+
+
+def _network():
+    model = NetworkModel()
+    model.add_nodes([0.0, 100.0, 200.0], [0.0, 0.0, 0.0])
+    model.add_edges([0, 1], [1, 2])
+    return model
+
+
+def _delete_and_restore(model, node):
+    """Remove `node` and bring it back, as undoing a deletion does."""
+    columns = {name: model.nodes[name][[node]].copy() for name in NODE_COLUMNS}
+    edge_ids = model.edge_ids()
+    src, dst = model.edge_endpoints(edge_ids)
+    incident = (src == node) | (dst == node)
+    edge_ids, src, dst = edge_ids[incident], src[incident].copy(), dst[incident].copy()
+    model.remove_nodes([node])
+    x, y = columns.pop("x"), columns.pop("y")
+    model.restore_nodes([node], x, y, **columns)
+    model.restore_edges(edge_ids, src, dst)
+
+
+def test_recover_replays_edits_after_an_undone_delete(tmp_path):
+    model = _network()
+    journal = Journal(model, str(tmp_path / "network"))
+    journal.flush()  # initial snapshot
+
+    model.set_positions([0], [10.0], [10.0])
+    model.set_node_attributes([0], "coherence_time", 2.0)
+    _delete_and_restore(model, 0)
+    model.set_positions([0], [50.0], [50.0])
+    model.set_node_attributes([0], "coherence_time", 5.0)
+    journal.flush()
+
+    recovered = NetworkModel()
+    recover(recovered, str(tmp_path / "network"))
+    journal.close(discard=True)
+
+    assert recovered.num_nodes == model.num_nodes
+    assert recovered.num_edges == model.num_edges
+    assert recovered.nodes["x"][0] == 50.0
+    assert recovered.nodes["y"][0] == 50.0
+    assert recovered.nodes["coherence_time"][0] == 5.0
+
+
+def test_moves_still_coalesce(tmp_path):
+    model = _network()
+    journal = Journal(model, str(tmp_path / "network"))
+    journal.flush()
+
+    for step in range(5):
+        model.set_positions([1], [float(step)], [0.0])
+    assert len(journal._buffer) == 1
+
+    journal.flush()
+    recovered = NetworkModel()
+    recover(recovered, str(tmp_path / "network"))
+    journal.close(discard=True)
+    assert np.array_equal(recovered.nodes["x"][:3], [0.0, 4.0, 200.0])
+
+
+def test_running_autosaves_are_not_orphans(tmp_path):
+    directory = str(tmp_path)
+    base = autosave_base(directory)
+    assert base.endswith(f"-{os.getpid()}")
+    model = _network()
+    journal = Journal(model, base)
+    journal.flush()
+    model.set_positions([0], [10.0], [10.0])
+    journal.flush()
+
+    # Held by a live journal: not offered, and not writable by a second one
+    assert orphaned_autosaves(directory) == []
+    with pytest.raises(RuntimeError):
+        Journal(NetworkModel(), base)
+
+    # A crash drops the lock with the process
+    journal._lock.close()
+    journal._file.close()
+    assert orphaned_autosaves(directory) == [base]
+
+
+def test_clean_close_removes_the_autosave(tmp_path):
+    base = autosave_base(str(tmp_path))
+    journal = Journal(_network(), base)
+    journal.flush()
+    journal.close(discard=True)
+    assert orphaned_autosaves(str(tmp_path)) == []
+    assert not os.path.exists(lock_path(base))
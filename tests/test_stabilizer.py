@@ -0,0 +1,122 @@
+# tests/test_stabilizer.py
+
+import numpy as np
+import pytest
+
+from core.network_model import NetworkModel
+from core.simulation import Simulation, SimulationConfig
+from core.stabilizer import StabilizerState, node_qubit_offsets
+
+SEEDS = range(16)
+
+
+def _measure_x(state, qubit):
+    state.h(qubit)
+    return state.measure(qubit)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bell_pair_correlations(seed):
+    state = StabilizerState(2, np.random.default_rng(seed))
+    state.bell_pair(0, 1)
+    assert sorted(state.stabilizers()) == ["+XX", "+ZZ"]
+    assert state.measure(0) == state.measure(1)
+
+    state = StabilizerState(2, np.random.default_rng(seed))
+    state.bell_pair(0, 1)
+    assert _measure_x(state, 0) == _measure_x(state, 1)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_swapping_links_the_far_ends(seed):
+    for basis in ("z", "x"):
+        state = StabilizerState(4, np.random.default_rng(seed))
+        state.bell_pair(0, 1)
+        state.bell_pair(2, 3)
+        state.swap_entanglement(1, 2, 0, 3)
+        if basis == "z":
+            assert state.measure(0) == state.measure(3)
+        else:
+            assert _measure_x(state, 0) == _measure_x(state, 3)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_ghz_correlations(seed):
+    qubits = [0, 2, 3, 5, 6]
+    state = StabilizerState(7, np.random.default_rng(seed))
+    state.ghz(qubits)
+    assert len({state.measure(q) for q in qubits}) == 1
+
+    # X on every qubit of |GHZ+> has eigenvalue +1: the outcomes have even parity
+    state = StabilizerState(7, np.random.default_rng(seed))
+    state.ghz(qubits)
+    assert sum(_measure_x(state, q) for q in qubits) % 2 == 0
+    # Qubits outside the GHZ state stay in |0>
+    assert state.measure(1) == 0 and state.measure(4) == 0
+
+
+def test_node_qubit_offsets_skip_removed_nodes():
+    model = NetworkModel()
+    model.add_nodes([0.0, 1.0, 2.0, 3.0], [0.0] * 4, num_qubits=[2, 3, 4, 5])
+    model.remove_nodes([1])
+    offsets = node_qubit_offsets(model)
+    assert offsets.tolist() == [0, 2, 2, 6, 11]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_repeater_chain_over_a_network_register(seed):
+    # Five nodes of 256 qubits share one 1280-qubit register; links use the
+    # last qubit of one node and the first of the next, and every repeater
+    # swaps, leaving the two end nodes entangled
+    model = NetworkModel()
+    model.add_nodes(np.arange(5) * 100.0, np.zeros(5), num_qubits=[256] * 5)
+    offsets = node_qubit_offsets(model)
+    state = StabilizerState(int(offsets[-1]), np.random.default_rng(seed))
+    for i in range(4):
+        state.bell_pair(offsets[i + 1] - 1, offsets[i + 1])
+    first = offsets[1] - 1
+    for i in range(1, 4):
+        state.swap_entanglement(offsets[i], offsets[i + 1] - 1, first, offsets[i + 1])
+    last = offsets[4]
+    assert state.measure(first) == state.measure(last)
+
+
+def _chain(nodes=5, qubits=8, coherence=1e6):
+    model = NetworkModel()
+    types = ["memory"] + ["repeater"] * (nodes - 2) + ["memory"]
+    ids = model.add_nodes(np.arange(nodes) * 20.0, np.zeros(nodes), node_type=types,
+                          num_qubits=[qubits] * nodes, coherence_time=[coherence] * nodes)
+    model.add_edges(ids[:-1], ids[1:])
+    return model
+
+
+def test_simulation_backend_delivers_perfect_pairs_through_swaps():
+    config = SimulationConfig(duration=0.5, seed=3, backend="stabilizer", initial_fidelity=1.0)
+    sim = Simulation(_chain(), config)
+    result = sim.run()
+    assert result.delivered > 0 and result.swaps > 0
+    assert result.mean_fidelity == 1.0
+    # Every qubit not held by a stored pair is back on its node's free list
+    store = sim.states
+    assert sum(len(free) for free in store.free) + 2 * len(store) == store.tableau.num_qubits
+
+
+def test_simulation_backends_agree_on_noisy_fidelity():
+    model = _chain(qubits=16, coherence=0.05)
+    fidelity = {}
+    for backend in ("pairs", "stabilizer"):
+        delivered = total = 0.0
+        for seed in range(5):
+            result = Simulation(model, SimulationConfig(duration=1.0, seed=seed, backend=backend,
+                                                        initial_fidelity=0.9)).run()
+            delivered += result.delivered
+            total += result.fidelity_sum
+        fidelity[backend] = total / delivered
+    # Sampled fidelities over a few hundred pairs
+    assert abs(fidelity["stabilizer"] - fidelity["pairs"]) < 0.08
+
+
+def test_simulation_backend_rejects_non_clifford_errors():
+    config = SimulationConfig(backend="stabilizer", rotation_error={1: 0.1})
+    with pytest.raises(ValueError):
+        Simulation(_chain(), config)
@@ -0,0 +1,28 @@
+# tests/test_sweep.py
+
+import numpy as np
+
+from core.sweep import SweepParameter, SweepSpec
+
+
+def test_range_endpoints_are_exact():
+    assert SweepParameter.parse("coherence_time", "0.1..10:log").grid_values(3) == [0.1, 1.0, 10.0]
+    assert SweepParameter.parse("insertion_loss", "0.1..0.3").grid_values(2) == [0.1, 0.3]
+    assert SweepParameter.parse("coherence_time", "0.001..100:log").grid_values(6) == [0.001, 0.01, 0.1, 1.0, 10.0, 100.0]
+    values = SweepParameter.parse("coherence_time", "0.1..10:log").sample(np.array([0.0, 0.5, 1.0]))
+    assert values[0] == 0.1 and values[-1] == 10.0
+    assert SweepParameter.parse("num_qubits", "1..16:log").grid_values(5) == [1, 2, 4, 8, 16]
+
+
+def test_grid_and_latin_hypercube_designs():
+    parameters = [SweepParameter.parse("coherence_time", "0.01..10:log"),
+                  SweepParameter.parse("qubit_tech", "Atoms, Ions")]
+    grid = SweepSpec(parameters, samples=4).points(np.random.default_rng(0))
+    assert len(grid["coherence_time"]) == 8
+    assert grid["coherence_time"][0] == 0.01 and grid["coherence_time"][-1] == 10.0
+
+    lhs = SweepSpec(parameters, design="lhs", samples=6).points(np.random.default_rng(0))
+    # One point per stratum of the log range
+    strata = np.floor(np.log(lhs["coherence_time"] / 0.01) / np.log(1000.0) * 6)
+    assert sorted(strata.tolist()) == list(range(6))
+    assert sorted(lhs["qubit_tech"].tolist()) == ["Atoms"] * 3 + ["Ions"] * 3